@@ -0,0 +1,92 @@
+"""
+Compara os backends dos núcleos numéricos (Numba x NumPy) em cada núcleo
+isolado e na construção completa de uma solução, conferindo que os dois
+produzem exatamente o mesmo resultado. A compilação do Numba é feita antes das
+medições. Sem o Numba instalado, apenas o backend NumPy é medido.
+
+Uso (a partir do diretório core/):
+    python -m benchmarks.benchmark_aceleracao [caminho_instancia] [repeticoes]
+"""
+import random
+import sys
+import time
+
+import numpy as np
+
+from utils.aceleracao import JIT_DISPONIVEL, usar_backend
+from utils.avaliacao_incremental import EstadoIncremental
+from utils.carregar_parametros_otimizacao import carregar_parametros_otimizacao
+from utils.construir_solucao_grasp import construir_com_ordem_definida
+from utils.sequenciamento import CACHE_SEQUENCIAMENTO, sequenciar_periodo
+
+
+def _cronometrar(funcao, repeticoes):
+    funcao()
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        resultado = funcao()
+    return (time.perf_counter() - inicio) / repeticoes, resultado
+
+
+def _construir(parametros, ordem):
+    CACHE_SEQUENCIAMENTO.invalidar()
+    solucao = construir_com_ordem_definida(parametros, ordem)
+    return solucao.x.tolist(), {t: list(s) for t, s in solucao.sequencias_producao.items()}
+
+
+def _casos(parametros, solucao, repeticoes):
+    matriz = parametros["tempo_setup"]
+    num_itens = parametros["num_itens"]
+    rng = np.random.default_rng(0)
+
+    def sequenciar(k, estrategia):
+        conjuntos = [[int(j) for j in rng.choice(num_itens, size=k, replace=False)] for _ in range(20)]
+        return lambda: [sequenciar_periodo(itens, matriz, itens[-1], estrategia).sequencia for itens in conjuntos]
+
+    casos = {}
+    for nome, k, estrategia, vezes in (("held-karp", 9, "exata", repeticoes),
+                                       ("2-opt/Or-opt", 30, "melhoria", repeticoes),
+                                       ("2-opt/Or-opt", 100, "melhoria", max(1, repeticoes // 10)),
+                                       ("gulosa", num_itens, "gulosa", repeticoes)):
+        k = min(k, num_itens)
+        casos.setdefault(f"{nome} (k={k})", (sequenciar(k, estrategia), vezes))
+    estado = EstadoIncremental(solucao, parametros)
+    casos["estoque por idade"] = (lambda: [estado._estoque_item(j).tolist() for j in range(num_itens)], repeticoes)
+    ordem = list(range(parametros["num_pedidos"]))
+    random.Random(0).shuffle(ordem)
+    casos["construção completa"] = (lambda: _construir(parametros, ordem), 1)
+    return casos
+
+
+def main(caminho_instancia="inst1_5.txt", repeticoes=20):
+    parametros = carregar_parametros_otimizacao(caminho_instancia)
+    ordem = list(range(parametros["num_pedidos"]))
+    solucao = construir_com_ordem_definida(parametros, ordem)
+    backends = ("numba", "numpy") if JIT_DISPONIVEL else ("numpy",)
+
+    print(f"Instância: {caminho_instancia} (J={parametros['num_itens']}, T={parametros['num_periodos']}, N={parametros['num_pedidos']})")
+    if not JIT_DISPONIVEL:
+        print("Numba não instalado: apenas o backend NumPy é medido.")
+    print(f"{'núcleo':<24}" + "".join(f"{backend + ' (ms)':>14}" for backend in backends)
+          + (f"{'speedup':>10}" if len(backends) > 1 else ""))
+
+    for nome, (funcao, vezes) in _casos(parametros, solucao, repeticoes).items():
+        tempos, resultados = [], []
+        for backend in backends:
+            with usar_backend(backend):
+                tempo, resultado = _cronometrar(funcao, vezes)
+            tempos.append(tempo)
+            resultados.append(resultado)
+        assert all(resultado == resultados[0] for resultado in resultados), f"Backends divergem em {nome}"
+        linha = f"{nome:<24}" + "".join(f"{tempo * 1e3:14.3f}" for tempo in tempos)
+        if len(backends) > 1:
+            linha += f"{tempos[1] / tempos[0]:9.1f}x"
+        print(linha, flush=True)
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    main(
+        argumentos[0] if len(argumentos) > 0 else "inst1_5.txt",
+        int(argumentos[1]) if len(argumentos) > 1 else 20,
+    )
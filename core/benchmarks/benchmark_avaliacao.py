@@ -0,0 +1,79 @@
+"""
+Compara a avaliação vetorizada da função objetivo com a versão original em laços.
+
+Uso (a partir do diretório core/):
+    python -m benchmarks.benchmark_avaliacao [caminho_instancia] [repeticoes]
+"""
+import random
+import sys
+import timeit
+
+from utils.calcular_custo_total import avaliar_solucao
+from utils.carregar_parametros_otimizacao import carregar_parametros_otimizacao
+from utils.construir_solucao_grasp import construir_solucao_grasp
+
+
+def calcular_custo_total_lacos(solucao, parametros):
+    """Implementação original de calcular_custo_total (laços em Python), usada como referência."""
+    x = solucao["x"]
+    I = solucao["I"]
+    gamma = solucao["gamma"]
+    z = solucao["z"]
+
+    num_pedidos = parametros["num_pedidos"]
+    num_periodos = parametros["num_periodos"]
+    num_itens = parametros["num_itens"]
+    receita_pedido = parametros["receita_pedido"]
+    custo_estoque = parametros["custo_estoque"]
+    custo_setup = parametros["custo_setup"]
+    periodo_inicial_entrega = parametros["periodo_inicial_entrega"]
+    periodo_final_entrega = parametros["periodo_final_entrega"]
+    vida_util = parametros["vida_util"]
+
+    total_receita = 0
+    total_custo_estoque = 0
+    total_custo_setup = 0
+
+    for n in range(num_pedidos):
+        for t in range(periodo_inicial_entrega[n], periodo_final_entrega[n] + 1):
+            if t < num_periodos:
+                total_receita += receita_pedido[n][t] * gamma[n][t]
+
+    for j in range(num_itens):
+        for t in range(num_periodos):
+            for k in range(0, vida_util[j] + 1):
+                total_custo_estoque += custo_estoque[j] * I[j][t][k]
+
+    for t in range(num_periodos):
+        for i in range(num_itens):
+            for j in range(num_itens):
+                total_custo_setup += custo_setup[i][j] * z[i][j][t]
+
+    return total_receita - total_custo_estoque - total_custo_setup
+
+
+def main(caminho_instancia="inst1_5.txt", repeticoes=200):
+    parametros = carregar_parametros_otimizacao(caminho_instancia)
+    random.seed(0)
+    solucao = construir_solucao_grasp(parametros, 0.3)
+
+    referencia = calcular_custo_total_lacos(solucao, parametros)
+    vetorizado = avaliar_solucao(solucao, parametros).lucro
+    assert abs(referencia - vetorizado) < 1e-6, (referencia, vetorizado)
+
+    tempo_lacos = timeit.timeit(lambda: calcular_custo_total_lacos(solucao, parametros), number=repeticoes) / repeticoes
+    tempo_vetorizado = timeit.timeit(lambda: avaliar_solucao(solucao, parametros), number=repeticoes) / repeticoes
+
+    print(f"Instância: {caminho_instancia} (J={parametros['num_itens']}, T={parametros['num_periodos']}, N={parametros['num_pedidos']})")
+    print(f"FO: {vetorizado:.2f}")
+    print(f"Laços:      {tempo_lacos * 1e6:10.1f} us/chamada")
+    print(f"Vetorizado: {tempo_vetorizado * 1e6:10.1f} us/chamada")
+    print(f"Speedup:    {tempo_lacos / tempo_vetorizado:10.1f}x")
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    main(
+        argumentos[0] if len(argumentos) > 0 else "inst1_5.txt",
+        int(argumentos[1]) if len(argumentos) > 1 else 200,
+    )
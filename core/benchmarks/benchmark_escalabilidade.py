@@ -0,0 +1,323 @@
+"""
+Curvas de escalabilidade do carregamento, das heurísticas construtivas, da
+avaliação, do validador e do movimento de troca em instâncias sintéticas de
+tamanho crescente (ver `utils.gerador_instancias`).
+
+Para cada função e tamanho registra o tempo de parede (mediana das repetições),
+o pico de memória e as alocações líquidas medidas com `tracemalloc` (em uma
+execução separada, para não distorcer o tempo). Os resultados são gravados em
+JSON (por padrão no diretório temporário do sistema, fora da árvore de código)
+e, com `--baseline`, comparados com uma execução anterior: tempos ou picos de
+memória acima da tolerância são marcados como regressão e o processo termina
+com código 1.
+
+A velocidade da máquina varia bastante durante uma execução (em um mesmo
+processo, a mesma chamada chega a ficar 1.8x mais lenta por minutos). Por isso
+cada repetição é precedida por uma carga de referência fixa e a comparação usa
+o tempo relativo a ela, que acompanha essas variações.
+
+Uso (a partir do diretório core/):
+    python -m benchmarks.benchmark_escalabilidade -o baseline.json
+    python -m benchmarks.benchmark_escalabilidade --baseline baseline.json --tolerancia 0.3
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from utils.calcular_custo_total import calcular_custo_total
+from utils.carregar_parametros_otimizacao import carregar_parametros_otimizacao
+from utils.construir_solucao_grasp import construir_com_ordem_definida
+from utils.gerador_instancias import escrever_instancia, gerar_instancia
+from utils.gerar_solucao_inicial_hc1_atualizada import gerar_solucao_inicial_hc1_atualizada
+from utils.heuristicaInteiros import gerar_solucao_heuristica_original, validar_restricoes
+from utils.operacoes_vizinhanca import trocar_ordem_producao_2_itens
+from utils.sequenciamento import CACHE_SEQUENCIAMENTO
+
+# Execuções da carga de referência antes de cada repetição (vale a mais rápida)
+REPETICOES_REFERENCIA = 3
+
+# Tamanhos (J, T, N) padrão; a família completa de `gerador_instancias` vai bem além
+TAMANHOS_PADRAO = ((5, 5, 5), (25, 5, 50), (50, 10, 200), (100, 20, 500))
+
+FUNCOES = (
+    "carregar_parametros_otimizacao", "gerar_solucao_heuristica_original", "gerar_solucao_inicial_hc1_atualizada",
+    "construir_com_ordem_definida", "calcular_custo_total", "validar_restricoes", "trocar_ordem_producao_2_itens",
+)
+
+
+def _preparar_casos(caminho, semente):
+    """Chamadas (sem argumentos) medidas para uma instância, na ordem de FUNCOES."""
+    parametros = carregar_parametros_otimizacao(caminho)
+    ordem = list(range(parametros["num_pedidos"]))
+    random.Random(semente).shuffle(ordem)
+    solucao = construir_com_ordem_definida(parametros, ordem)
+
+    def construtor(funcao, *argumentos):
+        # O cache de sequenciamento é esvaziado para que cada repetição meça a construção completa
+        def chamar():
+            CACHE_SEQUENCIAMENTO.invalidar()
+            return funcao(parametros, *argumentos)
+        return chamar
+
+    def troca():
+        random.seed(semente)
+        return trocar_ordem_producao_2_itens(solucao, parametros)
+
+    return parametros, {
+        "carregar_parametros_otimizacao": lambda: carregar_parametros_otimizacao(caminho),
+        "gerar_solucao_heuristica_original": construtor(gerar_solucao_heuristica_original),
+        "gerar_solucao_inicial_hc1_atualizada": construtor(gerar_solucao_inicial_hc1_atualizada),
+        "construir_com_ordem_definida": construtor(construir_com_ordem_definida, ordem),
+        "calcular_custo_total": lambda: calcular_custo_total(solucao, parametros),
+        "validar_restricoes": lambda: validar_restricoes(solucao, parametros),
+        "trocar_ordem_producao_2_itens": troca,
+    }
+
+
+def _carga_referencia():
+    """Carga fixa de alguns milissegundos (laço Python, indexação NumPy, dicionário): régua da máquina."""
+    valores = np.arange(64.0)
+    tabela = {}
+    total = 0.0
+    for i in range(20000):
+        total += valores[i % 64] * 0.5
+        tabela[i % 97] = total
+    return total
+
+
+def medir(chamada, repeticoes):
+    """
+    Mede uma chamada: tempos de parede de cada repetição, também relativos ao
+    tempo da carga de referência medida logo antes de cada uma (o menor de
+    `REPETICOES_REFERENCIA`, para que um soluço da máquina não a distorça), e,
+    em uma execução adicional sob `tracemalloc`, o pico de memória e o saldo de
+    blocos e bytes alocados que permanecem vivos ao final (o resultado retornado
+    incluído).
+    """
+    tempos, relativos = [], []
+    for _ in range(repeticoes):
+        referencia = float("inf")
+        for _ in range(REPETICOES_REFERENCIA):
+            inicio = time.perf_counter()
+            _carga_referencia()
+            referencia = min(referencia, time.perf_counter() - inicio)
+        inicio = time.perf_counter()
+        chamada()
+        tempos.append(time.perf_counter() - inicio)
+        relativos.append(tempos[-1] / referencia)
+
+    tracemalloc.start()
+    try:
+        antes = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        resultado = chamada()
+        _, pico = tracemalloc.get_traced_memory()
+        diferencas = tracemalloc.take_snapshot().compare_to(antes, "filename")
+    finally:
+        tracemalloc.stop()
+    del resultado
+
+    return {
+        "tempo_mediana": statistics.median(tempos),
+        "tempo_minimo": min(tempos),
+        "tempos": tempos,
+        "tempo_relativo_mediana": statistics.median(relativos),
+        "tempos_relativos": relativos,
+        "memoria_pico": pico - base,
+        "blocos_alocados": sum(d.count_diff for d in diferencas),
+        "bytes_alocados": sum(d.size_diff for d in diferencas),
+    }
+
+
+def executar_benchmark(tamanhos=TAMANHOS_PADRAO, funcoes=FUNCOES, repeticoes=5, semente=0, limite_chamada=30.0,
+                       diretorio=None, ao_medir=None, baseline=None, tolerancia=0.3, confirmacoes=2):
+    """
+    Gera as instâncias e mede cada função em cada tamanho, do menor para o maior.
+    Uma função cuja chamada passar de `limite_chamada` segundos não é medida nos
+    tamanhos seguintes (registro com status "pulado").
+
+    Com `baseline`, um tempo que pareça regredir (`_regrediu_tempo`) é medido de
+    novo até `confirmacoes` vezes, ficando a medição de menor mediana relativa;
+    o número de novas medições fica em "remedicoes".
+
+    Returns:
+        dict: Metadados da execução e lista de resultados por função e tamanho.
+    """
+    referencia = _indexar(baseline) if baseline is not None else {}
+    resultados = []
+    esgotadas = set()
+    with tempfile.TemporaryDirectory() as temporario:
+        diretorio = diretorio or temporario
+        for indice, (J, T, N) in enumerate(tamanhos):
+            caminho = os.path.join(diretorio, f"escala_J{J}_T{T}_N{N}.txt")
+            if not os.path.exists(caminho):
+                escrever_instancia(gerar_instancia(J, T, N, semente=semente + indice), caminho)
+            _, casos = _preparar_casos(caminho, semente)
+            for funcao in funcoes:
+                registro = {"funcao": funcao, "tamanho": f"J{J}_T{T}_N{N}", "J": J, "T": T, "N": N}
+                if funcao in esgotadas:
+                    registro["status"] = "pulado"
+                else:
+                    registro.update(status="ok", **medir(casos[funcao], repeticoes))
+                    anterior = referencia.get((funcao, registro["tamanho"]))
+                    remedicoes = 0
+                    while (anterior is not None and remedicoes < confirmacoes
+                           and _regrediu_tempo(registro, anterior, tolerancia)):
+                        remedicoes += 1
+                        medicao = medir(casos[funcao], repeticoes)
+                        mediana = statistics.median(medicao["tempos_relativos"])
+                        if mediana < statistics.median(registro["tempos_relativos"]):
+                            registro.update(medicao)
+                    if remedicoes:
+                        registro["remedicoes"] = remedicoes
+                    if registro["tempo_mediana"] > limite_chamada:
+                        esgotadas.add(funcao)
+                resultados.append(registro)
+                if ao_medir is not None:
+                    ao_medir(registro)
+
+    return {
+        "data": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "plataforma": platform.platform(),
+        "repeticoes": repeticoes,
+        "semente": semente,
+        "resultados": resultados,
+    }
+
+
+def _indexar(execucao):
+    return {(r["funcao"], r["tamanho"]): r for r in execucao["resultados"] if r["status"] == "ok"}
+
+
+def _tempos_comparaveis(registro, anterior):
+    """Tempos relativos à carga de referência; os de parede se a baseline não os tiver."""
+    chave = "tempos_relativos" if "tempos_relativos" in anterior else "tempos"
+    return registro[chave], anterior[chave]
+
+
+def _regrediu_tempo(registro, anterior, tolerancia, limiar_tempo=5e-3):
+    """
+    Tempo pior que a baseline além do ruído: o mínimo e a mediana dos tempos
+    relativos passam de `(1 + tolerancia)` vezes os da baseline e nenhuma
+    repetição atual é tão rápida quanto a mais lenta da baseline (as repetições
+    das duas execuções não se sobrepõem). Tempos de parede abaixo de
+    `limiar_tempo` segundos nas duas execuções, dominados pelo ruído de medição,
+    nunca regridem.
+    """
+    if max(registro["tempo_minimo"], anterior["tempo_minimo"]) < limiar_tempo:
+        return False
+    atuais, anteriores = _tempos_comparaveis(registro, anterior)
+    limite = 1 + tolerancia
+    return (min(atuais) > limite * min(anteriores)
+            and statistics.median(atuais) > limite * statistics.median(anteriores)
+            and min(atuais) > max(anteriores))
+
+
+def comparar_com_baseline(atual, baseline, tolerancia=0.3, tolerancia_memoria=0.2, limiar_tempo=5e-3):
+    """
+    Compara duas execuções por (função, tamanho).
+
+    O pico de memória, determinístico, regride quando passa de
+    `(1 + tolerancia_memoria)` vezes o da baseline. O tempo só regride nas
+    condições de `_regrediu_tempo` (para a execução atual, já depois das novas
+    medições de `executar_benchmark`) e é reportado pela mediana dos tempos
+    relativos à carga de referência ("tempo_relativo_mediana").
+
+    Returns:
+        list: Dicionários com função, tamanho, métrica, valores e razão, um por regressão.
+    """
+    referencia = _indexar(baseline)
+    regressoes = []
+    for registro in atual["resultados"]:
+        anterior = referencia.get((registro["funcao"], registro["tamanho"]))
+        if registro["status"] != "ok" or anterior is None:
+            continue
+        for metrica in ("tempo_relativo_mediana", "memoria_pico"):
+            if metrica == "tempo_relativo_mediana":
+                if not _regrediu_tempo(registro, anterior, tolerancia, limiar_tempo):
+                    continue
+                atuais, anteriores = _tempos_comparaveis(registro, anterior)
+                valor, valor_anterior = statistics.median(atuais), statistics.median(anteriores)
+            else:
+                valor, valor_anterior = registro[metrica], anterior[metrica]
+                if valor <= (1 + tolerancia_memoria) * valor_anterior:
+                    continue
+            regressoes.append({
+                "funcao": registro["funcao"], "tamanho": registro["tamanho"], "metrica": metrica,
+                "atual": valor, "baseline": valor_anterior,
+                "razao": valor / valor_anterior if valor_anterior else float("inf"),
+            })
+    return regressoes
+
+
+def _formatar(registro):
+    if registro["status"] != "ok":
+        return f"{registro['tamanho']:>18} | {registro['funcao']:<38} | pulado"
+    return (f"{registro['tamanho']:>18} | {registro['funcao']:<38} | {registro['tempo_mediana'] * 1e3:10.2f} ms "
+            f"| pico {registro['memoria_pico'] / 1024:10.1f} KiB | {registro['blocos_alocados']:8d} blocos")
+
+
+def _tamanho(texto):
+    J, T, N = (int(v) for v in texto.lower().split("x"))
+    return (J, T, N)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidade das heurísticas e do avaliador.")
+    parser.add_argument("-t", "--tamanhos", nargs="+", type=_tamanho, default=list(TAMANHOS_PADRAO),
+                        help="Tamanhos no formato JxTxN (ex.: 50x10x200).")
+    parser.add_argument("-f", "--funcoes", nargs="+", choices=FUNCOES, default=list(FUNCOES))
+    parser.add_argument("-r", "--repeticoes", type=int, default=5)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--limite-chamada", type=float, default=30.0,
+                        help="Segundos por chamada acima dos quais a função deixa de ser medida nos tamanhos maiores.")
+    parser.add_argument("--diretorio-instancias", default=None,
+                        help="Diretório onde as instâncias geradas são mantidas entre execuções.")
+    parser.add_argument("-o", "--saida", default=os.path.join(tempfile.gettempdir(), "resultados_benchmark.json"),
+                        help="Arquivo JSON de resultados (padrão: no diretório temporário do sistema).")
+    parser.add_argument("--baseline", default=None, help="Resultados anteriores (JSON) para detectar regressões.")
+    parser.add_argument("--tolerancia", type=float, default=0.3,
+                        help="Aumento relativo tolerado do tempo relativo à carga de referência (padrão: 0.3).")
+    parser.add_argument("--tolerancia-memoria", type=float, default=0.2,
+                        help="Aumento relativo tolerado do pico de memória (padrão: 0.2).")
+    parser.add_argument("--confirmacoes", type=int, default=2,
+                        help="Novas medições de um tempo que pareça regredir (padrão: 2).")
+    args = parser.parse_args(argumentos)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as arquivo:
+            baseline = json.load(arquivo)
+    execucao = executar_benchmark(args.tamanhos, args.funcoes, args.repeticoes, args.semente, args.limite_chamada,
+                                  args.diretorio_instancias, ao_medir=lambda r: print(_formatar(r), flush=True),
+                                  baseline=baseline, tolerancia=args.tolerancia, confirmacoes=args.confirmacoes)
+    if baseline is not None:
+        execucao["regressoes"] = comparar_com_baseline(execucao, baseline, args.tolerancia, args.tolerancia_memoria)
+    with open(args.saida, "w") as arquivo:
+        json.dump(execucao, arquivo, indent=2)
+    print(f"Resultados gravados em {args.saida}")
+
+    if args.baseline:
+        for regressao in execucao["regressoes"]:
+            print(f"REGRESSÃO: {regressao['funcao']} em {regressao['tamanho']} ({regressao['metrica']}): "
+                  f"{regressao['baseline']:.6g} -> {regressao['atual']:.6g} ({regressao['razao']:.2f}x)")
+        if execucao["regressoes"]:
+            sys.exit(1)
+        print("Nenhuma regressão em relação à baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Custo do registro (logging) nas funções chamadas a cada movimento.
+
+Compara, por chamada, o movimento de troca e `calcular_custo_total` com o
+registro desligado por completo (`logging.disable`), no padrão silencioso de
+biblioteca, com rastro DEBUG em arquivo e com DEBUG no console (equivalente aos
+antigos `print`, aqui descartados em memória).
+
+Uso (a partir do diretório core/):
+    python -m benchmarks.benchmark_registro [caminho_instancia] [repeticoes]
+"""
+import contextlib
+import io
+import logging
+import os
+import random
+import sys
+import tempfile
+import timeit
+
+from utils.calcular_custo_total import calcular_custo_total
+from utils.carregar_parametros_otimizacao import carregar_parametros_otimizacao
+from utils.construir_solucao_grasp import construir_solucao_grasp
+from utils.operacoes_vizinhanca import trocar_ordem_producao_2_itens
+from utils.registro import configurar_registro, desativar_registro, obter_registrador
+
+
+@contextlib.contextmanager
+def _modo(nome, arquivo_rastro):
+    if nome == "desligado":
+        logging.disable(logging.CRITICAL)
+        try:
+            yield
+        finally:
+            logging.disable(logging.NOTSET)
+    elif nome == "padrao":
+        yield
+    elif nome == "rastro":
+        configurar_registro(arquivo_rastro=arquivo_rastro, console=False)
+        try:
+            yield
+        finally:
+            desativar_registro()
+    else:
+        with contextlib.redirect_stdout(io.StringIO()):
+            configurar_registro(logging.DEBUG)
+            try:
+                yield
+            finally:
+                desativar_registro()
+
+
+def main(caminho_instancia="inst1_5.txt", repeticoes=2000):
+    parametros = carregar_parametros_otimizacao(caminho_instancia)
+    solucao = construir_solucao_grasp(parametros, 0.3, rng=random.Random(0))
+    registrador = obter_registrador("utils.benchmark")
+
+    def troca():
+        random.seed(0)
+        trocar_ordem_producao_2_itens(solucao, parametros)
+
+    chamadas = {
+        "trocar_ordem_producao_2_itens": troca,
+        "calcular_custo_total": lambda: calcular_custo_total(solucao, parametros),
+        "registrador.debug": lambda: registrador.debug("Período %d, posições trocadas: %d e %d", 1, 2, 3),
+    }
+    modos = ("desligado", "padrao", "rastro", "console")
+
+    print(f"Instância: {caminho_instancia} (J={parametros['num_itens']}, T={parametros['num_periodos']}, N={parametros['num_pedidos']})")
+    print(f"{'função':<32}" + "".join(f"{modo:>14}" for modo in modos) + f"{'sobrecusto padrão':>20}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        arquivo_rastro = os.path.join(diretorio, "rastro.log")
+        for nome, chamada in chamadas.items():
+            tempos = {}
+            for modo in modos:
+                with _modo(modo, arquivo_rastro):
+                    # Melhor de 5 blocos, para reduzir o ruído da máquina
+                    tempos[modo] = min(timeit.repeat(chamada, number=repeticoes, repeat=5)) / repeticoes
+            sobrecusto = tempos["padrao"] / tempos["desligado"] - 1
+            print(f"{nome:<32}" + "".join(f"{tempos[modo] * 1e6:11.2f} us" for modo in modos) + f"{sobrecusto:19.1%}")
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    main(
+        argumentos[0] if len(argumentos) > 0 else "inst1_5.txt",
+        int(argumentos[1]) if len(argumentos) > 1 else 2000,
+    )
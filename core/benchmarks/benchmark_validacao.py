@@ -0,0 +1,132 @@
+"""
+Custo da verificação vetorizada das restrições (`validacao.verificar_restricoes`)
+nos dois formatos de solução, comparado com a versão original de
+`validar_restricoes` em laços e com o tempo de construção da solução verificada.
+
+A versão em laços cobre apenas parte do modelo (sem janelas, idades, balanço de
+estoque nem herança do setup), segue outra convenção para y e para na primeira
+violação; serve só como referência de tempo, e os veredictos podem diferir. O
+tempo é medido também em uma solução sem violações (nenhum pedido aceito), que
+obriga a percorrer todas as restrições.
+
+Uso (a partir do diretório core/):
+    python -m benchmarks.benchmark_validacao [caminho_instancia] [repeticoes]
+"""
+import random
+import sys
+import time
+import timeit
+
+import numpy as np
+
+from utils.carregar_parametros_otimizacao import carregar_parametros_otimizacao
+from utils.construir_solucao_grasp import construir_solucao_grasp
+from utils.gerar_solucao_inicial_hc1_atualizada import gerar_solucao_inicial_hc1_atualizada
+from utils.heuristicaInteiros import gerar_solucao_heuristica_original
+from utils.solucao import Solucao
+from utils.validacao import verificar_restricoes
+
+
+def validar_restricoes_lacos(solucao, parametros):
+    """Implementação original de validar_restricoes (laços em Python), usada como referência de tempo."""
+    N = parametros['num_pedidos']
+    J = parametros['num_itens']
+    T = parametros['num_periodos']
+    gamma = solucao['gamma']  # (N, T): 1 se pedido n é entregue em t
+    y = solucao['y']          # (J, T)
+    z = solucao['z']          # (J, J, T)
+    if isinstance(solucao, Solucao):
+        # x por pedido e a ordem V são derivados de Q e das sequências de produção
+        x = solucao.producao_por_pedido()  # (J, N, T)
+        V = solucao.ordem_producao()       # (J, T)
+    else:
+        x = solucao['x']          # (J, N, T): produção do item j do pedido n no período t
+        V = solucao['V']          # (J, T)
+    demanda = parametros['demanda_pedidos']  # (N, J)
+    tempo_prod = parametros['tempo_producao']  # (J,)
+    tempo_setup = parametros['tempo_setup']  # (J, J)
+    capacidade = parametros['capacidade_periodo']  # (T,)
+
+    # --- 1. Cada pedido entregue no máximo uma vez ---
+    if np.any(np.sum(gamma, axis=1) > 1):
+        return False
+
+    # --- 2. Produção acumulada até t deve atender demanda se gamma_nt = 1 ---
+    for n in range(N):
+        for j in range(J):
+            acumulado = 0
+            for t in range(T):
+                acumulado += x[j, n, t]
+                if gamma[n, t] == 1 and acumulado < demanda[n, j]:
+                    return False
+
+    # --- 3. Capacidade por período ---
+    for t in range(T):
+        tempo_usado = 0.0
+        for j in range(J):
+            producao_jt = sum(x[j, n, t] for n in range(N))
+            tempo_usado += tempo_prod[j] * producao_jt
+        tempo_usado += np.sum(tempo_setup * z[:, :, t])
+        if tempo_usado > capacidade[t]:
+            return False
+
+    # --- 4. Produção só se preparado ---
+    for j in range(J):
+        for t in range(T):
+            producao_jt = sum(x[j, n, t] for n in range(N))
+            if producao_jt > 0 and y[j, t] == 0:
+                return False
+
+    # --- 5. Sequenciamento: V_jt >= V_it + 1 se z_ijt = 1 ---
+    for t in range(T):
+        for i in range(J):
+            for j in range(J):
+                if i != j and z[i, j, t] == 1:
+                    if V[j, t] < V[i, t] + 1:
+                        return False
+
+    # --- 6. Conservação de setup (fluxo) ---
+    for t in range(T - 1):
+        for j in range(J):
+            entrada = y[j, t] + np.sum(z[:, j, t])
+            saida = np.sum(z[j, :, t]) + y[j, t + 1]
+            if entrada != saida:
+                return False
+
+    return True
+
+
+def main(caminho_instancia="inst1_5.txt", repeticoes=20):
+    parametros = carregar_parametros_otimizacao(caminho_instancia)
+    construtores = {
+        "vazia": Solucao.vazia,
+        "grasp": lambda p: construir_solucao_grasp(p, 0.3, rng=random.Random(0)),
+        "hc1": gerar_solucao_inicial_hc1_atualizada,
+        "heuristica_original": gerar_solucao_heuristica_original,
+    }
+
+    print(f"Instância: {caminho_instancia} (J={parametros['num_itens']}, T={parametros['num_periodos']}, N={parametros['num_pedidos']})")
+    for nome, construtor in construtores.items():
+        inicio = time.perf_counter()
+        solucao = construtor(parametros)
+        tempo_construcao = time.perf_counter() - inicio
+        por_pedido = {"x": solucao.producao_por_pedido(), "V": solucao.ordem_producao(),
+                      "gamma": solucao.gamma, "y": solucao.y, "z": solucao.z}
+        relatorio = verificar_restricoes(solucao, parametros)
+        assert relatorio.viavel == verificar_restricoes(por_pedido, parametros).viavel, nome
+
+        tempo_lacos = timeit.timeit(lambda: validar_restricoes_lacos(solucao, parametros), number=repeticoes) / repeticoes
+        tempo_vetorizado = timeit.timeit(lambda: verificar_restricoes(solucao, parametros), number=repeticoes) / repeticoes
+        tempo_por_pedido = timeit.timeit(lambda: verificar_restricoes(por_pedido, parametros), number=repeticoes) / repeticoes
+        print(f"{nome:<20} viável={relatorio.viavel!s:<5} violações={len(relatorio):<6} "
+              f"laços {tempo_lacos * 1e3:9.2f} ms | vetorizado {tempo_vetorizado * 1e3:8.2f} ms "
+              f"(por pedido {tempo_por_pedido * 1e3:8.2f} ms) | {tempo_lacos / tempo_vetorizado:7.1f}x "
+              f"| {tempo_vetorizado / tempo_construcao:6.1%} da construção")
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    main(
+        argumentos[0] if len(argumentos) > 0 else "inst1_5.txt",
+        int(argumentos[1]) if len(argumentos) > 1 else 20,
+    )
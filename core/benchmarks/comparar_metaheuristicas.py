@@ -0,0 +1,77 @@
+"""
+Comparação anytime do recozimento simulado e da busca local iterada.
+
+Cada configuração parte da mesma solução construída pelo GRASP e roda com o
+mesmo orçamento de tempo para cada semente. Os traços de convergência (tempo x
+melhor FO) são gravados em JSON, e a tabela mostra a melhor FO média em frações
+do orçamento e ao final (a última busca local pode terminar um pouco depois do
+limite), com o gap médio final em relação ao limitante superior.
+
+Uso (a partir do diretório core/):
+    python -m benchmarks.comparar_metaheuristicas [caminho_instancia] [tempo_limite] [num_sementes] [saida]
+
+Sem `saida`, os traços vão para o diretório temporário do sistema, fora da
+árvore de código.
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+
+import numpy as np
+
+from utils.carregar_parametros_otimizacao import carregar_parametros_otimizacao
+from utils.construir_solucao_grasp import construir_solucao_grasp
+from utils.limitantes import calcular_gap, limitante_superior
+from utils.metaheuristica import busca_local_iterada, recozimento_simulado
+
+CONFIGURACOES = {
+    "sa_geometrico": (recozimento_simulado, {"esquema": "geometrico"}),
+    "sa_linear": (recozimento_simulado, {"esquema": "linear"}),
+    "sa_lundy_mees": (recozimento_simulado, {"esquema": "lundy_mees"}),
+    "ils_melhora": (busca_local_iterada, {"criterio_aceitacao": "melhora", "forca_maxima": 6}),
+    "ils_recozimento": (busca_local_iterada, {"criterio_aceitacao": "recozimento", "forca_maxima": 6}),
+}
+FRACOES = (0.1, 0.25, 0.5)
+
+
+def main(caminho_instancia="inst1_5.txt", tempo_limite=10.0, num_sementes=3, saida=None):
+    if saida is None:
+        saida = os.path.join(tempfile.gettempdir(), "tracos_metaheuristicas.json")
+    parametros = carregar_parametros_otimizacao(caminho_instancia)
+    inicial = construir_solucao_grasp(parametros, 0.3, rng=random.Random(0))
+    limitante = limitante_superior(parametros).valor
+
+    tracos = {}
+    print(f"Instância: {caminho_instancia} | orçamento: {tempo_limite}s | sementes: {num_sementes} "
+          f"| limitante superior: {limitante:.2f}")
+    print(f"{'configuração':<18}" + "".join(f"{f'{fracao:.0%} do tempo':>16}" for fracao in FRACOES)
+          + f"{'final':>16}{'gap':>10}")
+    for nome, (metodo, opcoes) in CONFIGURACOES.items():
+        tracos[nome] = []
+        for semente in range(num_sementes):
+            resultado = metodo(inicial, parametros, tempo_limite=tempo_limite, semente=semente, limitante=limitante,
+                               **opcoes)
+            tracos[nome].append(resultado.traco)
+        medias = [np.mean([traco.melhor_fo_em(fracao * tempo_limite) for traco in tracos[nome]]) for fracao in FRACOES]
+        medias.append(np.mean([traco.pontos[-1][2] for traco in tracos[nome]]))
+        print(f"{nome:<18}" + "".join(f"{media:16.2f}" for media in medias)
+              + f"{calcular_gap(medias[-1], limitante):10.2%}", flush=True)
+
+    with open(saida, "w") as arquivo:
+        json.dump({
+            "instancia": caminho_instancia, "tempo_limite": tempo_limite, "limitante": limitante,
+            "tracos": {nome: [traco.como_dict() for traco in lista] for nome, lista in tracos.items()},
+        }, arquivo, indent=2)
+    print(f"Traços gravados em {saida}")
+
+
+if __name__ == "__main__":
+    argumentos = sys.argv[1:]
+    main(
+        argumentos[0] if len(argumentos) > 0 else "inst1_5.txt",
+        float(argumentos[1]) if len(argumentos) > 1 else 10.0,
+        int(argumentos[2]) if len(argumentos) > 2 else 3,
+        argumentos[3] if len(argumentos) > 3 else None,
+    )
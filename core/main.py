@@ -9,6 +9,13 @@ from utils.gerar_solucao_inicial_hc1_atualizada import gerar_solucao_inicial_hc1
 from utils.operacoes_vizinhanca import *
 from utils.construir_solucao_grasp import construir_solucao_grasp
 from utils.heuristicaInteiros import *
+from utils.instrumentacao import INSTRUMENTACAO
+from utils.limitantes import calcular_gap, limitante_superior
+from utils.registro import configurar_registro
+
+import logging
+import os
+import sys
 
 import numpy as np
 import random
@@ -30,7 +37,7 @@ def imprimir_solucao(solucao, parametros):
     producao_encontrada = False
     for j in range(parametros["num_itens"]):
         for t in range(parametros["num_periodos"]):
-            if solucao.get("x", {}).get(j, {}).get(t, 0) > 0:
+            if solucao["x"][j][t] > 0:
                 print(f"x[{j}][{t}]: {solucao['x'][j][t]}")
                 producao_encontrada = True
     if not producao_encontrada:
@@ -41,7 +48,7 @@ def imprimir_solucao(solucao, parametros):
     pedidos_atendidos = False
     for n in range(parametros["num_pedidos"]):
         for t in range(parametros["num_periodos"]):
-            if solucao.get("gamma", {}).get(n, {}).get(t, 0) == 1:
+            if solucao["gamma"][n][t] == 1:
                 print(f"gamma[{n}][{t}]: {solucao['gamma'][n][t]}")
                 pedidos_atendidos = True
     if not pedidos_atendidos:
@@ -51,7 +58,7 @@ def imprimir_solucao(solucao, parametros):
     print("\n--- Sequência de Produção por Período ---")
     sequencia_encontrada = False
     for t in range(parametros["num_periodos"]):
-        if solucao.get("sequencias_producao", {}).get(t):
+        if solucao["sequencias_producao"].get(t):
             print(f"Período {t}: {solucao['sequencias_producao'][t]}")
             sequencia_encontrada = True
     if not sequencia_encontrada:
@@ -60,7 +67,16 @@ def imprimir_solucao(solucao, parametros):
 
 
 if __name__ == "__main__":
-    caminho_arquivo_dados = (r"C:\Users\User\Downloads\aplicacaoMestrado\PDSLAP_Metaheuristica\core\inst0_1.txt")
+    # Instância passada na linha de comando ou, por padrão, inst0_1.txt ao lado deste arquivo.
+    # Para grades de experimentos (várias instâncias, algoritmos e sementes), use `python -m utils.experimentos`.
+    if len(sys.argv) > 1:
+        caminho_arquivo_dados = sys.argv[1]
+    else:
+        caminho_arquivo_dados = os.path.join(os.path.dirname(os.path.abspath(__file__)), "inst0_1.txt")
+
+    # As heurísticas são silenciosas como biblioteca; aqui o registro vai para o console
+    # e, se PDSLAP_RASTRO apontar para um arquivo, o rastro completo (DEBUG) é gravado nele.
+    configurar_registro(logging.INFO, arquivo_rastro=os.environ.get("PDSLAP_RASTRO"))
 
     # 1. Carregar os parâmetros
     parametros = carregar_parametros_otimizacao(caminho_arquivo_dados)
@@ -161,41 +177,42 @@ if __name__ == "__main__":
 # print(f"\nValor da Função Objetivo (GRASP, alpha={alpha_grasp}): {valor_fo_grasp}")
 # print("-" * 50)
 
-# Heurística
-solucao_heur = gerar_solucao_heuristica_original(parametros)
-valor_final = calcular_FO(solucao_heur, parametros)
-
-# Verificar viabilidade
-if validar_restricoes(solucao_heur, parametros):
-    print("Solução viável!")
-else:
-    print("Solução aproximada - algumas restrições podem precisar de ajuste.")
-
-print("\n--- Heuristica Finalizada ---")
-print(f"Melhor valor de função objetivo encontrado: {valor_final:.2f}")
-
-# Extrair e imprimir pedidos aceitos (iterando sobre o array gamma)
-print("\nPedidos aceitos (pedido, período):")
-gamma = solucao_heur['gamma']  # Array (N, T)
-encontrou = False
-for n in range(gamma.shape[0]):  # Para cada pedido n
-    for t in range(gamma.shape[1]):  # Para cada período t
-        if gamma[n, t] == 1:
-            print(f" - Pedido {n+1} no período {t+1}")
-            encontrou = True
-if not encontrou:
-    print(" - Nenhum pedido aceito.")
-
-# Extrair e imprimir sequências de produção por período (derivadas de V e z)
-print("\nSequências de produção por período:")
-V = solucao_heur['V']  # Array (J, T)
-z = solucao_heur['z']  # Array (J, J, T)
-for t in range(V.shape[1]):  # Para cada período t
-    # Encontrar itens produzidos (onde V[j, t] > 0 ou há setups)
-    itens_t = [j for j in range(V.shape[0]) if V[j, t] > 0 or np.sum(z[:, j, t]) > 0 or np.sum(z[j, :, t]) > 0]
-    if itens_t:
-        # Ordenar por V[j, t] (ordem de produção)
-        seq = sorted(itens_t, key=lambda j: V[j, t])
-        print(f" - Período {t+1}: {seq}")
+    # Heurística
+    solucao_heur = gerar_solucao_heuristica_original(parametros)
+    valor_final = calcular_FO(solucao_heur, parametros)
+
+    # Verificar viabilidade
+    if validar_restricoes(solucao_heur, parametros):
+        print("Solução viável!")
     else:
-        print(f" - Período {t+1}: Nenhuma sequência (sem produção).")
\ No newline at end of file
+        print("Solução aproximada - algumas restrições podem precisar de ajuste.")
+
+    print("\n--- Heuristica Finalizada ---")
+    print(f"Melhor valor de função objetivo encontrado: {valor_final:.2f}")
+    limitante = limitante_superior(parametros).valor
+    print(f"Limitante superior: {limitante:.2f} (gap: {calcular_gap(valor_final, limitante):.2%})")
+
+    # Extrair e imprimir pedidos aceitos (iterando sobre o array gamma)
+    print("\nPedidos aceitos (pedido, período):")
+    gamma = solucao_heur['gamma']  # Array (N, T)
+    encontrou = False
+    for n in range(gamma.shape[0]):  # Para cada pedido n
+        for t in range(gamma.shape[1]):  # Para cada período t
+            if gamma[n, t] == 1:
+                print(f" - Pedido {n+1} no período {t+1}")
+                encontrou = True
+    if not encontrou:
+        print(" - Nenhum pedido aceito.")
+
+    # Extrair e imprimir sequências de produção por período
+    print("\nSequências de produção por período:")
+    for t, seq in solucao_heur['sequencias_producao'].items():
+        if seq:
+            print(f" - Período {t+1}: {seq}")
+        else:
+            print(f" - Período {t+1}: Nenhuma sequência (sem produção).")
+
+    # Com PDSLAP_INSTRUMENTACAO=1, imprime o perfil dos pontos quentes da execução
+    if INSTRUMENTACAO.ativa:
+        print("\n--- Perfil de Execução ---")
+        print(INSTRUMENTACAO.relatorio())
@@ -0,0 +1,227 @@
+"""
+Backend compilado (Numba) opcional para os núcleos numéricos mais internos:
+sequenciamento intra-período (gulosa, 2-opt/Or-opt e Held-Karp) e recursão do
+estoque por idade usada na avaliação incremental.
+
+Os núcleos recebem apenas arrays e escalares (as matrizes da instância vindas
+de `carregar_parametros_otimizacao`) e reproduzem exatamente as escolhas das
+versões NumPy, inclusive os desempates, de modo que o resultado não depende do
+backend. Sem o Numba instalado, ou com a variável de ambiente `PDSLAP_JIT=0`,
+os módulos consumidores usam as versões NumPy. A compilação acontece na
+primeira chamada e fica em cache no disco (`cache=True`).
+
+    from utils.aceleracao import usar_backend
+    with usar_backend("numpy"):
+        construir_com_ordem_definida(parametros, ordem)
+"""
+import os
+from contextlib import contextmanager
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:  # Numba é opcional: os núcleos ficam em Python e não são usados
+    numba = None
+
+JIT_DISPONIVEL = numba is not None
+BACKENDS = ("numba", "numpy")
+
+_backend = "numba" if JIT_DISPONIVEL and os.environ.get("PDSLAP_JIT", "1") != "0" else "numpy"
+
+
+def backend_ativo():
+    """Nome do backend em uso ("numba" ou "numpy")."""
+    return _backend
+
+
+def usar_jit():
+    return _backend == "numba"
+
+
+def definir_backend(nome):
+    """
+    Seleciona o backend dos núcleos para o processo corrente.
+
+    Returns:
+        str: Backend anterior.
+    """
+    global _backend
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: {nome}. Use um de {BACKENDS}.")
+    if nome == "numba" and not JIT_DISPONIVEL:
+        raise ValueError("Backend 'numba' indisponível: o pacote numba não está instalado.")
+    anterior, _backend = _backend, nome
+    return anterior
+
+
+@contextmanager
+def usar_backend(nome):
+    """Usa o backend `nome` dentro do bloco e restaura o anterior ao sair."""
+    anterior = definir_backend(nome)
+    try:
+        yield
+    finally:
+        definir_backend(anterior)
+
+
+def _compilar(funcao):
+    return numba.njit(cache=True)(funcao) if JIT_DISPONIVEL else funcao
+
+
+@_compilar
+def caminho_guloso(custos, inicio):
+    """
+    Vizinho mais próximo a partir de `inicio` sobre todos os nós de `custos`;
+    empates vão para o menor índice.
+
+    Returns:
+        numpy.ndarray: Ordem de visita dos nós (começando em `inicio`).
+    """
+    m = custos.shape[0]
+    visitado = np.zeros(m, dtype=np.bool_)
+    ordem = np.empty(m, dtype=np.int64)
+    ordem[0] = inicio
+    visitado[inicio] = True
+    for posicao in range(1, m):
+        atual = ordem[posicao - 1]
+        melhor, melhor_custo = -1, np.inf
+        for j in range(m):
+            if not visitado[j] and (melhor < 0 or custos[atual, j] < melhor_custo):
+                melhor, melhor_custo = j, custos[atual, j]
+        ordem[posicao] = melhor
+        visitado[melhor] = True
+    return ordem
+
+
+@_compilar
+def _melhor_dois_opt(circuito, custos):
+    k = circuito.shape[0] - 2
+    ida = np.zeros(k + 2)
+    volta = np.zeros(k + 2)
+    for i in range(k + 1):
+        ida[i + 1] = ida[i] + custos[circuito[i], circuito[i + 1]]
+        volta[i + 1] = volta[i] + custos[circuito[i + 1], circuito[i]]
+    melhor, melhor_a, melhor_b = np.inf, 1, 1
+    for a in range(1, k + 1):
+        for b in range(a + 1, k + 1):
+            delta = (custos[circuito[a - 1], circuito[b]] + custos[circuito[a], circuito[b + 1]]
+                     - custos[circuito[a - 1], circuito[a]] - custos[circuito[b], circuito[b + 1]]
+                     + (volta[b] - volta[a]) - (ida[b] - ida[a]))
+            if delta < melhor:
+                melhor, melhor_a, melhor_b = delta, a, b
+    return melhor, melhor_a, melhor_b
+
+
+@_compilar
+def _melhor_or_opt(circuito, custos, tamanho_maximo):
+    k = circuito.shape[0] - 2
+    melhor, melhor_a, melhor_b, melhor_e = np.inf, 0, 0, 0
+    for tamanho in range(1, min(tamanho_maximo, k - 1) + 1):
+        melhor_tamanho, a_tamanho, e_tamanho = np.inf, 0, 0
+        for a in range(1, k - tamanho + 2):
+            b = a + tamanho - 1
+            remocao = (custos[circuito[a - 1], circuito[a]] + custos[circuito[b], circuito[b + 1]]
+                       - custos[circuito[a - 1], circuito[b + 1]])
+            for e in range(k + 1):
+                if a - 2 < e < b + 1:
+                    continue
+                insercao = (custos[circuito[e], circuito[a]] + custos[circuito[b], circuito[e + 1]]
+                            - custos[circuito[e], circuito[e + 1]])
+                if insercao - remocao < melhor_tamanho:
+                    melhor_tamanho, a_tamanho, e_tamanho = insercao - remocao, a, e
+        if melhor_tamanho < melhor:
+            melhor, melhor_a, melhor_b, melhor_e = melhor_tamanho, a_tamanho, a_tamanho + tamanho - 1, e_tamanho
+    return melhor, melhor_a, melhor_b, melhor_e
+
+
+@_compilar
+def melhorar_circuito(circuito, custos, max_passadas):
+    """
+    2-opt e Or-opt (melhor melhora) sobre o circuito até um ótimo local ou até
+    `max_passadas` melhorias (negativo: sem limite); mesmas escolhas de
+    `sequenciamento.sequencia_melhorada`.
+
+    Returns:
+        numpy.ndarray: Circuito melhorado (o extremo fictício é mantido nas pontas).
+    """
+    circuito = circuito.copy()
+    passadas = 0
+    while max_passadas < 0 or passadas < max_passadas:
+        delta_2opt, a, b = _melhor_dois_opt(circuito, custos)
+        delta_or, a_or, b_or, e = _melhor_or_opt(circuito, custos, 3)
+        if min(delta_2opt, delta_or) >= -1e-9:
+            break
+        if delta_2opt <= delta_or:
+            circuito[a:b + 1] = circuito[a:b + 1][::-1].copy()
+        else:
+            segmento = circuito[a_or:b_or + 1].copy()
+            resto = np.concatenate((circuito[:a_or], circuito[b_or + 1:]))
+            posicao = e + 1 if e < a_or else e + 1 - segmento.shape[0]
+            circuito = np.concatenate((resto[:posicao], segmento, resto[posicao:]))
+        passadas += 1
+    return circuito
+
+
+@_compilar
+def held_karp(custos):
+    """
+    Caminho de menor custo que parte do nó fictício k (último de `custos`) e
+    visita os nós 0..k-1, por programação dinâmica sobre subconjuntos; empates
+    como na versão vetorizada de `sequenciamento.sequencia_exata`.
+
+    Returns:
+        numpy.ndarray: Ordem de visita dos nós 0..k-1.
+    """
+    k = custos.shape[0] - 1
+    dp = np.full((1 << k, k), np.inf)
+    pai = np.full((1 << k, k), -1, dtype=np.int64)
+    for j in range(k):
+        dp[1 << j, j] = custos[k, j]
+    # Todo subconjunto S sem j é numericamente menor que S: basta percorrer as máscaras em ordem
+    for mascara in range(1, 1 << k):
+        if mascara & (mascara - 1) == 0:
+            continue
+        for j in range(k):
+            if not mascara & (1 << j):
+                continue
+            anterior = mascara ^ (1 << j)
+            melhor, melhor_i = np.inf, -1
+            for i in range(k):
+                valor = dp[anterior, i] + custos[i, j]
+                if valor < melhor:
+                    melhor, melhor_i = valor, i
+            dp[mascara, j] = melhor
+            pai[mascara, j] = melhor_i
+
+    mascara = (1 << k) - 1
+    j = int(np.argmin(dp[mascara]))
+    ordem = np.empty(k, dtype=np.int64)
+    for posicao in range(k - 1, -1, -1):
+        ordem[posicao] = j
+        mascara, j = mascara ^ (1 << j), pai[mascara, j]
+    return ordem
+
+
+@_compilar
+def estoque_por_idade(producao, consumo, vida):
+    """
+    Estoque por idade (T, K) de um item: a cada período os lotes envelhecem
+    um período (os com idade acima de `vida` são descartados), a produção
+    entra com idade 0 e o consumo é debitado; o saldo negativo é propagado e o
+    estoque reportado é truncado em zero, como em `EstadoIncremental`.
+    """
+    T, K = consumo.shape
+    estoque = np.zeros((T, K), dtype=np.int64)
+    anterior = np.zeros(K, dtype=np.int64)
+    atual = np.zeros(K, dtype=np.int64)
+    for t in range(T):
+        atual[:] = 0
+        for k in range(vida, 0, -1):
+            atual[k] = anterior[k - 1]
+        atual[0] += producao[t]
+        for k in range(vida + 1):
+            atual[k] -= consumo[t, k]
+            estoque[t, k] = max(atual[k], 0)
+        anterior[:] = atual
+    return estoque
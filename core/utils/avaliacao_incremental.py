@@ -0,0 +1,415 @@
+import numpy as np
+
+from .aceleracao import estoque_por_idade, usar_jit
+from .calcular_custo_total import avaliar_solucao
+from .indice_instancia import obter_indice
+from .instrumentacao import INSTRUMENTACAO, cronometrado
+from .solucao import Solucao
+
+
+class PlanoMovimento:
+    """
+    Conjunto de alterações propostas por um movimento, ainda não aplicadas.
+
+    Attributes:
+        delta_x (dict): {(j, t): variação da produção}.
+        delta_Q (dict): {(j, n, t, k): variação do consumo}.
+        gamma (dict): {(n, t): novo valor de gamma}.
+        sequencias (dict): {t: nova sequência de produção do período t}.
+    """
+
+    def __init__(self):
+        self.delta_x = {}
+        self.delta_Q = {}
+        self.gamma = {}
+        self.sequencias = {}
+        # Estoques recalculados durante a avaliação, reaproveitados na aplicação
+        self._estoques = {}
+
+    def produzir(self, j, t, quantidade):
+        self.delta_x[(j, t)] = self.delta_x.get((j, t), 0) + quantidade
+
+    def consumir(self, j, n, t, k, quantidade):
+        self.delta_Q[(j, n, t, k)] = self.delta_Q.get((j, n, t, k), 0) + quantidade
+
+
+class EstadoIncremental:
+    """
+    Estado auxiliar para avaliação incremental (delta) de movimentos sobre uma Solucao.
+
+    Mantém em cache o tempo consumido por período (produção + setup) e o valor da
+    FO, de modo que um movimento possa ser precificado a partir apenas das matrizes
+    `custo_setup` e `tempo_setup`, sem construir a solução vizinha. Os movimentos
+    só alteram a solução quando aplicados explicitamente.
+
+    Convenção de setup entre períodos: a máquina permanece preparada para o último
+    item produzido, inclusive através de períodos sem produção. Assim, o arco de
+    entrada de um período parte do último item do período ocupado anterior.
+    """
+
+    def __init__(self, solucao, parametros):
+        if not isinstance(solucao, Solucao):
+            solucao = Solucao.de_dict(solucao, parametros)
+        self.solucao = solucao
+        self.parametros = parametros
+        self.custo_setup = parametros["custo_setup"]
+        self.tempo_setup = parametros["tempo_setup"]
+        self.tempo_producao = parametros["tempo_producao"]
+        self.capacidade = parametros["capacidade_periodo"]
+        self.num_periodos = parametros["num_periodos"]
+
+        self.receita_pedido = parametros["receita_pedido"]
+        self.custo_estoque = parametros["custo_estoque"]
+        self.vida_util = parametros["vida_util"]
+        self.indice = obter_indice(parametros)
+
+        self.fo = avaliar_solucao(solucao, parametros).lucro
+        self.tempo_usado = np.zeros(self.num_periodos, dtype=float)
+        for t in range(self.num_periodos):
+            self.tempo_usado[t] = self._tempo_periodo(t)
+
+        # Índices de Q por lote de produção (j, t - k) e por pedido n
+        self.chaves_por_lote = {}
+        self.chaves_por_pedido = {}
+        for chave in solucao.Q:
+            self._indexar_chave_Q(chave)
+
+    # --- Consultas auxiliares ---
+    def item_anterior(self, t):
+        """Último item produzido antes do período t, ou None se não houver."""
+        seqs = self.solucao.sequencias_producao
+        for t_ant in range(t - 1, -1, -1):
+            if seqs[t_ant]:
+                return seqs[t_ant][-1]
+        return None
+
+    def proximo_periodo_ocupado(self, t):
+        """Primeiro período após t com produção, ou None se não houver."""
+        seqs = self.solucao.sequencias_producao
+        for t_seg in range(t + 1, self.num_periodos):
+            if seqs[t_seg]:
+                return t_seg
+        return None
+
+    def custo_arco(self, i, j):
+        """Custo de setup da troca i -> j (nulo se não houver troca)."""
+        if i is None or j is None or i == j:
+            return 0
+        return self.custo_setup[i][j]
+
+    def tempo_arco(self, i, j):
+        """Tempo de setup da troca i -> j (nulo se não houver troca)."""
+        if i is None or j is None or i == j:
+            return 0
+        return self.tempo_setup[i][j]
+
+    def _tempo_periodo(self, t):
+        seq = self.solucao.sequencias_producao[t]
+        if not seq:
+            return 0.0
+        tempo = float(np.dot(self.tempo_producao, self.solucao.x[:, t]))
+        anterior = self.item_anterior(t)
+        for item in seq:
+            tempo += self.tempo_arco(anterior, item)
+            anterior = item
+        return tempo
+
+    def folga(self, t):
+        """Capacidade ainda disponível no período t."""
+        return self.capacidade[t] - self.tempo_usado[t]
+
+    def respeita_capacidade(self, t, tempo_novo):
+        """
+        Critério de capacidade dos movimentos: o período deve caber na capacidade
+        ou, se já estava violado, não pode piorar.
+        """
+        cabe = tempo_novo <= max(self.capacidade[t], self.tempo_usado[t]) + 1e-6
+        if INSTRUMENTACAO.ativa:
+            INSTRUMENTACAO.registrar_resultado("capacidade.movimento", cabe)
+        return cabe
+
+    def _indexar_chave_Q(self, chave):
+        j, n, t, k = chave
+        self.chaves_por_lote.setdefault((j, t - k), set()).add(chave)
+        self.chaves_por_pedido.setdefault(n, set()).add(chave)
+
+    def _desindexar_chave_Q(self, chave):
+        j, n, t, k = chave
+        self.chaves_por_lote[(j, t - k)].discard(chave)
+        self.chaves_por_pedido[n].discard(chave)
+
+    def consumo_lote(self, j, t):
+        """Quantidade do lote do item j produzido em t já consumida por pedidos."""
+        Q = self.solucao.Q
+        return sum(Q[chave] for chave in self.chaves_por_lote.get((j, t), ()))
+
+    def sobra_lote(self, j, t):
+        """Quantidade do lote do item j produzido em t ainda não destinada a pedidos."""
+        return self.solucao.x[j, t] - self.consumo_lote(j, t)
+
+    # --- Troca de dois itens no mesmo período ---
+    def _arcos_troca(self, t, idx1, idx2):
+        """
+        Arcos removidos e inseridos pela troca das posições idx1 e idx2 do período t.
+
+        Returns:
+            tuple: (arcos_antigos, arcos_novos, t_seguinte), onde cada arco é uma
+                   tupla (i, j, periodo) e t_seguinte é o período ocupado seguinte
+                   (afetado apenas se a troca envolver a última posição).
+        """
+        seq = self.solucao.sequencias_producao[t]
+        a, b = min(idx1, idx2), max(idx1, idx2)
+        ultimo = len(seq) - 1
+        item_a, item_b = seq[a], seq[b]
+
+        antes_a = seq[a - 1] if a > 0 else self.item_anterior(t)
+        t_seguinte = None
+        if b < ultimo:
+            depois_b, periodo_depois_b = seq[b + 1], t
+        else:
+            t_seguinte = self.proximo_periodo_ocupado(t)
+            depois_b = self.solucao.sequencias_producao[t_seguinte][0] if t_seguinte is not None else None
+            periodo_depois_b = t_seguinte
+
+        if b == a + 1:
+            antigos = [(antes_a, item_a, t), (item_a, item_b, t), (item_b, depois_b, periodo_depois_b)]
+            novos = [(antes_a, item_b, t), (item_b, item_a, t), (item_a, depois_b, periodo_depois_b)]
+        else:
+            antigos = [(antes_a, item_a, t), (item_a, seq[a + 1], t),
+                       (seq[b - 1], item_b, t), (item_b, depois_b, periodo_depois_b)]
+            novos = [(antes_a, item_b, t), (item_b, seq[a + 1], t),
+                     (seq[b - 1], item_a, t), (item_a, depois_b, periodo_depois_b)]
+        return antigos, novos, t_seguinte
+
+    @cronometrado("avaliacao.troca")
+    def avaliar_troca(self, t, idx1, idx2):
+        """
+        Precifica a troca das posições idx1 e idx2 da sequência do período t em O(1).
+
+        Apenas os (no máximo quatro) arcos de setup em torno das posições trocadas
+        mudam, além do arco de entrada do próximo período ocupado quando a última
+        posição é envolvida. Produção, estoque e receita não são alterados.
+
+        Returns:
+            tuple: (delta_fo, viavel), onde delta_fo = FO(vizinho) - FO(atual) e
+                   viavel indica se a capacidade dos períodos afetados é respeitada.
+        """
+        if idx1 == idx2:
+            return 0.0, True
+        antigos, novos, t_seguinte = self._arcos_troca(t, idx1, idx2)
+
+        delta_custo = 0.0
+        delta_tempo = {}
+        for sinal, arcos in ((-1, antigos), (1, novos)):
+            for i, j, periodo in arcos:
+                if periodo is None:
+                    continue
+                delta_custo += sinal * self.custo_arco(i, j)
+                delta_tempo[periodo] = delta_tempo.get(periodo, 0.0) + sinal * self.tempo_arco(i, j)
+
+        viavel = all(self.respeita_capacidade(p, self.tempo_usado[p] + dt) for p, dt in delta_tempo.items())
+        return float(-delta_custo), bool(viavel)
+
+    def aplicar_troca(self, t, idx1, idx2):
+        """
+        Aplica in-place a troca avaliada por `avaliar_troca`, atualizando a
+        sequência, y, z, o tempo usado por período e a FO em cache.
+
+        Returns:
+            float: delta_fo aplicado.
+        """
+        if idx1 == idx2:
+            return 0.0
+        delta_fo, _ = self.avaliar_troca(t, idx1, idx2)
+        antigos, novos, _ = self._arcos_troca(t, idx1, idx2)
+        solucao = self.solucao
+
+        for i, j, periodo in antigos:
+            if periodo is not None and i is not None and j is not None and i != j:
+                solucao.z[i, j, periodo] = 0
+                self.tempo_usado[periodo] -= self.tempo_setup[i][j]
+        for i, j, periodo in novos:
+            if periodo is not None and i is not None and j is not None and i != j:
+                solucao.z[i, j, periodo] = 1
+                self.tempo_usado[periodo] += self.tempo_setup[i][j]
+
+        seq = solucao.sequencias_producao[t]
+        seq[idx1], seq[idx2] = seq[idx2], seq[idx1]
+        if idx1 == 0 or idx2 == 0:
+            solucao.y[:, t] = 0
+            solucao.y[seq[0], t] = 1
+
+        self.fo += delta_fo
+        return delta_fo
+
+    # --- Movimentos genéricos descritos por um PlanoMovimento ---
+    def sequencia(self, t, plano=None):
+        """Sequência do período t, considerando as alterações do plano (se houver)."""
+        if plano is not None and t in plano.sequencias:
+            return plano.sequencias[t]
+        return self.solucao.sequencias_producao[t]
+
+    def _item_anterior_plano(self, t, plano):
+        for t_ant in range(t - 1, -1, -1):
+            seq = self.sequencia(t_ant, plano)
+            if seq:
+                return seq[-1]
+        return None
+
+    def _proximo_ocupado_plano(self, t, plano):
+        for t_seg in range(t + 1, self.num_periodos):
+            if self.sequencia(t_seg, plano):
+                return t_seg
+        return None
+
+    def _setup_periodo(self, t, plano=None):
+        """Custo e tempo de setup do período t (incluindo o arco de entrada)."""
+        seq = self.sequencia(t, plano)
+        if not seq:
+            return 0.0, 0.0
+        anterior = self._item_anterior_plano(t, plano)
+        custo = tempo = 0.0
+        for item in seq:
+            custo += self.custo_arco(anterior, item)
+            tempo += self.tempo_arco(anterior, item)
+            anterior = item
+        return custo, tempo
+
+    def _periodos_afetados(self, plano):
+        """Períodos cujos arcos de setup podem mudar com o plano."""
+        afetados = set(plano.sequencias)
+        for t in plano.sequencias:
+            for seguinte in (self._proximo_ocupado_plano(t, None), self._proximo_ocupado_plano(t, plano)):
+                if seguinte is not None:
+                    afetados.add(seguinte)
+        return afetados
+
+    def _estoque_item(self, j, plano=None):
+        """
+        Recalcula I[j] (T, K) a partir da produção e do consumo do item j,
+        considerando as alterações do plano.
+        """
+        T, K = self.num_periodos, self.solucao.num_idades
+        vida = int(self.vida_util[j])
+        producao = self.solucao.x[j].astype(np.int64)
+        consumo = np.zeros((T, K), dtype=np.int64)
+        for chave in self.chaves_por_lote_item(j):
+            _, _, t, k = chave
+            consumo[t, k] += self.solucao.Q[chave]
+        if plano is not None:
+            producao = producao.copy()
+            for (j_dx, t), dq in plano.delta_x.items():
+                if j_dx == j:
+                    producao[t] += dq
+            for (j_dq, _, t, k), dq in plano.delta_Q.items():
+                if j_dq == j:
+                    consumo[t, k] += dq
+
+        if usar_jit():
+            return estoque_por_idade(producao, consumo, vida)
+        # O lote com idade k em t nasceu em t - k: o saldo segue a diagonal (t - k + i, i) da
+        # matriz de consumo. Antes do nascimento (t < k) o saldo nunca é positivo.
+        saldo = np.zeros((T, K), dtype=np.int64)
+        for k in range(min(vida, T - 1) + 1):
+            saldo[k:, k] = producao[:T - k]
+            for i in range(k + 1):
+                saldo[k:, k] -= consumo[i:T - k + i, i]
+        return np.maximum(saldo, 0)
+
+    def chaves_por_lote_item(self, j):
+        """Todas as chaves de Q do item j."""
+        for t in range(self.num_periodos):
+            yield from self.chaves_por_lote.get((j, t), ())
+
+    @cronometrado("avaliacao.plano")
+    def avaliar_plano(self, plano):
+        """
+        Avalia um plano de alterações sem aplicá-lo.
+
+        Apenas o estoque dos itens alterados e os arcos de setup dos períodos
+        afetados são recalculados.
+
+        Returns:
+            tuple: (delta_fo, viavel).
+        """
+        solucao = self.solucao
+
+        delta_receita = 0.0
+        for (n, t), valor in plano.gamma.items():
+            delta_receita += self.receita_pedido[n][t] * (valor - solucao.gamma[n, t])
+
+        itens = {j for j, _ in plano.delta_x} | {chave[0] for chave in plano.delta_Q}
+        delta_estoque = 0.0
+        for j in itens:
+            vida = int(self.vida_util[j])
+            novo = self._estoque_item(j, plano)
+            plano._estoques[j] = novo
+            delta_estoque += self.custo_estoque[j] * (novo[:, :vida + 1].sum() - solucao.I[j, :, :vida + 1].sum())
+
+        for (j, t), dq in plano.delta_x.items():
+            if solucao.x[j, t] + dq < 0:
+                return 0.0, False
+
+        delta_tempo = {}
+        for (j, t), dq in plano.delta_x.items():
+            delta_tempo[t] = delta_tempo.get(t, 0.0) + self.tempo_producao[j] * dq
+
+        delta_setup = 0.0
+        for t in self._periodos_afetados(plano):
+            custo_antigo, tempo_antigo = self._setup_periodo(t)
+            custo_novo, tempo_novo = self._setup_periodo(t, plano)
+            delta_setup += custo_novo - custo_antigo
+            delta_tempo[t] = delta_tempo.get(t, 0.0) + tempo_novo - tempo_antigo
+
+        viavel = all(self.respeita_capacidade(t, self.tempo_usado[t] + dt) for t, dt in delta_tempo.items())
+        return float(delta_receita - delta_estoque - delta_setup), bool(viavel)
+
+    def aplicar_plano(self, plano, delta_fo=None):
+        """
+        Aplica in-place um plano de alterações, mantendo y, z, I e os caches coerentes.
+
+        Returns:
+            float: delta_fo aplicado.
+        """
+        if delta_fo is None:
+            delta_fo, _ = self.avaliar_plano(plano)
+        solucao = self.solucao
+        afetados = self._periodos_afetados(plano)
+
+        for (j, t), dq in plano.delta_x.items():
+            solucao.x[j, t] += dq
+        for chave, dq in plano.delta_Q.items():
+            if chave in solucao.Q:
+                self._desindexar_chave_Q(chave)
+            solucao.Q.adicionar(chave, dq)
+            if chave in solucao.Q:
+                self._indexar_chave_Q(chave)
+        for (n, t), valor in plano.gamma.items():
+            solucao.gamma[n, t] = valor
+        for t, seq in plano.sequencias.items():
+            solucao.sequencias_producao[t] = list(seq)
+
+        for j, estoque in plano._estoques.items():
+            solucao.I[j] = estoque
+
+        for t in afetados | {t for _, t in plano.delta_x}:
+            self._reconstruir_setup_periodo(t)
+            self.tempo_usado[t] = self._tempo_periodo(t)
+
+        self.fo += delta_fo
+        return delta_fo
+
+    def _reconstruir_setup_periodo(self, t):
+        """Refaz y[:, t] e z[:, :, t] a partir da sequência do período."""
+        solucao = self.solucao
+        solucao.y[:, t] = 0
+        solucao.z[:, :, t] = 0
+        seq = solucao.sequencias_producao[t]
+        if not seq:
+            return
+        solucao.y[seq[0], t] = 1
+        anterior = self.item_anterior(t)
+        for item in seq:
+            if anterior is not None and anterior != item:
+                solucao.z[anterior, item, t] = 1
+            anterior = item
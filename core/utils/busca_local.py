@@ -0,0 +1,516 @@
+import time
+
+import numpy as np
+
+from .avaliacao_incremental import EstadoIncremental, PlanoMovimento
+from .instrumentacao import INSTRUMENTACAO, cronometrado
+from .registro import obter_registrador
+from .solucao import Solucao
+
+registrador = obter_registrador(__name__)
+
+# Registro de movimentos disponíveis para a busca local: nome -> classe do movimento
+MOVIMENTOS = {}
+
+
+def registrar_movimento(classe):
+    """Decorador que registra uma classe de movimento em MOVIMENTOS pelo seu `nome`."""
+    MOVIMENTOS[classe.nome] = classe
+    return classe
+
+
+class Movimento:
+    """
+    Interface dos movimentos de vizinhança usados pela busca local.
+
+    Cada movimento enumera sistematicamente seus candidatos (`vizinhanca`),
+    sorteia um candidato ao acaso (`sortear`, usado pelas metaheurísticas),
+    precifica um candidato sem alterar a solução (`avaliar`) e o aplica in-place
+    sobre o EstadoIncremental (`aplicar`).
+    """
+    nome = ""
+
+    def vizinhanca(self, estado):
+        raise NotImplementedError
+
+    def sortear(self, estado, rng):
+        """
+        Sorteia um candidato da vizinhança (None se ela for vazia).
+
+        A implementação padrão percorre a vizinhança inteira (amostragem por
+        reservatório); os movimentos registrados a sobrescrevem com um sorteio
+        direto, sem enumerar os candidatos.
+        """
+        escolhido = None
+        for contagem, candidato in enumerate(self.vizinhanca(estado), 1):
+            if rng.random() * contagem < 1:
+                escolhido = candidato
+        return escolhido
+
+    def avaliar(self, estado, candidato):
+        """
+        Returns:
+            tuple: (delta_fo, viavel, dados), onde `dados` é repassado a `aplicar`.
+        """
+        raise NotImplementedError
+
+    def aplicar(self, estado, candidato, dados, delta_fo):
+        raise NotImplementedError
+
+
+@registrar_movimento
+class MovimentoTroca(Movimento):
+    """Troca a posição de dois itens na sequência de um mesmo período (delta O(1))."""
+    nome = "troca"
+
+    def vizinhanca(self, estado):
+        for t in range(estado.num_periodos):
+            tamanho = len(estado.solucao.sequencias_producao[t])
+            for a in range(tamanho - 1):
+                for b in range(a + 1, tamanho):
+                    yield (t, a, b)
+
+    def sortear(self, estado, rng):
+        sequencias = estado.solucao.sequencias_producao
+        periodos = [t for t in range(estado.num_periodos) if len(sequencias[t]) >= 2]
+        if not periodos:
+            return None
+        t = rng.choice(periodos)
+        a, b = sorted(rng.sample(range(len(sequencias[t])), 2))
+        return (t, a, b)
+
+    def avaliar(self, estado, candidato):
+        delta, viavel = estado.avaliar_troca(*candidato)
+        return delta, viavel, None
+
+    def aplicar(self, estado, candidato, dados, delta_fo):
+        return estado.aplicar_troca(*candidato)
+
+
+@registrar_movimento
+class MovimentoDoisOpt(Movimento):
+    """Inverte um trecho (de pelo menos 3 itens) da sequência de um período."""
+    nome = "2opt"
+
+    def vizinhanca(self, estado):
+        for t in range(estado.num_periodos):
+            tamanho = len(estado.solucao.sequencias_producao[t])
+            for a in range(tamanho - 2):
+                for b in range(a + 2, tamanho):
+                    yield (t, a, b)
+
+    def sortear(self, estado, rng):
+        sequencias = estado.solucao.sequencias_producao
+        periodos = [t for t in range(estado.num_periodos) if len(sequencias[t]) >= 3]
+        if not periodos:
+            return None
+        t = rng.choice(periodos)
+        a = rng.randrange(len(sequencias[t]) - 2)
+        return (t, a, rng.randrange(a + 2, len(sequencias[t])))
+
+    def avaliar(self, estado, candidato):
+        t, a, b = candidato
+        seq = estado.solucao.sequencias_producao[t]
+        plano = PlanoMovimento()
+        plano.sequencias[t] = seq[:a] + seq[a:b + 1][::-1] + seq[b + 1:]
+        delta, viavel = estado.avaliar_plano(plano)
+        return delta, viavel, plano
+
+    def aplicar(self, estado, candidato, dados, delta_fo):
+        return estado.aplicar_plano(dados, delta_fo)
+
+
+def _melhor_posicao_insercao(estado, item, t, plano):
+    """Posição de menor custo de setup para inserir `item` na sequência do período t."""
+    seq = estado.sequencia(t, plano)
+    anterior_periodo = estado._item_anterior_plano(t, plano)
+    t_seguinte = estado._proximo_ocupado_plano(t, plano)
+    primeiro_seguinte = estado.sequencia(t_seguinte, plano)[0] if t_seguinte is not None else None
+
+    melhor_posicao, melhor_custo = 0, None
+    for posicao in range(len(seq) + 1):
+        antes = seq[posicao - 1] if posicao > 0 else anterior_periodo
+        depois = seq[posicao] if posicao < len(seq) else primeiro_seguinte
+        custo = estado.custo_arco(antes, item) + estado.custo_arco(item, depois) - estado.custo_arco(antes, depois)
+        if melhor_custo is None or custo < melhor_custo:
+            melhor_posicao, melhor_custo = posicao, custo
+    return melhor_posicao
+
+
+def _inserir_na_sequencia(estado, item, t, plano):
+    """Insere `item` (se ausente) na sequência do período t do plano, na posição mais barata."""
+    seq = estado.sequencia(t, plano)
+    if item in seq:
+        return
+    posicao = _melhor_posicao_insercao(estado, item, t, plano)
+    plano.sequencias[t] = seq[:posicao] + [item] + seq[posicao:]
+
+
+def _remover_da_sequencia(estado, item, t, plano):
+    seq = estado.sequencia(t, plano)
+    if item in seq:
+        plano.sequencias[t] = [j for j in seq if j != item]
+
+
+@registrar_movimento
+class MovimentoRealocacao(Movimento):
+    """
+    Move todo o lote do item j produzido no período t para outro período t2.
+
+    O consumo dos pedidos atendidos pelo lote passa a ter idade (t_entrega - t2),
+    que deve respeitar o shelf-life do item; o item é inserido na posição de menor
+    custo de setup em t2 (se ainda não era produzido lá).
+    """
+    nome = "realocacao"
+
+    def vizinhanca(self, estado):
+        x = estado.solucao.x
+        for j in range(x.shape[0]):
+            for t in range(estado.num_periodos):
+                if x[j, t] <= 0:
+                    continue
+                for t2 in range(estado.num_periodos):
+                    if t2 != t:
+                        yield (j, t, t2)
+
+    def sortear(self, estado, rng):
+        lotes = np.argwhere(estado.solucao.x > 0)
+        if len(lotes) == 0 or estado.num_periodos < 2:
+            return None
+        j, t = (int(v) for v in lotes[rng.randrange(len(lotes))])
+        t2 = rng.randrange(estado.num_periodos - 1)
+        return (j, t, t2 + 1 if t2 >= t else t2)
+
+    def avaliar(self, estado, candidato):
+        j, t, t2 = candidato
+        solucao = estado.solucao
+        vida = estado.vida_util[j]
+        plano = PlanoMovimento()
+        for chave in estado.chaves_por_lote.get((j, t), ()):
+            _, n, t_entrega, k = chave
+            nova_idade = t_entrega - t2
+            if nova_idade < 0 or nova_idade > vida:
+                return 0.0, False, None
+            quantidade = solucao.Q[chave]
+            plano.consumir(j, n, t_entrega, k, -quantidade)
+            plano.consumir(j, n, t_entrega, nova_idade, quantidade)
+
+        quantidade_lote = solucao.x[j, t]
+        plano.produzir(j, t, -quantidade_lote)
+        plano.produzir(j, t2, quantidade_lote)
+        _remover_da_sequencia(estado, j, t, plano)
+        _inserir_na_sequencia(estado, j, t2, plano)
+
+        delta, viavel = estado.avaliar_plano(plano)
+        return delta, viavel, plano
+
+    def aplicar(self, estado, candidato, dados, delta_fo):
+        return estado.aplicar_plano(dados, delta_fo)
+
+
+@registrar_movimento
+class MovimentoAceitacao(Movimento):
+    """
+    Troca o status de aceitação de um pedido.
+
+    Rejeitar: remove o consumo do pedido e a produção correspondente.
+    Aceitar (em um período da janela): consome primeiro as sobras de lotes
+    ainda válidos (FIFO) e produz o restante de cada item em um único período
+    do intervalo permitido pelo shelf-life, escolhendo o de menor custo de
+    estoque + setup com folga de capacidade.
+    """
+    nome = "aceitacao"
+
+    def vizinhanca(self, estado):
+        parametros = estado.parametros
+        gamma = estado.solucao.gamma
+        for n in range(parametros["num_pedidos"]):
+            if gamma[n].any():
+                yield (n, None)
+                continue
+            inicio, fim = estado.indice.janela(n)
+            for t_entrega in range(inicio, fim + 1):
+                yield (n, t_entrega)
+
+    def sortear(self, estado, rng):
+        parametros = estado.parametros
+        n = rng.randrange(parametros["num_pedidos"])
+        if estado.solucao.gamma[n].any():
+            return (n, None)
+        inicio, fim = estado.indice.janela(n)
+        return (n, rng.randint(inicio, fim)) if inicio <= fim else None
+
+    def avaliar(self, estado, candidato):
+        n, t_entrega = candidato
+        if t_entrega is None:
+            plano = self._plano_rejeicao(estado, n)
+        else:
+            plano = self._plano_aceitacao(estado, n, t_entrega)
+            if plano is None:
+                return 0.0, False, None
+        delta, viavel = estado.avaliar_plano(plano)
+        return delta, viavel, plano
+
+    def aplicar(self, estado, candidato, dados, delta_fo):
+        return estado.aplicar_plano(dados, delta_fo)
+
+    def _plano_rejeicao(self, estado, n):
+        solucao = estado.solucao
+        plano = PlanoMovimento()
+        for t in range(estado.num_periodos):
+            if solucao.gamma[n, t]:
+                plano.gamma[(n, t)] = 0
+        for chave in list(estado.chaves_por_pedido.get(n, ())):
+            j, _, t_entrega, k = chave
+            quantidade = solucao.Q[chave]
+            plano.consumir(j, n, t_entrega, k, -quantidade)
+            plano.produzir(j, t_entrega - k, -quantidade)
+        for (j, t), dq in plano.delta_x.items():
+            if solucao.x[j, t] + dq <= 0:
+                _remover_da_sequencia(estado, j, t, plano)
+        return plano
+
+    def _plano_aceitacao(self, estado, n, t_entrega):
+        solucao = estado.solucao
+        plano = PlanoMovimento()
+        plano.gamma[(n, t_entrega)] = 1
+        tempo_extra = {}
+
+        for j, restante in estado.indice.demanda_do_pedido(n):
+            vida = int(estado.vida_util[j])
+            inicio = max(0, t_entrega - vida)
+
+            # 1. Sobras de lotes válidos, do mais antigo para o mais novo (FIFO)
+            for t in range(inicio, t_entrega + 1):
+                if restante <= 0:
+                    break
+                sobra = estado.sobra_lote(j, t)
+                if sobra > 0:
+                    usar = min(sobra, restante)
+                    plano.consumir(j, n, t_entrega, t_entrega - t, usar)
+                    restante -= usar
+            if restante <= 0:
+                continue
+
+            # 2. Produção do restante em um único período do intervalo [inicio, t_entrega]
+            tempo_item = estado.tempo_producao[j] * restante
+            melhor = None
+            for t in range(t_entrega, inicio - 1, -1):
+                seq = estado.sequencia(t, plano)
+                custo_setup = tempo_setup = 0.0
+                if j not in seq:
+                    posicao = _melhor_posicao_insercao(estado, j, t, plano)
+                    antes = seq[posicao - 1] if posicao > 0 else estado._item_anterior_plano(t, plano)
+                    depois = seq[posicao] if posicao < len(seq) else None
+                    custo_setup = estado.custo_arco(antes, j) + estado.custo_arco(j, depois) - estado.custo_arco(antes, depois)
+                    tempo_setup = estado.tempo_arco(antes, j) + estado.tempo_arco(j, depois) - estado.tempo_arco(antes, depois)
+                if estado.folga(t) - tempo_extra.get(t, 0.0) < tempo_item + tempo_setup:
+                    continue
+                custo = estado.custo_estoque[j] * restante * (t_entrega - t) + custo_setup
+                if melhor is None or custo < melhor[0]:
+                    melhor = (custo, t, tempo_item + tempo_setup)
+            if melhor is None:
+                return None
+
+            _, t, tempo = melhor
+            tempo_extra[t] = tempo_extra.get(t, 0.0) + tempo
+            plano.produzir(j, t, restante)
+            plano.consumir(j, n, t_entrega, t_entrega - t, restante)
+            _inserir_na_sequencia(estado, j, t, plano)
+        return plano
+
+
+@registrar_movimento
+class MovimentoPeriodoEntrega(Movimento):
+    """
+    Altera o período de entrega de um pedido aceito dentro de sua janela,
+    mantendo a produção: as idades do consumo são deslocadas e devem
+    continuar respeitando o shelf-life.
+    """
+    nome = "periodo_entrega"
+
+    def vizinhanca(self, estado):
+        parametros = estado.parametros
+        gamma = estado.solucao.gamma
+        for n in range(parametros["num_pedidos"]):
+            periodos = gamma[n].nonzero()[0]
+            if len(periodos) == 0:
+                continue
+            atual = int(periodos[0])
+            inicio, fim = estado.indice.janela(n)
+            for t_novo in range(inicio, fim + 1):
+                if t_novo != atual:
+                    yield (n, atual, t_novo)
+
+    def sortear(self, estado, rng):
+        aceitos = np.nonzero(estado.solucao.gamma.any(axis=1))[0]
+        if len(aceitos) == 0:
+            return None
+        n = int(aceitos[rng.randrange(len(aceitos))])
+        atual = int(estado.solucao.gamma[n].nonzero()[0][0])
+        inicio, fim = estado.indice.janela(n)
+        periodos = [t for t in range(inicio, fim + 1) if t != atual]
+        return (n, atual, rng.choice(periodos)) if periodos else None
+
+    def avaliar(self, estado, candidato):
+        n, atual, t_novo = candidato
+        solucao = estado.solucao
+        plano = PlanoMovimento()
+        plano.gamma[(n, atual)] = 0
+        plano.gamma[(n, t_novo)] = 1
+        for chave in estado.chaves_por_pedido.get(n, ()):
+            j, _, t_entrega, k = chave
+            nova_idade = t_novo - (t_entrega - k)
+            if nova_idade < 0 or nova_idade > estado.vida_util[j]:
+                return 0.0, False, None
+            quantidade = solucao.Q[chave]
+            plano.consumir(j, n, t_entrega, k, -quantidade)
+            plano.consumir(j, n, t_novo, nova_idade, quantidade)
+        delta, viavel = estado.avaliar_plano(plano)
+        return delta, viavel, plano
+
+    def aplicar(self, estado, candidato, dados, delta_fo):
+        return estado.aplicar_plano(dados, delta_fo)
+
+
+class EstatisticasMovimento:
+    """Contadores de desempenho de um movimento durante a busca local."""
+
+    def __init__(self, nome):
+        self.nome = nome
+        self.avaliados = 0
+        self.viaveis = 0
+        self.aplicados = 0
+        self.ganho_total = 0.0
+        self.tempo_avaliacao = 0.0
+
+    @property
+    def movimentos_por_segundo(self):
+        """Movimentos avaliados por segundo de avaliação."""
+        return self.avaliados / self.tempo_avaliacao if self.tempo_avaliacao > 0 else 0.0
+
+    def como_dict(self):
+        return {
+            "movimento": self.nome,
+            "avaliados": self.avaliados,
+            "viaveis": self.viaveis,
+            "aplicados": self.aplicados,
+            "ganho_total": self.ganho_total,
+            "tempo_avaliacao": self.tempo_avaliacao,
+            "movimentos_por_segundo": self.movimentos_por_segundo,
+        }
+
+
+class ResultadoBuscaLocal:
+    """Resultado da busca local: solução, FO e estatísticas por movimento."""
+
+    def __init__(self, solucao, fo, iteracoes, tempo_total, estatisticas):
+        self.solucao = solucao
+        self.fo = fo
+        self.iteracoes = iteracoes
+        self.tempo_total = tempo_total
+        self.estatisticas = estatisticas
+
+    def relatorio(self):
+        """Linhas de texto com as estatísticas de vazão de cada movimento."""
+        linhas = [f"FO final: {self.fo:.2f} | iterações: {self.iteracoes} | tempo: {self.tempo_total:.3f}s"]
+        for est in self.estatisticas.values():
+            linhas.append(
+                f"  {est.nome:<16} avaliados={est.avaliados:<8} aplicados={est.aplicados:<5} "
+                f"ganho={est.ganho_total:<10.2f} mov/s={est.movimentos_por_segundo:,.0f}"
+            )
+        return linhas
+
+
+ESTRATEGIAS = ("primeira_melhora", "melhor_melhora")
+
+# Candidatos avaliados entre duas consultas ao relógio durante a varredura de uma vizinhança
+INTERVALO_VERIFICACAO_TEMPO = 256
+
+
+@cronometrado("busca_local")
+def busca_local(solucao, parametros, movimentos=None, estrategia="primeira_melhora",
+                max_iteracoes=None, tempo_limite=None, tolerancia=1e-6):
+    """
+    Busca local sobre um conjunto plugável de movimentos, com avaliação incremental.
+
+    Args:
+        solucao (Solucao | dict): Solução inicial (não é alterada; a busca trabalha em uma cópia).
+        parametros (dict): Parâmetros do problema.
+        movimentos (list, optional): Nomes de movimentos registrados em MOVIMENTOS ou
+            instâncias de Movimento. Por padrão, todos os registrados.
+        estrategia (str): "primeira_melhora" aplica o primeiro vizinho melhor encontrado
+            e reinicia a varredura; "melhor_melhora" varre todas as vizinhanças e aplica
+            o melhor vizinho.
+        max_iteracoes (int, optional): Número máximo de movimentos aplicados.
+        tempo_limite (float, optional): Tempo máximo em segundos, verificado também
+            durante a varredura das vizinhanças (a cada INTERVALO_VERIFICACAO_TEMPO
+            candidatos); ao esgotá-lo, o melhor vizinho já encontrado é aplicado e a
+            busca termina.
+        tolerancia (float): Ganho mínimo para considerar um movimento como melhora.
+
+    Returns:
+        ResultadoBuscaLocal: Solução em ótimo local, FO e estatísticas por movimento.
+    """
+    if estrategia not in ESTRATEGIAS:
+        raise ValueError(f"Estratégia desconhecida: {estrategia}. Use uma de {ESTRATEGIAS}.")
+    if not isinstance(solucao, Solucao):
+        solucao = Solucao.de_dict(solucao, parametros)
+
+    if movimentos is None:
+        movimentos = list(MOVIMENTOS)
+    movimentos = [MOVIMENTOS[m]() if isinstance(m, str) else m for m in movimentos]
+    estatisticas = {m.nome: EstatisticasMovimento(m.nome) for m in movimentos}
+
+    estado = EstadoIncremental(solucao.copy(), parametros)
+    inicio = time.perf_counter()
+    iteracoes = 0
+
+    def sem_tempo():
+        return tempo_limite is not None and time.perf_counter() - inicio >= tempo_limite
+
+    def esgotou():
+        if max_iteracoes is not None and iteracoes >= max_iteracoes:
+            return True
+        return sem_tempo()
+
+    interrompida = False
+    while not interrompida and not esgotou():
+        melhor = None  # (delta, movimento, candidato, dados)
+        for movimento in movimentos:
+            est = estatisticas[movimento.nome]
+            t0 = time.perf_counter()
+            for contagem, candidato in enumerate(movimento.vizinhanca(estado), 1):
+                if tempo_limite is not None and contagem % INTERVALO_VERIFICACAO_TEMPO == 0 and sem_tempo():
+                    interrompida = True
+                    break
+                delta, viavel, dados = movimento.avaliar(estado, candidato)
+                est.avaliados += 1
+                if not viavel:
+                    continue
+                est.viaveis += 1
+                if delta > tolerancia and (melhor is None or delta > melhor[0]):
+                    melhor = (delta, movimento, candidato, dados)
+                    if estrategia == "primeira_melhora":
+                        break
+            est.tempo_avaliacao += time.perf_counter() - t0
+            if interrompida or (melhor is not None and estrategia == "primeira_melhora"):
+                break
+            if sem_tempo():
+                interrompida = True
+                break
+
+        if melhor is None:
+            break
+        delta, movimento, candidato, dados = melhor
+        movimento.aplicar(estado, candidato, dados, delta)
+        est = estatisticas[movimento.nome]
+        est.aplicados += 1
+        est.ganho_total += delta
+        iteracoes += 1
+        registrador.debug("Movimento %s aplicado: ganho %.2f, FO %.2f", movimento.nome, delta, estado.fo)
+
+    if INSTRUMENTACAO.ativa:
+        for est in estatisticas.values():
+            INSTRUMENTACAO.registrar_tentativas(f"movimento.{est.nome}", est.avaliados, est.aplicados)
+    return ResultadoBuscaLocal(estado.solucao, estado.fo, iteracoes, time.perf_counter() - inicio, estatisticas)
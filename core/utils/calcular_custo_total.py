@@ -1,68 +1,107 @@
-import math
+from collections import namedtuple
+
 import numpy as np
 
+from .instrumentacao import cronometrado
+from .registro import obter_registrador
+from .solucao import Solucao
 
-def calcular_custo_total(solucao, parametros):
+registrador = obter_registrador(__name__)
+
+
+class DecomposicaoFO(namedtuple("DecomposicaoFO", ["receita", "custo_estoque", "custo_setup"])):
     """
-    Calcula o valor da função objetivo para uma dada solução, baseando-se na formulação.
+    Termos da função objetivo de uma solução.
+
+    Attributes:
+        receita (float): sum_{n} sum_{t=F_n}^{L_n} P_{nt} * gamma_{nt}
+        custo_estoque (float): sum_{j,t} sum_{k=0}^{sl_j} h_j * I_{jt}^k
+        custo_setup (float): sum_{t,i,j} sc_{ij} * z_{ijt}
+    """
+    __slots__ = ()
+
+    @property
+    def lucro(self):
+        """Lucro líquido: receita - custo de estoque - custo de setup."""
+        return self.receita - self.custo_estoque - self.custo_setup
+
+
+def mascara_janela_entrega(parametros):
+    """
+    Máscara booleana (N, T): True se t pertence à janela [F_n, L_n] do pedido n.
+    """
+    periodos = np.arange(parametros["num_periodos"])
+    inicio = np.asarray(parametros["periodo_inicial_entrega"])[:, None]
+    fim = np.asarray(parametros["periodo_final_entrega"])[:, None]
+    return (periodos >= inicio) & (periodos <= fim)
+
+
+def mascara_idade_valida(parametros, num_idades=None):
+    """
+    Máscara booleana (J, K): True se a idade k respeita o shelf-life do item j (k <= sl_j).
+    """
+    vida_util = np.asarray(parametros["vida_util"])
+    if num_idades is None:
+        num_idades = int(vida_util.max()) + 1
+    return np.arange(num_idades) <= vida_util[:, None]
+
+
+@cronometrado("avaliacao.solucao")
+def avaliar_solucao(solucao, parametros):
+    """
+    Avalia a função objetivo de forma vetorizada, sem imprimir nada.
+
+    Cada termo é obtido por uma redução mascarada sobre os arrays da solução:
+    a receita considera apenas a janela de entrega de cada pedido e o custo de
+    estoque apenas as idades k <= vida_util[j].
 
     Args:
-        solucao (dict): Dicionário contendo as variáveis de decisão x, I, Q, gamma, y, z.
+        solucao (Solucao | dict): Solução a ser avaliada.
         parametros (dict): Dicionário com todos os parâmetros do problema.
 
     Returns:
-        float: O valor total da função objetivo.
+        DecomposicaoFO: Receita, custo de estoque e custo de setup (ver `.lucro`).
     """
-    # Extrai as variáveis de decisão da solução
-    x = solucao["x"]
-    I = solucao["I"]
-    Q = solucao["Q"]
-    gamma = solucao["gamma"]
-    y = solucao["y"]
-    z = solucao["z"]
-
-    # Extrai os parâmetros
-    num_pedidos = parametros["num_pedidos"]
-    num_periodos = parametros["num_periodos"]
-    num_itens = parametros["num_itens"]
+    if not isinstance(solucao, Solucao):
+        solucao = Solucao.de_dict(solucao, parametros)
+
     receita_pedido = parametros["receita_pedido"]
     custo_estoque = parametros["custo_estoque"]
     custo_setup = parametros["custo_setup"]
-    periodo_inicial_entrega = parametros["periodo_inicial_entrega"]
-    periodo_final_entrega = parametros["periodo_final_entrega"]
-    vida_util = parametros["vida_util"]
-
-    total_receita = 0
-    total_custo_estoque = 0
-    total_custo_setup = 0
-
-    # 1. Calcular Receita Total (Primeiro termo da FO)
-    # sum_{n=1}^{N} sum_{t=F_n}^{L_n} P_{nt} * gamma_{nt}
-    for n in range(num_pedidos):
-        for t in range(periodo_inicial_entrega[n], periodo_final_entrega[n] + 1):
-            if t < num_periodos: # Garante que 't' esteja dentro do horizonte de planejamento
-                total_receita += receita_pedido[n][t] * gamma[n][t]
-
-    # 2. Calcular Custo de Estoque (Segundo termo da FO)
-    # sum_{j=1}^{J} sum_{t=1}^{T} sum_{k=0}^{sl_j} h_j * I_{jt}^k
-    for j in range(num_itens):
-        for t in range(num_periodos):
-            # Iterar sobre as idades válidas do item j
-            for k in range(0, vida_util[j] + 1): # k vai de 0 até sl_j
-                total_custo_estoque += custo_estoque[j] * I[j][t][k]
-
-    # 3. Calcular Custo de Setup (Terceiro termo da FO)
-    # sum_{t=1}^{T} sum_{i=1}^{J} sum_{j=1}^{J} sc_{ij} * z_{ijt}
-    for t in range(num_periodos):
-        for i in range(num_itens):
-            for j in range(num_itens):
-                total_custo_setup += custo_setup[i][j] * z[i][j][t]
+
+    # 1. Receita: P_{nt} * gamma_{nt} dentro da janela de entrega
+    janela = mascara_janela_entrega(parametros)
+    receita = np.sum(receita_pedido * solucao.gamma, where=janela)
+
+    # 2. Estoque: h_j * I_{jt}^k para k <= sl_j
+    idade_valida = mascara_idade_valida(parametros, solucao.num_idades)
+    estoque_valido = np.sum(solucao.I, axis=1, where=idade_valida[:, None, :])  # (J, K)
+    total_custo_estoque = np.dot(custo_estoque, estoque_valido.sum(axis=1))
+
+    # 3. Setup: sc_{ij} * z_{ijt}
+    total_custo_setup = np.tensordot(custo_setup, solucao.z, axes=([0, 1], [0, 1])).sum()
+
+    return DecomposicaoFO(float(receita), float(total_custo_estoque), float(total_custo_setup))
+
+
+def calcular_custo_total(solucao, parametros):
+    """
+    Calcula o valor da função objetivo para uma dada solução, baseando-se na formulação.
+
+    Args:
+        solucao (Solucao | dict): Solução contendo as variáveis de decisão x, I, Q, gamma, y, z.
+        parametros (dict): Dicionário com todos os parâmetros do problema.
+
+    Returns:
+        float: O valor total da função objetivo.
+    """
+    decomposicao = avaliar_solucao(solucao, parametros)
 
     # A função objetivo é MAX Receita - Custo Estoque - Custo Setup
-    funcao_objetivo_valor = total_receita - total_custo_estoque - total_custo_setup
-    print(f"Receita: {total_receita:.2f}")
-    print(f"Custo Estoque: {total_custo_estoque:.2f}")
-    print(f"Custo Setup: {total_custo_setup:.2f}")
-    print(f"Lucro Líquido: {funcao_objetivo_valor:.2f}")
+    funcao_objetivo_valor = decomposicao.lucro
+    registrador.info("Receita: %.2f", decomposicao.receita)
+    registrador.info("Custo Estoque: %.2f", decomposicao.custo_estoque)
+    registrador.info("Custo Setup: %.2f", decomposicao.custo_setup)
+    registrador.info("Lucro Líquido: %.2f", funcao_objetivo_valor)
 
-    return funcao_objetivo_valor
\ No newline at end of file
+    return funcao_objetivo_valor
@@ -1,9 +1,31 @@
+import os
+
 import numpy as np
 
-def carregar_parametros_otimizacao(caminho_arquivo):
+from .indice_instancia import IndiceInstancia
+from .instancia_binaria import (caminho_cache, carregar_instancia_binaria, eh_instancia_binaria,
+                                salvar_instancia_binaria)
+
+def carregar_parametros_otimizacao(caminho_arquivo, usar_cache=False, diretorio_cache=None):
     """
     Carrega todos os parâmetros do problema de otimização de produção a partir de um arquivo estruturado.
+
+    Arquivos no formato binário (ver `instancia_binaria`) são detectados pela assinatura
+    e mapeados em memória, somente leitura. Com `usar_cache=True`, uma instância em texto
+    é compilada uma única vez para o cache em disco (indexado pelo hash do arquivo) e as
+    cargas seguintes leem a versão binária.
+
+    O dicionário inclui, em `indice`, o índice pré-computado da instância
+    (`indice_instancia.IndiceInstancia`).
     """
+    if eh_instancia_binaria(caminho_arquivo):
+        return carregar_instancia_binaria(caminho_arquivo)
+    if usar_cache:
+        destino = caminho_cache(caminho_arquivo, diretorio_cache)
+        if not os.path.exists(destino):
+            salvar_instancia_binaria(carregar_parametros_otimizacao(caminho_arquivo), destino)
+        return carregar_instancia_binaria(destino)
+
     with open(caminho_arquivo) as arquivo:
         num_itens, num_periodos, num_pedidos = map(int, arquivo.readline().split())
 
@@ -45,4 +67,5 @@ def carregar_parametros_otimizacao(caminho_arquivo):
         'receita_pedido': receita_pedido,
         'vida_util': vida_util
     }
+    parametros['indice'] = IndiceInstancia(parametros)
     return parametros
\ No newline at end of file
@@ -0,0 +1,196 @@
+import numpy as np
+
+from .gerar_solucao_inicial_hc1_atualizada import obter_sequencia_producao
+from .instrumentacao import cronometrado
+
+
+class EstadoPeriodos:
+    """
+    Estado incremental dos períodos durante a construção de uma solução.
+
+    Mantém, para cada período, o conjunto de itens produzidos, a sequência de
+    produção, o tempo de produção e de setup usados e o último item em que a
+    máquina fica preparada (que se propaga pelos períodos sem produção).
+
+    Alocações são feitas em duas etapas: primeiro como tentativa, guardada em
+    uma camada à parte (descartá-la custa O(alterações)); depois confirmada, o
+    que re-sequencia apenas os períodos alterados e os seguintes cujo item
+    anterior mudou, parando assim que o último item de um período se mantém.
+    """
+
+    def __init__(self, parametros, producao=None):
+        self.num_itens = parametros["num_itens"]
+        self.num_periodos = parametros["num_periodos"]
+        self.tempo_producao = parametros["tempo_producao"]
+        self.tempo_setup = parametros["tempo_setup"]
+
+        self.producao = producao if producao is not None else np.zeros((self.num_itens, self.num_periodos), dtype=np.int64)
+        self.itens = [set() for _ in range(self.num_periodos)]
+        self.sequencias = [[] for _ in range(self.num_periodos)]
+        self.tempo_producao_periodo = np.zeros(self.num_periodos)
+        self.tempo_setup_periodo = np.zeros(self.num_periodos)
+        self._ultimo = [None] * self.num_periodos
+        self._anterior_sequenciado = [None] * self.num_periodos
+
+        # Camada de tentativa, indexada por período: consultas de um período
+        # não percorrem as alocações dos demais
+        self._producao_tentativa = {}  # t -> {j: quantidade}
+        self._ultimo_tentativa = {}    # t -> último item simulado
+
+    # --- Consultas (incluem a tentativa em andamento) ---
+
+    def ultimo_item(self, t):
+        """Último item em que a máquina está preparada ao final do período t."""
+        if t < 0:
+            return None
+        return self._ultimo_tentativa.get(t, self._ultimo[t])
+
+    def item_anterior(self, t):
+        return self.ultimo_item(t - 1)
+
+    def quantidade(self, j, t):
+        return self.producao[j, t] + self._producao_tentativa.get(t, {}).get(j, 0)
+
+    def itens_periodo(self, t):
+        itens = set(self.itens[t])
+        itens.update(j for j, q in self._producao_tentativa.get(t, {}).items() if q > 0)
+        return itens
+
+    def tempo_usado(self, t):
+        """Tempo de produção + setup comprometido no período t."""
+        return self.tempo_producao_periodo[t] + self.tempo_setup_periodo[t]
+
+    @cronometrado("construcao.simular_insercao")
+    def simular_insercao(self, t, j, quantidade):
+        """
+        Sequência e tempo total (produção + setup) do período t se `quantidade`
+        unidades do item j forem somadas à produção atual (com a tentativa).
+
+        Returns:
+            tuple: (sequencia, tempo_total)
+        """
+        itens = self.itens_periodo(t)
+        itens.add(j)
+        sequencia, tempo_setup = obter_sequencia_producao(list(itens), self.tempo_setup, self.item_anterior(t))
+        tempo_producao = self.tempo_producao_periodo[t] + self.tempo_producao[j] * quantidade
+        tempo_producao += sum(self.tempo_producao[i] * q for i, q in self._producao_tentativa.get(t, {}).items())
+        return sequencia, tempo_producao + tempo_setup
+
+    def simular_pedido(self, t, quantidades):
+        """
+        Sequência e tempo total (produção + setup) do período t se as
+        quantidades {j: quantidade} forem somadas de uma vez à produção atual
+        (com a tentativa).
+
+        Returns:
+            tuple: (sequencia, tempo_total)
+        """
+        itens = self.itens_periodo(t)
+        itens.update(quantidades)
+        sequencia, tempo_setup = obter_sequencia_producao(list(itens), self.tempo_setup, self.item_anterior(t))
+        tempo_producao = self.tempo_producao_periodo[t] + sum(self.tempo_producao[j] * q for j, q in quantidades.items())
+        tempo_producao += sum(self.tempo_producao[i] * q for i, q in self._producao_tentativa.get(t, {}).items())
+        return sequencia, tempo_producao + tempo_setup
+
+    # --- Tentativa de alocação ---
+
+    def alocar_tentativa(self, t, j, quantidade, sequencia):
+        """
+        Registra a produção de `quantidade` do item j no período t como tentativa.
+        O último item de t passa a ser o fim de `sequencia` e é propagado aos
+        períodos seguintes sem produção.
+        """
+        tentativa = self._producao_tentativa.setdefault(t, {})
+        tentativa[j] = tentativa.get(j, 0) + quantidade
+        if not sequencia:
+            return
+        ultimo = sequencia[-1]
+        self._ultimo_tentativa[t] = ultimo
+        for t_seguinte in range(t + 1, self.num_periodos):
+            if self.itens_periodo(t_seguinte):
+                break
+            self._ultimo_tentativa[t_seguinte] = ultimo
+
+    def producao_tentativa(self):
+        """Alocações da tentativa em andamento, ordenadas por (item, período)."""
+        return sorted(((j, t), q) for t, tentativa in self._producao_tentativa.items() for j, q in tentativa.items())
+
+    def simular_propagacao(self, t, capacidade, tolerancia=1e-6):
+        """
+        Re-sequencia, na camada de tentativa, os períodos após t cujo item
+        anterior muda com a tentativa (que deve alterar apenas períodos até t),
+        como `confirmar_tentativa` fará, e verifica a capacidade de cada um.
+
+        Returns:
+            bool: False se algum período seguinte passaria a exceder a capacidade.
+        """
+        for t_seguinte in range(t + 1, self.num_periodos):
+            anterior = self.ultimo_item(t_seguinte - 1)
+            if not self.itens[t_seguinte]:
+                self._ultimo_tentativa[t_seguinte] = anterior
+                continue
+            if anterior == self._anterior_sequenciado[t_seguinte]:
+                break
+            sequencia, tempo_setup = obter_sequencia_producao(list(self.itens[t_seguinte]), self.tempo_setup, anterior)
+            if self.tempo_producao_periodo[t_seguinte] + tempo_setup > capacidade[t_seguinte] + tolerancia:
+                return False
+            self._ultimo_tentativa[t_seguinte] = sequencia[-1]
+        return True
+
+    def descartar_tentativa(self):
+        self._producao_tentativa.clear()
+        self._ultimo_tentativa.clear()
+
+    @cronometrado("construcao.confirmar")
+    def confirmar_tentativa(self):
+        """Incorpora a tentativa ao estado e re-sequencia apenas os períodos afetados."""
+        alterados = set()
+        for t, tentativa in self._producao_tentativa.items():
+            for j, quantidade in tentativa.items():
+                if quantidade <= 0:
+                    continue
+                self.producao[j, t] += quantidade
+                self.itens[t].add(j)
+                self.tempo_producao_periodo[t] += self.tempo_producao[j] * quantidade
+                alterados.add(t)
+        self.descartar_tentativa()
+        if alterados:
+            self._propagar(min(alterados), alterados)
+
+    def _propagar(self, inicio, alterados):
+        ultimo_alterado = max(alterados)
+        for t in range(inicio, self.num_periodos):
+            anterior = self.ultimo_item(t - 1)
+            ultimo_antigo = self._ultimo[t]
+            if self.itens[t]:
+                if t in alterados or anterior != self._anterior_sequenciado[t]:
+                    sequencia, tempo_setup = obter_sequencia_producao(list(self.itens[t]), self.tempo_setup, anterior)
+                    self.sequencias[t] = sequencia
+                    self.tempo_setup_periodo[t] = tempo_setup
+                    self._anterior_sequenciado[t] = anterior
+                    self._ultimo[t] = sequencia[-1]
+            else:
+                self._ultimo[t] = anterior
+            if t >= ultimo_alterado and self._ultimo[t] == ultimo_antigo:
+                break
+
+    def preencher_setups(self, solucao):
+        """
+        Preenche y, z e as sequências de produção da solução a partir das
+        sequências do estado, com o setup herdado do último item do período
+        ocupado anterior.
+        """
+        solucao.y[:] = 0
+        solucao.z[:] = 0
+        for t in range(self.num_periodos):
+            seq = self.sequencias[t]
+            solucao.sequencias_producao[t] = list(seq)
+            if not seq:
+                continue
+            item_anterior = self.item_anterior(t)
+            solucao.y[seq[0], t] = 1
+            if item_anterior is not None and item_anterior != seq[0]:
+                solucao.z[item_anterior, seq[0], t] = 1
+            for i in range(len(seq) - 1):
+                if seq[i] != seq[i + 1]:
+                    solucao.z[seq[i], seq[i + 1], t] = 1
@@ -0,0 +1,82 @@
+import numpy as np
+
+
+class EstoqueLotes:
+    """
+    Estoque de lotes por item indexado pelo período de produção.
+
+    `saldo[j, p]` é a quantidade ainda disponível do lote do item j produzido no
+    período p (lotes do mesmo período são somados) e `consumido[j, p, k]` o que
+    foi consumido desse lote com idade k. A quantidade disponível e não vencida
+    em um período sai de somas prefixadas de `saldo`, recalculadas apenas para
+    os itens alterados; o consumo é FIFO (lote mais antigo primeiro) e feito no
+    próprio arranjo, sem cópias nem ordenações.
+    """
+
+    def __init__(self, parametros, num_idades=None):
+        self.num_itens = parametros["num_itens"]
+        self.num_periodos = parametros["num_periodos"]
+        self.vida_util = np.asarray(parametros["vida_util"])
+        self.num_idades = num_idades if num_idades is not None else int(self.vida_util.max()) + 1
+
+        self.produzido = np.zeros((self.num_itens, self.num_periodos), dtype=np.int64)
+        self.saldo = np.zeros((self.num_itens, self.num_periodos), dtype=np.int64)
+        self.consumido = np.zeros((self.num_itens, self.num_periodos, self.num_idades), dtype=np.int64)
+        self._prefixo = np.zeros((self.num_itens, self.num_periodos + 1), dtype=np.int64)
+        self._desatualizado = np.zeros(self.num_itens, dtype=bool)
+
+    def _primeiro_lote_valido(self, j, t):
+        return max(0, t - int(self.vida_util[j]))
+
+    def produzir(self, j, p, quantidade):
+        """Adiciona `quantidade` ao lote do item j produzido no período p."""
+        self.produzido[j, p] += quantidade
+        self.saldo[j, p] += quantidade
+        self._desatualizado[j] = True
+
+    def disponivel(self, j, t):
+        """Quantidade do item j utilizável no período t: lotes produzidos até t e ainda não vencidos."""
+        if self._desatualizado[j]:
+            np.cumsum(self.saldo[j], out=self._prefixo[j, 1:])
+            self._desatualizado[j] = False
+        return int(self._prefixo[j, t + 1] - self._prefixo[j, self._primeiro_lote_valido(j, t)])
+
+    def vazio(self):
+        """True se nenhum lote tem saldo disponível."""
+        return not self.saldo.any()
+
+    def consumir_fifo(self, j, t, quantidade):
+        """
+        Consome até `quantidade` unidades do item j no período t, do lote válido
+        mais antigo para o mais novo.
+
+        Returns:
+            list: Pares (idade, quantidade) consumidos, em ordem FIFO.
+        """
+        consumo = []
+        restante = quantidade
+        for p in range(self._primeiro_lote_valido(j, t), t + 1):
+            if restante <= 0:
+                break
+            usar = min(restante, int(self.saldo[j, p]))
+            if usar > 0:
+                self.saldo[j, p] -= usar
+                self.consumido[j, p, t - p] += usar
+                consumo.append((t - p, usar))
+                restante -= usar
+        if consumo:
+            self._desatualizado[j] = True
+        return consumo
+
+    def tensor_estoque(self):
+        """
+        Estoque por idade I[j, t, k] ao final de cada período: o que resta, em t,
+        do lote produzido em t - k. Lotes com idade acima do shelf-life são descartados.
+        """
+        estoque = np.zeros((self.num_itens, self.num_periodos, self.num_idades), dtype=np.int64)
+        consumido_acumulado = np.cumsum(self.consumido, axis=2)
+        for k in range(min(self.num_idades, self.num_periodos)):
+            lotes = slice(0, self.num_periodos - k)
+            estoque[:, k:, k] = self.produzido[:, lotes] - consumido_acumulado[:, lotes, k]
+        estoque *= np.arange(self.num_idades)[None, None, :] <= self.vida_util[:, None, None]
+        return estoque
@@ -0,0 +1,302 @@
+"""
+Executor de experimentos em lote: instâncias x algoritmos x sementes x limites de tempo.
+
+Cada célula da grade roda em um pool de processos e seu resultado é gravado, assim
+que fica pronto, em um arquivo de resultados apenas de inserção (CSV ou SQLite).
+Ao ser executado de novo com o mesmo arquivo, o experimento retoma de onde parou:
+as células já concluídas com sucesso são puladas. Cada solução reportada é
+verificada contra todas as restrições do modelo (`validacao.verificar_restricoes`);
+o resultado fica nas colunas `viavel` e `violacoes`, e o gap em relação ao
+limitante superior da instância (`limitantes.limitante_superior`) nas colunas
+`limitante` e `gap`. Algoritmos que aceitam `gap_alvo` (grasp, recozimento,
+ils) param ao atingi-lo, por exemplo `grasp:iteracoes=200,gap_alvo=0.05`.
+
+Uso (a partir de `core/`):
+    python -m utils.experimentos "inst*.txt" -a heuristica_original hc1 "grasp:iteracoes=50,alpha=0.3" \\
+        -s 0 1 2 -l 10 60 -r resultados.csv -p 4
+
+Parâmetros de algoritmo seguem o formato `nome:chave=valor,chave=valor`; listas
+usam `/` (por exemplo, `grasp:alphas=0.1/0.3/0.5`).
+"""
+import argparse
+import csv
+import datetime
+import glob
+import os
+import random
+import sqlite3
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .calcular_custo_total import avaliar_solucao
+from .carregar_parametros_otimizacao import carregar_parametros_otimizacao
+from .construir_solucao_grasp import construir_solucao_grasp
+from .gerar_solucao_inicial_hc1_atualizada import gerar_solucao_inicial_hc1_atualizada
+from .grasp import executar_grasp
+from .heuristicaInteiros import gerar_solucao_heuristica_original
+from .limitantes import calcular_gap, limitante_superior
+from .metaheuristica import busca_local_iterada, recozimento_simulado
+from .validacao import verificar_restricoes
+
+Algoritmo = namedtuple("Algoritmo", ["funcao", "usa_semente", "usa_tempo_limite"])
+
+
+def _executar_grasp(parametros, semente, tempo_limite, iteracoes=20, **opcoes):
+    resultado = executar_grasp(parametros, iteracoes, semente=semente, num_processos=1,
+                               tempo_limite=tempo_limite, **opcoes)
+    if resultado.melhor_solucao is None:
+        raise ValueError("GRASP não concluiu nenhuma iteração no tempo limite.")
+    return resultado.melhor_solucao, {"iteracoes": len(resultado.iteracoes)}
+
+
+def _executar_metaheuristica(metodo, iteracoes_padrao):
+    """Metaheurística a partir de uma construção GRASP com a mesma semente; sem limite de tempo, usa `iteracoes`."""
+    def executar(parametros, semente, tempo_limite, iteracoes=iteracoes_padrao, alpha=0.3, **opcoes):
+        inicial = construir_solucao_grasp(parametros, alpha, rng=random.Random(semente))
+        resultado = metodo(inicial, parametros, max_iteracoes=None if tempo_limite is not None else iteracoes,
+                           tempo_limite=tempo_limite, semente=semente, **opcoes)
+        return resultado.melhor_solucao, {"iteracoes": resultado.iteracoes}
+    return executar
+
+
+ALGORITMOS = {
+    "heuristica_original": Algoritmo(lambda parametros, semente, tempo_limite: (gerar_solucao_heuristica_original(parametros), {}), False, False),
+    "hc1": Algoritmo(lambda parametros, semente, tempo_limite: (gerar_solucao_inicial_hc1_atualizada(parametros), {}), False, False),
+    "grasp": Algoritmo(_executar_grasp, True, True),
+    "recozimento": Algoritmo(_executar_metaheuristica(recozimento_simulado, 20000), True, True),
+    "ils": Algoritmo(_executar_metaheuristica(busca_local_iterada, 20), True, True),
+}
+
+CAMPOS = (
+    "instancia", "algoritmo", "semente", "tempo_limite", "status", "fo", "receita", "custo_estoque",
+    "custo_setup", "pedidos_aceitos", "iteracoes", "tempo", "erro", "data", "viavel", "violacoes",
+    "limitante", "gap",
+)
+CHAVE = ("instancia", "algoritmo", "semente", "tempo_limite")
+
+
+def _converter_valor(texto):
+    if "/" in texto:
+        return [_converter_valor(parte) for parte in texto.split("/")]
+    if texto in ("True", "False"):
+        return texto == "True"
+    for tipo in (int, float):
+        try:
+            return tipo(texto)
+        except ValueError:
+            pass
+    return texto
+
+
+def interpretar_algoritmo(especificacao):
+    """
+    Converte "nome:chave=valor,..." em (nome, opcoes).
+
+    Raises:
+        ValueError: Se o algoritmo não estiver registrado em ALGORITMOS.
+    """
+    nome, _, resto = especificacao.partition(":")
+    if nome not in ALGORITMOS:
+        raise ValueError(f"Algoritmo desconhecido: {nome}. Use um de {sorted(ALGORITMOS)}.")
+    opcoes = {}
+    for par in filter(None, resto.split(",")):
+        chave, _, valor = par.partition("=")
+        opcoes[chave.strip()] = _converter_valor(valor.strip())
+    return nome, opcoes
+
+
+def montar_grade(instancias, algoritmos, sementes, tempos_limite):
+    """
+    Lista de células (instancia, especificacao, semente, tempo_limite). Algoritmos
+    determinísticos ou sem limite de tempo geram uma única célula por instância
+    nessas dimensões (semente 0 / limite vazio).
+    """
+    grade = []
+    for instancia in instancias:
+        for especificacao in algoritmos:
+            algoritmo = ALGORITMOS[interpretar_algoritmo(especificacao)[0]]
+            for semente in (sementes if algoritmo.usa_semente else [0]):
+                for tempo_limite in (tempos_limite if algoritmo.usa_tempo_limite else [None]):
+                    grade.append((instancia, especificacao, semente, tempo_limite))
+    return grade
+
+
+def _chave_celula(instancia, algoritmo, semente, tempo_limite):
+    """Chave textual da célula, igual à que é lida de volta do arquivo de resultados."""
+    return (instancia, algoritmo, str(semente), "" if tempo_limite is None else str(float(tempo_limite)))
+
+
+class ResultadosCSV:
+    """
+    Arquivo CSV apenas de inserção; cada linha é gravada e descarregada em disco ao chegar.
+    Um arquivo existente mantém as colunas do seu cabeçalho.
+    """
+
+    def __init__(self, caminho):
+        self.caminho = caminho
+        novo = not os.path.exists(caminho) or os.path.getsize(caminho) == 0
+        campos = CAMPOS
+        if not novo:
+            with open(caminho, newline="") as arquivo:
+                campos = next(csv.reader(arquivo))
+        self._campos = campos
+        self._arquivo = open(caminho, "a", newline="")
+        self._escritor = csv.DictWriter(self._arquivo, fieldnames=campos, extrasaction="ignore")
+        if novo:
+            self._escritor.writeheader()
+            self._arquivo.flush()
+
+    def concluidas(self):
+        with open(self.caminho, newline="") as arquivo:
+            return {tuple(linha[c] for c in CHAVE) for linha in csv.DictReader(arquivo) if linha["status"] == "ok"}
+
+    def registrar(self, resultado):
+        self._escritor.writerow({c: "" if resultado.get(c) is None else resultado[c] for c in self._campos})
+        self._arquivo.flush()
+        os.fsync(self._arquivo.fileno())
+
+    def fechar(self):
+        self._arquivo.close()
+
+
+class ResultadosSQLite:
+    """
+    Tabela SQLite apenas de inserção (uma transação por resultado). Colunas
+    ausentes em uma tabela existente são acrescentadas.
+    """
+
+    def __init__(self, caminho):
+        self._conexao = sqlite3.connect(caminho)
+        colunas = ", ".join(f"{c} TEXT" for c in CAMPOS)
+        self._conexao.execute(f"CREATE TABLE IF NOT EXISTS resultados ({colunas})")
+        existentes = {linha[1] for linha in self._conexao.execute("PRAGMA table_info(resultados)")}
+        for campo in CAMPOS:
+            if campo not in existentes:
+                self._conexao.execute(f"ALTER TABLE resultados ADD COLUMN {campo} TEXT")
+        self._conexao.commit()
+
+    def concluidas(self):
+        consulta = f"SELECT {', '.join(CHAVE)} FROM resultados WHERE status = 'ok'"
+        return {tuple(linha) for linha in self._conexao.execute(consulta)}
+
+    def registrar(self, resultado):
+        valores = ["" if resultado.get(c) is None else str(resultado[c]) for c in CAMPOS]
+        self._conexao.execute(f"INSERT INTO resultados ({', '.join(CAMPOS)}) VALUES ({', '.join('?' * len(CAMPOS))})",
+                              valores)
+        self._conexao.commit()
+
+    def fechar(self):
+        self._conexao.close()
+
+
+def abrir_resultados(caminho):
+    """Abre o arquivo de resultados; o formato é escolhido pela extensão (.csv, .db/.sqlite)."""
+    if os.path.splitext(caminho)[1].lower() in (".db", ".sqlite", ".sqlite3"):
+        return ResultadosSQLite(caminho)
+    return ResultadosCSV(caminho)
+
+
+def executar_celula(instancia, especificacao, semente, tempo_limite):
+    """
+    Executa uma célula da grade e devolve a linha de resultado. Erros são
+    registrados na linha (status "erro") em vez de interromper o experimento.
+    """
+    resultado = {
+        "instancia": instancia, "algoritmo": especificacao, "semente": semente,
+        "tempo_limite": None if tempo_limite is None else float(tempo_limite),
+    }
+    inicio = time.perf_counter()
+    try:
+        nome, opcoes = interpretar_algoritmo(especificacao)
+        parametros = carregar_parametros_otimizacao(instancia, usar_cache=True)
+        solucao, extras = ALGORITMOS[nome].funcao(parametros, semente, tempo_limite, **opcoes)
+        fo = avaliar_solucao(solucao, parametros)
+        relatorio = verificar_restricoes(solucao, parametros)
+        limitante = limitante_superior(parametros).valor
+        resultado.update(
+            status="ok", fo=fo.lucro, receita=fo.receita, custo_estoque=fo.custo_estoque,
+            custo_setup=fo.custo_setup, pedidos_aceitos=int(solucao["gamma"].sum()),
+            iteracoes=extras.get("iteracoes"), viavel=relatorio.viavel, violacoes=len(relatorio),
+            limitante=limitante, gap=calcular_gap(fo.lucro, limitante),
+        )
+    except Exception as erro:
+        resultado.update(status="erro", erro=f"{type(erro).__name__}: {erro}")
+    resultado["tempo"] = round(time.perf_counter() - inicio, 4)
+    resultado["data"] = datetime.datetime.now().isoformat(timespec="seconds")
+    return resultado
+
+
+def executar_experimento(instancias, algoritmos, sementes=(0,), tempos_limite=(None,), arquivo_resultados="resultados.csv",
+                         num_processos=None, ao_concluir=None):
+    """
+    Executa a grade de experimentos, pulando as células já concluídas no arquivo de resultados.
+
+    Args:
+        instancias (list): Caminhos das instâncias.
+        algoritmos (list): Especificações "nome:chave=valor,...".
+        sementes (list): Sementes (apenas para algoritmos aleatórios).
+        tempos_limite (list): Limites de tempo em segundos (apenas para algoritmos que os aceitam).
+        arquivo_resultados (str): Arquivo .csv ou .db/.sqlite.
+        num_processos (int, optional): Tamanho do pool (None usa todos os núcleos).
+        ao_concluir (callable, optional): Chamado com cada linha de resultado.
+
+    Returns:
+        dict: Contagem de células na grade, puladas, executadas e com erro.
+    """
+    grade = montar_grade(instancias, algoritmos, sementes, tempos_limite)
+    resultados = abrir_resultados(arquivo_resultados)
+    try:
+        concluidas = resultados.concluidas()
+        pendentes = [celula for celula in grade if _chave_celula(*celula) not in concluidas]
+        resumo = {"celulas": len(grade), "puladas": len(grade) - len(pendentes), "executadas": 0, "erros": 0}
+        with ProcessPoolExecutor(max_workers=num_processos) as executor:
+            futuros = [executor.submit(executar_celula, *celula) for celula in pendentes]
+            for futuro in as_completed(futuros):
+                resultado = futuro.result()
+                resultados.registrar(resultado)
+                resumo["executadas"] += 1
+                resumo["erros"] += resultado["status"] != "ok"
+                if ao_concluir is not None:
+                    ao_concluir(resultado)
+    finally:
+        resultados.fechar()
+    return resumo
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Executa uma grade de experimentos com resultados retomáveis.")
+    parser.add_argument("instancias", nargs="+", help="Arquivos ou padrões glob de instâncias (ex.: 'inst*.txt').")
+    parser.add_argument("-a", "--algoritmos", nargs="+", required=True,
+                        help=f"Algoritmos ({', '.join(ALGORITMOS)}), com parâmetros opcionais 'nome:chave=valor,...'.")
+    parser.add_argument("-s", "--sementes", nargs="+", type=int, default=[0])
+    parser.add_argument("-l", "--tempos-limite", nargs="+", type=float, default=None)
+    parser.add_argument("-r", "--resultados", default="resultados.csv", help="Arquivo .csv ou .db/.sqlite.")
+    parser.add_argument("-p", "--processos", type=int, default=None)
+    args = parser.parse_args(argumentos)
+
+    instancias = sorted({caminho for padrao in args.instancias for caminho in (glob.glob(padrao) or [padrao])})
+    for especificacao in args.algoritmos:
+        try:
+            interpretar_algoritmo(especificacao)
+        except ValueError as erro:
+            parser.error(str(erro))
+
+    def mostrar(resultado):
+        if resultado["status"] != "ok":
+            fo = resultado["erro"]
+        else:
+            fo = f"{float(resultado['fo']):.2f} (gap {resultado['gap']:.2%})"
+            if not resultado["viavel"]:
+                fo += f" (inviável: {resultado['violacoes']} violações)"
+        print(f"{resultado['instancia']} | {resultado['algoritmo']} | semente={resultado['semente']} "
+              f"| limite={resultado['tempo_limite']} | {fo} | {resultado['tempo']:.2f}s", flush=True)
+
+    resumo = executar_experimento(instancias, args.algoritmos, args.sementes, args.tempos_limite or [None],
+                                  args.resultados, args.processos, ao_concluir=mostrar)
+    print(f"{resumo['celulas']} células: {resumo['puladas']} já concluídas, "
+          f"{resumo['executadas']} executadas ({resumo['erros']} com erro).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Gerador de instâncias sintéticas no formato lido por `carregar_parametros_otimizacao`.
+
+Uso (a partir de `core/`):
+    python -m utils.gerador_instancias instancia.txt -J 200 -T 30 -N 2000 --semente 7
+    python -m utils.gerador_instancias --familia instancias_escala/
+"""
+import argparse
+import math
+import os
+
+import numpy as np
+
+# Tamanhos (J, T, N) da família de instâncias de escalonamento
+TAMANHOS_ESCALONAMENTO = (
+    (5, 5, 5), (25, 5, 50), (50, 10, 200), (100, 20, 500), (200, 30, 1000), (300, 40, 2000), (500, 50, 5000),
+)
+
+
+def _inteiros(rng, intervalo, tamanho=None):
+    minimo, maximo = intervalo
+    return rng.integers(minimo, maximo + 1, size=tamanho)
+
+
+def gerar_matriz_setup(rng, num_itens, tempo_setup=(1, 10), desigualdade_triangular=True, simetrica=False):
+    """
+    Matriz de tempos de setup com diagonal zero. Com `desigualdade_triangular`,
+    os tempos são substituídos pelos caminhos mínimos (Floyd-Warshall), o que
+    garante t[i][j] <= t[i][k] + t[k][j] mantendo valores inteiros.
+    """
+    matriz = _inteiros(rng, tempo_setup, (num_itens, num_itens))
+    if simetrica:
+        matriz = np.triu(matriz) + np.triu(matriz, 1).T
+    np.fill_diagonal(matriz, 0)
+    if desigualdade_triangular:
+        for k in range(num_itens):
+            np.minimum(matriz, matriz[:, k:k + 1] + matriz[k:k + 1, :], out=matriz)
+    return matriz
+
+
+def gerar_instancia(num_itens, num_periodos, num_pedidos, semente=0, densidade_demanda=0.4, demanda=(40, 60),
+                    tempo_setup=(1, 10), custo_por_tempo_setup=50, desigualdade_triangular=True, simetrica=False,
+                    aperto_capacidade=1.0, vida_util=(1, 3), largura_janela=(0, 2), tempo_producao=(1, 1),
+                    custo_estoque=(1, 10), preco=(8, 25)):
+    """
+    Gera uma instância sintética reprodutível.
+
+    Args:
+        num_itens, num_periodos, num_pedidos (int): Dimensões J, T e N.
+        semente (int): Semente do gerador.
+        densidade_demanda (float): Probabilidade de um pedido conter cada item
+            (todo pedido tem pelo menos um item).
+        demanda (tuple): Intervalo das quantidades demandadas.
+        tempo_setup (tuple): Intervalo dos tempos de setup entre itens distintos.
+        custo_por_tempo_setup (int): Custo de setup por unidade de tempo de setup.
+        desigualdade_triangular (bool): Impõe a desigualdade triangular nos tempos de setup.
+        simetrica (bool): Gera tempos de setup simétricos.
+        aperto_capacidade (float): Razão entre a carga média por período (produção +
+            estimativa de setup) e a capacidade; acima de 1, nem todos os pedidos cabem.
+        vida_util (tuple): Intervalo do shelf-life dos itens, em períodos.
+        largura_janela (tuple): Intervalo da largura das janelas de entrega
+            (fim - início, limitada pelo horizonte).
+        tempo_producao, custo_estoque, preco (tuple): Intervalos por item; a receita
+            de um pedido é a soma de demanda × preço, igual em todos os períodos da janela.
+
+    Returns:
+        dict: Parâmetros no mesmo formato de `carregar_parametros_otimizacao`.
+    """
+    rng = np.random.default_rng(semente)
+
+    presente = rng.random((num_pedidos, num_itens)) < densidade_demanda
+    presente[np.arange(num_pedidos), rng.integers(0, num_itens, size=num_pedidos)] = True
+    demanda_pedidos = np.where(presente, _inteiros(rng, demanda, (num_pedidos, num_itens)), 0)
+
+    matriz_tempo = gerar_matriz_setup(rng, num_itens, tempo_setup, desigualdade_triangular, simetrica)
+    custo_setup = matriz_tempo * custo_por_tempo_setup
+
+    inicio = rng.integers(0, num_periodos, size=num_pedidos)
+    fim = np.minimum(inicio + _inteiros(rng, largura_janela, num_pedidos), num_periodos - 1)
+
+    tempos_producao = _inteiros(rng, tempo_producao, num_itens)
+    custos_estoque = _inteiros(rng, custo_estoque, num_itens)
+    vidas = _inteiros(rng, vida_util, num_itens)
+    precos = _inteiros(rng, preco, num_itens)
+
+    periodos = np.arange(num_periodos)
+    janela = (periodos[None, :] >= inicio[:, None]) & (periodos[None, :] <= fim[:, None])
+    receita_pedido = np.where(janela, (demanda_pedidos @ precos)[:, None], 0)
+
+    # Carga de produção de cada pedido distribuída igualmente pelos períodos da sua janela,
+    # suavizada com a média do horizonte, mais uma estimativa do setup por período.
+    carga_pedido = demanda_pedidos @ tempos_producao
+    carga_periodo = (janela * (carga_pedido / janela.sum(axis=1))[:, None]).sum(axis=0)
+    carga_periodo = 0.5 * carga_periodo + 0.5 * carga_periodo.mean()
+    itens_por_periodo = min(num_itens, math.ceil(presente.sum() / num_periodos))
+    setup_estimado = matriz_tempo[~np.eye(num_itens, dtype=bool)].mean() * itens_por_periodo if num_itens > 1 else 0.0
+    capacidade_periodo = np.ceil((carga_periodo + setup_estimado) / aperto_capacidade).astype(int)
+
+    return {
+        "num_itens": num_itens,
+        "num_periodos": num_periodos,
+        "num_pedidos": num_pedidos,
+        "demanda_pedidos": demanda_pedidos,
+        "custo_setup": custo_setup,
+        "tempo_setup": matriz_tempo,
+        "periodo_inicial_entrega": inicio,
+        "periodo_final_entrega": fim,
+        "capacidade_periodo": capacidade_periodo,
+        "tempo_producao": tempos_producao,
+        "custo_estoque": custos_estoque,
+        "receita_pedido": receita_pedido,
+        "vida_util": vidas,
+    }
+
+
+def _linha(valores):
+    return "".join(f"{int(v)} " for v in valores) + "\n"
+
+
+def escrever_instancia(parametros, caminho):
+    """Grava os parâmetros no formato texto das instâncias (mesmo layout dos arquivos inst*.txt)."""
+    J, T, N = parametros["num_itens"], parametros["num_periodos"], parametros["num_pedidos"]
+    partes = [f"{J}   {T}   {N}\n\n"]
+    partes.extend(_linha(linha) for linha in parametros["demanda_pedidos"])
+    partes.append("\n\n")
+    custo, tempo = parametros["custo_setup"], parametros["tempo_setup"]
+    partes.extend(f"{int(custo[i, j])}  {int(tempo[i, j])}\n" for i in range(J) for j in range(J))
+    partes.append("\n\n")
+    partes.extend(f"{int(a)}  {int(b)}\n" for a, b in zip(parametros["periodo_inicial_entrega"], parametros["periodo_final_entrega"]))
+    partes.append("\n\n")
+    for nome in ("capacidade_periodo", "tempo_producao", "custo_estoque"):
+        partes.append(_linha(parametros[nome]))
+        partes.append("\n")
+    partes.extend(_linha(linha) for linha in parametros["receita_pedido"])
+    partes.append("\n\n")
+    partes.append(_linha(parametros["vida_util"])[:-1])
+
+    os.makedirs(os.path.dirname(os.path.abspath(caminho)), exist_ok=True)
+    with open(caminho, "w") as arquivo:
+        arquivo.write("".join(partes))
+
+
+def gerar_familia_escalonamento(diretorio, tamanhos=TAMANHOS_ESCALONAMENTO, semente=0, **opcoes):
+    """
+    Grava uma família de instâncias de tamanho crescente, `escala_J{J}_T{T}_N{N}.txt`.
+
+    Returns:
+        list: Caminhos dos arquivos gerados.
+    """
+    caminhos = []
+    for indice, (J, T, N) in enumerate(tamanhos):
+        caminho = os.path.join(diretorio, f"escala_J{J}_T{T}_N{N}.txt")
+        escrever_instancia(gerar_instancia(J, T, N, semente=semente + indice, **opcoes), caminho)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def _intervalo(texto):
+    partes = [int(v) for v in texto.split(",")]
+    return (partes[0], partes[-1])
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Gera instâncias sintéticas do PDSLAP.")
+    parser.add_argument("saida", help="Arquivo da instância ou, com --familia, diretório de saída.")
+    parser.add_argument("--familia", action="store_true", help="Gera a família de instâncias de escalonamento.")
+    parser.add_argument("-J", "--itens", type=int, default=25)
+    parser.add_argument("-T", "--periodos", type=int, default=5)
+    parser.add_argument("-N", "--pedidos", type=int, default=50)
+    parser.add_argument("--semente", type=int, default=0)
+    parser.add_argument("--densidade-demanda", type=float, default=0.4)
+    parser.add_argument("--demanda", type=_intervalo, default=(40, 60), help="Intervalo 'min,max'.")
+    parser.add_argument("--tempo-setup", type=_intervalo, default=(1, 10), help="Intervalo 'min,max'.")
+    parser.add_argument("--sem-desigualdade-triangular", action="store_true")
+    parser.add_argument("--simetrica", action="store_true")
+    parser.add_argument("--aperto-capacidade", type=float, default=1.0)
+    parser.add_argument("--vida-util", type=_intervalo, default=(1, 3), help="Intervalo 'min,max'.")
+    parser.add_argument("--largura-janela", type=_intervalo, default=(0, 2), help="Intervalo 'min,max'.")
+    args = parser.parse_args(argumentos)
+
+    opcoes = dict(
+        densidade_demanda=args.densidade_demanda, demanda=args.demanda, tempo_setup=args.tempo_setup,
+        desigualdade_triangular=not args.sem_desigualdade_triangular, simetrica=args.simetrica,
+        aperto_capacidade=args.aperto_capacidade, vida_util=args.vida_util, largura_janela=args.largura_janela,
+    )
+    if args.familia:
+        for caminho in gerar_familia_escalonamento(args.saida, semente=args.semente, **opcoes):
+            print(caminho)
+    else:
+        parametros = gerar_instancia(args.itens, args.periodos, args.pedidos, semente=args.semente, **opcoes)
+        escrever_instancia(parametros, args.saida)
+        print(args.saida)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,350 @@
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+from .busca_local import busca_local
+from .calcular_custo_total import avaliar_solucao
+from .construir_solucao_grasp import construir_solucao_grasp
+from .limitantes import atingiu_gap, calcular_gap, limitante_superior
+from .reconexao_caminhos import ConjuntoElite, intensificar_com_reconexao
+from .registro import obter_registrador
+
+registrador = obter_registrador(__name__)
+
+# Parâmetros da instância em cada processo trabalhador (definidos no inicializador do pool)
+_PARAMETROS_TRABALHADOR = None
+
+
+def derivar_sementes(semente, quantidade):
+    """
+    Deriva `quantidade` sementes independentes a partir de uma semente mestre.
+
+    A semente de cada iteração depende apenas da semente mestre e do índice da
+    iteração, nunca do processo que a executa, o que torna o resultado
+    reprodutível para qualquer número de trabalhadores.
+    """
+    filhas = np.random.SeedSequence(semente).spawn(quantidade)
+    return [int(filha.generate_state(1)[0]) for filha in filhas]
+
+
+def executar_iteracao_grasp(parametros, indice, semente, alpha, opcoes_busca=None):
+    """
+    Executa uma iteração GRASP completa: construção gulosa randomizada + busca local.
+
+    Args:
+        parametros (dict): Parâmetros do problema.
+        indice (int): Índice da iteração (usado apenas no relatório).
+        semente (int): Semente do gerador aleatório desta iteração.
+        alpha (float): Parâmetro alpha da construção.
+        opcoes_busca (dict, optional): Argumentos repassados a `busca_local`;
+            None desativa a busca local.
+
+    Returns:
+        tuple: (solucao, estatisticas) com as estatísticas da iteração em um dicionário.
+    """
+    rng = random.Random(semente)
+    inicio = time.perf_counter()
+    solucao = construir_solucao_grasp(parametros, alpha, rng=rng)
+    tempo_construcao = time.perf_counter() - inicio
+    fo_construcao = avaliar_solucao(solucao, parametros).lucro
+
+    fo = fo_construcao
+    movimentos_aplicados = 0
+    tempo_busca = 0.0
+    if opcoes_busca is not None:
+        resultado = busca_local(solucao, parametros, **opcoes_busca)
+        solucao, fo = resultado.solucao, resultado.fo
+        movimentos_aplicados = resultado.iteracoes
+        tempo_busca = resultado.tempo_total
+
+    estatisticas = {
+        "iteracao": indice,
+        "semente": semente,
+        "alpha": alpha,
+        "fo_construcao": fo_construcao,
+        "fo": fo,
+        "movimentos_aplicados": movimentos_aplicados,
+        "tempo_construcao": tempo_construcao,
+        "tempo_busca_local": tempo_busca,
+    }
+    return solucao, estatisticas
+
+
+def _inicializar_trabalhador(parametros):
+    global _PARAMETROS_TRABALHADOR
+    _PARAMETROS_TRABALHADOR = parametros
+
+
+def _executar_tarefa(tarefa):
+    indice, semente, alpha, opcoes_busca = tarefa
+    return executar_iteracao_grasp(_PARAMETROS_TRABALHADOR, indice, semente, alpha, opcoes_busca)
+
+
+class SelecaoAlphaReativa:
+    """
+    Seleção adaptativa de alpha do GRASP reativo.
+
+    Mantém um conjunto discreto de valores de alpha com probabilidades de
+    seleção. A cada atualização, a qualidade de cada alpha é a FO média das
+    soluções que ele produziu, normalizada entre a pior e a melhor FO já vistas,
+    elevada a `expoente`; as probabilidades são essas qualidades re-normalizadas.
+    Alphas ainda não usados mantêm a qualidade média, e nenhuma probabilidade
+    fica abaixo de `probabilidade_minima`, para que todos continuem sendo testados.
+    """
+
+    def __init__(self, alphas, expoente=10, rng=None, probabilidade_minima=0.01):
+        self.alphas = list(alphas)
+        self.expoente = expoente
+        self.probabilidade_minima = probabilidade_minima
+        self.rng = rng if rng is not None else random.Random()
+        self.probabilidades = np.full(len(self.alphas), 1.0 / len(self.alphas))
+        self.usos = np.zeros(len(self.alphas), dtype=int)
+        self.soma_fo = np.zeros(len(self.alphas))
+        self.melhor_fo = np.full(len(self.alphas), -np.inf)
+        self.historico_probabilidades = [self.probabilidades.copy()]
+
+    def sortear(self):
+        """Sorteia o índice de um alpha segundo as probabilidades atuais."""
+        return self.rng.choices(range(len(self.alphas)), weights=self.probabilidades)[0]
+
+    def registrar(self, indice_alpha, fo):
+        self.usos[indice_alpha] += 1
+        self.soma_fo[indice_alpha] += fo
+        self.melhor_fo[indice_alpha] = max(self.melhor_fo[indice_alpha], fo)
+
+    def atualizar(self):
+        """Recalcula e re-normaliza as probabilidades a partir das médias observadas."""
+        usados = self.usos > 0
+        if not usados.any():
+            return
+        medias = np.zeros(len(self.alphas))
+        medias[usados] = self.soma_fo[usados] / self.usos[usados]
+        melhor = self.melhor_fo[usados].max()
+        pior = medias[usados].min()
+        amplitude = melhor - pior
+        if amplitude <= 0:
+            qualidade = np.ones(len(self.alphas))
+        else:
+            qualidade = np.empty(len(self.alphas))
+            qualidade[usados] = ((medias[usados] - pior) / amplitude + 1e-3) ** self.expoente
+            qualidade[~usados] = qualidade[usados].mean()
+        probabilidades = np.maximum(qualidade / qualidade.sum(), self.probabilidade_minima)
+        self.probabilidades = probabilidades / probabilidades.sum()
+        self.historico_probabilidades.append(self.probabilidades.copy())
+
+    def estatisticas(self):
+        """Estatísticas por alpha: usos, FO média, melhor FO e probabilidade final."""
+        return [
+            {
+                "alpha": alpha,
+                "usos": int(self.usos[i]),
+                "fo_media": float(self.soma_fo[i] / self.usos[i]) if self.usos[i] else None,
+                "melhor_fo": float(self.melhor_fo[i]) if self.usos[i] else None,
+                "probabilidade": float(self.probabilidades[i]),
+            }
+            for i, alpha in enumerate(self.alphas)
+        ]
+
+
+class ResultadoGRASP:
+    """Resultado de uma execução do GRASP."""
+
+    def __init__(self, melhor_solucao, melhor_fo, iteracoes, tempo_total, selecao_alpha=None,
+                 estatisticas_reconexao=None, limitante=None):
+        self.melhor_solucao = melhor_solucao
+        self.melhor_fo = melhor_fo
+        self.iteracoes = iteracoes  # lista de dicionários, ordenada pelo índice da iteração
+        self.tempo_total = tempo_total
+        # Apenas no modo reativo
+        self.estatisticas_alpha = selecao_alpha.estatisticas() if selecao_alpha else None
+        self.historico_probabilidades = selecao_alpha.historico_probabilidades if selecao_alpha else None
+        # Apenas com reconexão de caminhos
+        self.estatisticas_reconexao = estatisticas_reconexao
+        self.limitante = limitante
+
+    @property
+    def gap(self):
+        if self.limitante is None or self.melhor_fo is None:
+            return None
+        return calcular_gap(self.melhor_fo, self.limitante)
+
+    @property
+    def melhor_iteracao(self):
+        return max(self.iteracoes, key=lambda est: (est["fo"], -est["iteracao"]))["iteracao"]
+
+    def relatorio(self):
+        fos = [est["fo"] for est in self.iteracoes]
+        linhas = [f"GRASP: {len(self.iteracoes)} iterações em {self.tempo_total:.2f}s"]
+        if fos:
+            linhas += [
+                f"  melhor FO: {self.melhor_fo:.2f} (iteração {self.melhor_iteracao})",
+                f"  FO média: {np.mean(fos):.2f} | pior FO: {min(fos):.2f}",
+            ]
+        if self.gap is not None:
+            linhas.append(f"  limitante superior: {self.limitante:.2f} | gap: {self.gap:.2%}")
+        if self.estatisticas_alpha:
+            linhas.append("  alphas (reativo):")
+            for est in self.estatisticas_alpha:
+                media = f"{est['fo_media']:.2f}" if est["fo_media"] is not None else "-"
+                linhas.append(f"    alpha={est['alpha']:<5} usos={est['usos']:<5} FO média={media:<10} p={est['probabilidade']:.3f}")
+        if self.estatisticas_reconexao:
+            est = self.estatisticas_reconexao
+            linhas.append(
+                f"  reconexão ({est['modo']}): {est['pares_reconectados']}/{est['pares_total']} pares em "
+                f"{est['tempo']:.2f}s, FO {est['fo_antes']:.2f} -> {est['fo_depois']:.2f}"
+            )
+        return linhas
+
+
+@contextmanager
+def _executor_iteracoes(parametros, num_processos):
+    """
+    Fornece uma função que executa uma lista de tarefas GRASP, sequencialmente
+    (num_processos == 1) ou em um pool de processos, preservando a ordem.
+    """
+    if num_processos == 1:
+        yield lambda tarefas: (executar_iteracao_grasp(parametros, *tarefa) for tarefa in tarefas)
+    else:
+        with ProcessPoolExecutor(max_workers=num_processos, initializer=_inicializar_trabalhador,
+                                 initargs=(parametros,)) as executor:
+            yield lambda tarefas: executor.map(_executar_tarefa, tarefas)
+
+
+def executar_grasp(parametros, num_iteracoes, alpha=0.3, semente=0, num_processos=1,
+                   opcoes_busca=None, busca_local_ativa=True, alphas=None,
+                   tamanho_bloco=10, expoente_reativo=10, reconexao=False,
+                   modo_reconexao="mista", tempo_reconexao=None, tamanho_elite=10, tempo_limite=None,
+                   limitante=None, gap_alvo=None):
+    """
+    Executa N iterações independentes de construção + busca local do GRASP.
+
+    As iterações são distribuídas em um pool de processos (`concurrent.futures`).
+    Cada iteração recebe uma semente derivada da semente mestre e do seu índice,
+    e empates na FO são desfeitos pelo menor índice; assim o resultado é o mesmo
+    para qualquer número de processos.
+
+    Com `alphas` informado, executa o GRASP reativo: o alpha de cada iteração é
+    sorteado de `alphas` e as probabilidades são atualizadas a cada
+    `tamanho_bloco` iterações (ver SelecaoAlphaReativa). O sorteio é feito no
+    processo principal, o que mantém a reprodutibilidade.
+
+    Com `tempo_limite`, as iterações são executadas em blocos de `tamanho_bloco`
+    e nenhum bloco novo é iniciado depois de esgotado o tempo; o número de
+    iterações realizadas passa a depender da máquina. Com `gap_alvo`, também em
+    blocos, nenhum bloco novo é iniciado depois que o gap da melhor solução em
+    relação ao limitante superior fica abaixo do alvo.
+
+    Com `reconexao=True`, as soluções das iterações alimentam um conjunto elite
+    e, ao final, a reconexão de caminhos entre seus pares é executada como
+    estágio de intensificação, com orçamento de tempo próprio (ver
+    `reconexao_caminhos.intensificar_com_reconexao`).
+
+    Args:
+        parametros (dict): Parâmetros do problema.
+        num_iteracoes (int): Número de iterações GRASP.
+        alpha (float): Parâmetro alpha da construção (ignorado no modo reativo).
+        semente (int): Semente mestre.
+        num_processos (int, optional): Número de processos; 1 executa no próprio
+            processo e None usa todos os núcleos disponíveis.
+        opcoes_busca (dict, optional): Argumentos repassados a `busca_local`.
+        busca_local_ativa (bool): Se False, executa apenas a fase de construção.
+        alphas (list, optional): Valores discretos de alpha do modo reativo.
+        tamanho_bloco (int): Iterações entre atualizações das probabilidades.
+        expoente_reativo (float): Expoente que amplifica as diferenças de qualidade.
+        reconexao (bool): Ativa a reconexão de caminhos após as iterações.
+        modo_reconexao (str): "avancada", "reversa" ou "mista".
+        tempo_reconexao (float, optional): Tempo máximo do estágio de reconexão.
+        tamanho_elite (int): Tamanho máximo do conjunto elite.
+        tempo_limite (float, optional): Tempo máximo das iterações, em segundos.
+        limitante (float, optional): Limitante superior do lucro usado no gap; por
+            padrão, calculado com `limitantes.limitante_superior`.
+        gap_alvo (float, optional): Gap (por exemplo, 0.01 para 1%) a partir do
+            qual as iterações são interrompidas.
+
+    Returns:
+        ResultadoGRASP: Melhor solução encontrada, gap e estatísticas por iteração
+                        (e por alpha, no modo reativo).
+    """
+    if busca_local_ativa:
+        opcoes_busca = dict(opcoes_busca or {})
+    else:
+        opcoes_busca = None
+    sementes = derivar_sementes(semente, num_iteracoes)
+    if limitante is None:
+        limitante = limitante_superior(parametros).valor
+
+    inicio = time.perf_counter()
+    coletor = _ColetorIteracoes(ConjuntoElite(tamanho_elite) if reconexao else None)
+    selecao_alpha = None
+    if alphas is not None:
+        selecao_alpha = SelecaoAlphaReativa(alphas, expoente_reativo, rng=random.Random(semente))
+    em_blocos = alphas is not None or tempo_limite is not None or gap_alvo is not None
+    tamanho = tamanho_bloco if em_blocos else max(num_iteracoes, 1)
+
+    with _executor_iteracoes(parametros, num_processos) as executar:
+        for inicio_bloco in range(0, num_iteracoes, tamanho):
+            if tempo_limite is not None and time.perf_counter() - inicio >= tempo_limite:
+                break
+            if coletor.melhor_fo is not None and atingiu_gap(coletor.melhor_fo, limitante, gap_alvo):
+                break
+            indices = range(inicio_bloco, min(inicio_bloco + tamanho, num_iteracoes))
+            if selecao_alpha is None:
+                tarefas = [(i, sementes[i], alpha, opcoes_busca) for i in indices]
+                coletor.adicionar(executar(tarefas))
+                continue
+            escolhas = {i: selecao_alpha.sortear() for i in indices}
+            tarefas = [(i, sementes[i], selecao_alpha.alphas[escolhas[i]], opcoes_busca) for i in indices]
+            for estatisticas in coletor.adicionar(executar(tarefas)):
+                selecao_alpha.registrar(escolhas[estatisticas["iteracao"]], estatisticas["fo"])
+            selecao_alpha.atualizar()
+
+    melhor_solucao, melhor_fo = coletor.melhor_solucao, coletor.melhor_fo
+    estatisticas_reconexao = None
+    if reconexao and coletor.elite.solucoes:
+        estatisticas_reconexao = intensificar_com_reconexao(coletor.elite, parametros, modo_reconexao,
+                                                            tempo_reconexao, opcoes_busca)
+        if coletor.elite.melhor[0] > melhor_fo:
+            melhor_fo, melhor_solucao = coletor.elite.melhor
+
+    iteracoes = coletor.iteracoes()
+    tempo_total = time.perf_counter() - inicio
+    if melhor_fo is None:
+        registrador.info("GRASP: nenhuma iteração concluída em %.2fs", tempo_total)
+    else:
+        registrador.info("GRASP: %d iterações, melhor FO %.2f (gap %.2f%%) em %.2fs", len(iteracoes), melhor_fo,
+                         100 * calcular_gap(melhor_fo, limitante), tempo_total)
+    return ResultadoGRASP(melhor_solucao, melhor_fo, iteracoes, tempo_total, selecao_alpha, estatisticas_reconexao,
+                          limitante)
+
+
+class _ColetorIteracoes:
+    """
+    Mantém apenas a melhor solução (menor índice em caso de empate) e as estatísticas;
+    se `elite` for informado, oferece também cada solução ao conjunto elite.
+    """
+
+    def __init__(self, elite=None):
+        self.melhor_solucao = None
+        self.melhor_fo = None
+        self.elite = elite
+        self._iteracoes = []
+
+    def adicionar(self, resultados):
+        """Consome os resultados (na ordem das tarefas) e devolve suas estatísticas."""
+        novas = []
+        for solucao, estatisticas in resultados:
+            novas.append(estatisticas)
+            registrador.debug("Iteração %d (alpha = %s): FO construção %.2f, FO final %.2f", estatisticas["iteracao"],
+                              estatisticas["alpha"], estatisticas["fo_construcao"], estatisticas["fo"])
+            if self.melhor_fo is None or estatisticas["fo"] > self.melhor_fo:
+                self.melhor_solucao, self.melhor_fo = solucao, estatisticas["fo"]
+            if self.elite is not None:
+                self.elite.adicionar(solucao, estatisticas["fo"])
+        self._iteracoes.extend(novas)
+        return novas
+
+    def iteracoes(self):
+        return sorted(self._iteracoes, key=lambda est: est["iteracao"])
@@ -1,5 +1,16 @@
+import logging
+
 import numpy as np
 
+from .estado_periodos import EstadoPeriodos
+from .indice_instancia import obter_indice
+from .instrumentacao import INSTRUMENTACAO, cronometrado
+from .registro import obter_registrador
+from .solucao import Solucao
+from .validacao import RESTRICOES, verificar_restricoes
+
+registrador = obter_registrador(__name__)
+
 def calcular_FO(solucao, parametros):
     """
     Calcula o valor da função objetivo:
@@ -10,193 +21,119 @@ def calcular_FO(solucao, parametros):
     for t in range(parametros['num_periodos']):
         custo_setup_total += np.sum(parametros['custo_setup'] * solucao['z'][:, :, t])
     objetivo = receita_total - custo_setup_total
-    print(f"Lucro Bruto: {receita_total:.2f}")
-    print(f"Custo Setup: {custo_setup_total:.2f}")
-    print(f"Objetivo: {objetivo:.2f}")
+    registrador.info("Lucro Bruto: %.2f", receita_total)
+    registrador.info("Custo Setup: %.2f", custo_setup_total)
+    registrador.info("Objetivo: %.2f", objetivo)
     return objetivo
 
 def validar_restricoes(solucao, parametros):
     """
-    Valida todas as restrições do modelo com produção distribuída até o período de entrega.
-    """
-    N = parametros['num_pedidos']
-    J = parametros['num_itens']
-    T = parametros['num_periodos']
-    gamma = solucao['gamma']  # (N, T): 1 se pedido n é entregue em t
-    x = solucao['x']          # (J, N, T): produção do item j do pedido n no período t
-    y = solucao['y']          # (J, T)
-    z = solucao['z']          # (J, J, T)
-    V = solucao['V']          # (J, T)
-    demanda = parametros['demanda_pedidos']  # (N, J)
-    tempo_prod = parametros['tempo_producao']  # (J,)
-    tempo_setup = parametros['tempo_setup']  # (J, J)
-    capacidade = parametros['capacidade_periodo']  # (T,)
-
-    # --- 1. Cada pedido entregue no máximo uma vez ---
-    if np.any(np.sum(gamma, axis=1) > 1):
-        print("Violado: pedido entregue mais de uma vez.")
-        return False
-
-    # --- 2. Produção acumulada até t deve atender demanda se gamma_nt = 1 ---
-    for n in range(N):
-        for j in range(J):
-            acumulado = 0
-            for t in range(T):
-                acumulado += x[j, n, t]
-                if gamma[n, t] == 1 and acumulado < demanda[n, j]:
-                    print(f"Violado: pedido {n}, item {j} não produzido integralmente até t={t}.")
-                    return False
-
-    # --- 3. Capacidade por período ---
-    for t in range(T):
-        tempo_usado = 0.0
-        for j in range(J):
-            producao_jt = sum(x[j, n, t] for n in range(N))
-            tempo_usado += tempo_prod[j] * producao_jt
-        tempo_usado += np.sum(tempo_setup * z[:, :, t])
-        if tempo_usado > capacidade[t]:
-            print(f"Violado: capacidade excedida no período {t}. Usado: {tempo_usado:.2f}, Cap: {capacidade[t]:.2f}")
-            return False
-
-    # --- 4. Produção só se preparado ---
-    for j in range(J):
-        for t in range(T):
-            producao_jt = sum(x[j, n, t] for n in range(N))
-            if producao_jt > 0 and y[j, t] == 0:
-                print(f"Violado: produção do item {j} no período {t} sem setup.")
-                return False
-
-    # --- 5. Sequenciamento: V_jt >= V_it + 1 se z_ijt = 1 ---
-    for t in range(T):
-        for i in range(J):
-            for j in range(J):
-                if i != j and z[i, j, t] == 1:
-                    if V[j, t] < V[i, t] + 1:
-                        print(f"Violado: ordem inválida {i}→{j} em t={t}.")
-                        return False
-
-    # --- 6. Conservação de setup (fluxo) ---
-    for t in range(T - 1):
-        for j in range(J):
-            entrada = y[j, t] + np.sum(z[:, j, t])
-            saida = np.sum(z[j, :, t]) + y[j, t + 1]
-            if entrada != saida:
-                print(f"Violado: fluxo de setup para item {j} entre t={t} e {t+1}.")
-                return False
-
-    return True
+    Valida todas as restrições do modelo, em qualquer dos formatos de solução.
+
+    A verificação é vetorizada (`validacao.verificar_restricoes`) e encontra todas
+    as violações; para o relatório completo, com magnitudes, use aquela função.
 
+    Returns:
+        bool: True se nenhuma restrição for violada.
+    """
+    relatorio = verificar_restricoes(solucao, parametros)
+    if not relatorio.viavel and registrador.isEnabledFor(logging.INFO):
+        for restricao, magnitudes in relatorio.magnitudes.items():
+            if len(magnitudes):
+                nomes, descricao = RESTRICOES[restricao]
+                primeira = ", ".join(f"{nome}={int(i)}" for nome, i in zip(nomes, relatorio.indices[restricao][0]))
+                registrador.info("Violado: %s em %d ponto(s), magnitude total %.2f (primeiro: %s).",
+                                 descricao, len(magnitudes), magnitudes.sum(), primeira)
+        if registrador.isEnabledFor(logging.DEBUG):
+            for violacao in relatorio.violacoes():
+                registrador.debug("Violação %s em %s: magnitude %.2f", *violacao)
+    return relatorio.viavel
+
+@cronometrado("construcao.heuristica_original")
 def gerar_solucao_heuristica_original(parametros):
     """
-    Heurística que permite produção distribuída no tempo, mas entrega única.
+    Heurística de entrega única com toda a produção do pedido no próprio período
+    de entrega (idade 0), viável por construção.
+
+    Os pedidos são considerados em ordem decrescente da maior receita na janela
+    de entrega. Um livro-razão dos períodos (`EstadoPeriodos`) guarda a produção,
+    as sequências e o tempo já comprometido; todos os períodos da janela de um
+    pedido são pontuados de uma vez (receita menos um limitante inferior do custo
+    de setup dos itens que ainda não estão no período) e descartados se nem a
+    produção com o limitante do tempo de setup cabe na capacidade livre. Os
+    restantes são verificados, na ordem da pontuação, sequenciando o período com
+    os itens do pedido e re-sequenciando os períodos seguintes cujo setup de
+    entrada muda; o pedido vai para o primeiro que cabe ou é rejeitado.
+
+    Returns:
+        Solucao: Solução no formato compartilhado; a produção por pedido e a ordem V
+                 são recuperáveis por `producao_por_pedido()` e `ordem_producao()`.
     """
-    N, J, T = parametros['num_pedidos'], parametros['num_itens'], parametros['num_periodos']
-    demanda = parametros['demanda_pedidos']      # (N, J)
-    receita = parametros['receita_pedido']       # (N, T)
-    custo_setup = parametros['custo_setup']      # (J, J)
-    tempo_setup = parametros['tempo_setup']      # (J, J)
-    capacidade = parametros['capacidade_periodo']  # (T,)
-    tempo_prod = parametros['tempo_producao']    # (J,)
-
-    # Inicializar variáveis
-    gamma = np.zeros((N, T), dtype=int)
-    x = np.zeros((J, N, T), dtype=int)  # x[j,n,t]: produção do item j do pedido n no período t
-    y = np.zeros((J, T), dtype=int)
-    z = np.zeros((J, J, T), dtype=int)
-    V = np.zeros((J, T), dtype=int)
-
-    # Acumular capacidade disponível ao longo do tempo
-    cap_acumulada = np.cumsum([c for c in capacidade])  # cap total até t
-
-    # Ordenar pedidos por lucro máximo
-    prioridades = [(np.max(receita[n]), n) for n in range(N)]
-    prioridades.sort(reverse=True)
-
-    for _, n in prioridades:
-        best_t = -1
-        best_seq = None
-        melhor_lucro = -np.inf
-
-        # Tentar entregar o pedido n no período t
-        for t_entrega in range(T):
-            if np.sum(gamma[n]) > 0:
-                continue  # já alocado
-
-            # Verificar se é possível produzir todo o pedido n até t_entrega
-            tempo_total_necessario = 0.0
-            setup_tempo_potencial = 0.0
-            itens_pedido = np.where(demanda[n] > 0)[0]
-
-            # Tempo de produção
-            for j in itens_pedido:
-                tempo_total_necessario += tempo_prod[j] * demanda[n, j]
-
-            # Estimar tempo de setup: sequência mínima entre itens do pedido
-            if len(itens_pedido) > 1:
-                seq = [itens_pedido[0]]
-                rem = set(itens_pedido[1:])
-                while rem:
-                    last = seq[-1]
-                    next_j = min(rem, key=lambda j: custo_setup[last, j])
-                    seq.append(next_j)
-                    rem.remove(next_j)
-                setup_tempo_potencial = sum(tempo_setup[seq[i], seq[i+1]] for i in range(len(seq)-1))
-            else:
-                setup_tempo_potencial = 0
-
-            tempo_total = tempo_total_necessario + setup_tempo_potencial
-
-            # Verificar se cabe na capacidade acumulada até t_entrega
-            if tempo_total > cap_acumulada[t_entrega]:
+    indice = obter_indice(parametros)
+    capacidade = np.asarray(parametros['capacidade_periodo'])  # (T,)
+    custo_setup = np.asarray(parametros['custo_setup'])        # (J, J)
+
+    solucao = Solucao.vazia(parametros)
+    # Livro-razão: produção, itens, sequência e tempo usado de cada período
+    periodos = EstadoPeriodos(parametros, producao=solucao.x)
+
+    # Menor setup (tempo e custo) de entrada de cada item: limitantes do acréscimo de setup
+    setup_minimo = np.asarray(indice.setup_minimo_entrada, dtype=float)
+    fora_diagonal = ~np.eye(len(custo_setup), dtype=bool)
+    custo_minimo = np.min(np.where(fora_diagonal, custo_setup, np.inf), axis=0, initial=np.inf)
+    custo_minimo = np.where(np.isfinite(custo_minimo), custo_minimo, 0.0)
+
+    # Ordenar pedidos pela maior receita na janela de entrega
+    receita = np.where(indice.janela_entrega, parametros['receita_pedido'], -np.inf)
+    prioridade = receita.max(axis=1, initial=-np.inf)
+    pedidos = [int(n) for n in np.argsort(-prioridade, kind="stable") if np.isfinite(prioridade[n])]
+
+    for n in pedidos:
+        inicio, fim = indice.janela(n)
+        janela = np.arange(inicio, fim + 1)
+        itens = indice.itens_do_pedido(n)
+        quantidades = dict(indice.demanda_do_pedido(n))
+
+        # Pontuação vetorizada de todos os períodos da janela a partir do livro-razão
+        presentes = periodos.producao[:, janela] > 0                     # (J, |janela|)
+        novos = ~presentes[itens]                                        # itens do pedido ausentes do período
+        # Limitante do setup após a inclusão: soma - maior dos setups mínimos de entrada dos itens do período
+        setup_itens = np.where(presentes, setup_minimo[:, None], 0.0)
+        setup_novos = np.where(novos, setup_minimo[itens, None], 0.0)
+        limitante_setup = (setup_itens.sum(axis=0) + setup_novos.sum(axis=0)
+                           - np.maximum(setup_itens.max(axis=0, initial=0.0), setup_novos.max(axis=0, initial=0.0)))
+        livre = capacidade[janela] - periodos.tempo_producao_periodo[janela] - limitante_setup
+        cabe = indice.carga_pedido[n] <= livre + 1e-6
+        pontuacao = receita[n, janela] - custo_minimo[itens] @ novos
+        candidatos = janela[cabe][np.argsort(-pontuacao[cabe], kind="stable")]
+        if INSTRUMENTACAO.ativa:
+            INSTRUMENTACAO.registrar_tentativas("triagem.heuristica_original", len(janela), len(candidatos))
+
+        # Verificação exata, na ordem da pontuação
+        aceito = False
+        for t in candidatos.tolist():
+            sequencia, tempo_total = periodos.simular_pedido(t, quantidades)
+            viavel = tempo_total <= capacidade[t] + 1e-6
+            if viavel:
+                # O último item da sequência é propagado uma única vez, na última alocação
+                for posicao, (j, quantidade) in enumerate(quantidades.items(), 1):
+                    periodos.alocar_tentativa(t, j, quantidade, sequencia if posicao == len(quantidades) else ())
+                viavel = periodos.simular_propagacao(t, capacidade)
+            if INSTRUMENTACAO.ativa:
+                INSTRUMENTACAO.registrar_resultado("capacidade.construcao", viavel)
+            if not viavel:
+                periodos.descartar_tentativa()
                 continue
-
-            # Simular alocação no último período de produção (pode ser antes de t_entrega)
-            # Para simplificar, vamos alocar no período mais tardio possível: t = t_entrega
-            # Mas a produção pode ter começado antes — aqui, alocamos tudo em t_entrega
-            # (melhoria futura: distribuir produção)
-
-            # Verificar capacidade no período t_entrega
-            prod_t = sum(tempo_prod[j] * demanda[n, j] for j in itens_pedido)
-            setup_t = setup_tempo_potencial
-            if prod_t + setup_t > capacidade[t_entrega]:
-                continue
-
-            # Avaliar lucro
-            lucro_liquido = receita[n, t_entrega] - setup_tempo_potencial * 0.1  # peso arbitrário
-            if lucro_liquido > melhor_lucro:
-                melhor_lucro = lucro_liquido
-                best_t = t_entrega
-                best_seq = seq if len(itens_pedido) > 1 else list(itens_pedido)
-
-        if best_t != -1:
-            gamma[n, best_t] = 1
-            # Alocar produção total no período best_t
-            for j in range(J):
-                x[j, n, best_t] = demanda[n, j]
-
-            # Atualizar setup, sequência no período best_t
-            y[:, best_t] = 0
-            y[best_seq[0], best_t] = 1
-            for i in range(len(best_seq) - 1):
-                z[best_seq[i], best_seq[i+1], best_t] = 1
-            for ordem, j in enumerate(best_seq):
-                V[j, best_t] = ordem + 1
-
-    # Propagar setup entre períodos
-    for t in range(T - 1):
-        itens_t = np.where(V[:, t] > 0)[0]
-        if len(itens_t) == 0:
-            continue
-        ultimo_j = itens_t[np.argmax(V[itens_t, t])]
-        if y[ultimo_j, t + 1] == 0 and np.sum(y[:, t + 1]) > 0: 
-            inicial_t1 = np.argmax(y[:, t + 1])
-            if custo_setup[ultimo_j, inicial_t1] == 0:
-                y[:, t + 1] = 0
-                y[ultimo_j, t + 1] = 1
-
-    solucao = {'gamma': gamma, 'x': x, 'y': y, 'z': z, 'V': V}
-    if validar_restricoes(solucao, parametros):
-        print("Solução viável gerada com produção distribuível até entrega.")
-    else:
-        print("Solução inviável.")
-    return solucao
\ No newline at end of file
+            periodos.confirmar_tentativa()
+            solucao.gamma[n, t] = 1
+            for j, quantidade in quantidades.items():
+                solucao.Q[j, n, t, 0] = quantidade
+            aceito = True
+            break
+        if INSTRUMENTACAO.ativa:
+            INSTRUMENTACAO.registrar_resultado("compromisso.pedido", aceito)
+
+    # Toda a produção é consumida no próprio período: o estoque fica zerado
+    periodos.preencher_setups(solucao)
+    registrador.info("Heurística original: %d de %d pedidos aceitos.", int(solucao.gamma.sum()), len(pedidos))
+    return solucao
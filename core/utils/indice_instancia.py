@@ -0,0 +1,128 @@
+"""
+Índice pré-computado da instância, construído uma única vez na carga
+(`carregar_parametros_otimizacao` / `carregar_instancia_binaria`) e guardado em
+`parametros["indice"]`.
+
+Reúne as estruturas derivadas que as construções e os movimentos consultavam
+recalculando a partir das matrizes densas a cada pedido ou período:
+
+    - itens de cada pedido, em formato CSR (apenas as demandas não nulas);
+    - carga de produção sum_j d_nj * p_j de cada pedido;
+    - capacidade acumulada dos períodos;
+    - janela de entrega de cada pedido, como máscara (N, T) e como intervalo
+      [F_n, min(L_n, T - 1)];
+    - janelas de produção: primeiro período em que o item j (ou o pedido n,
+      pela maior vida útil dos seus itens) pode ser produzido para entrega em
+      t, max(t - v, 0);
+    - cópia somente leitura da matriz de tempos de setup, que pode servir de
+      chave estável de cache (`sequenciamento.CacheSequenciamento`), e menor
+      tempo de setup de entrada de cada item.
+
+Todos os arranjos são somente leitura; o índice não muda depois de construído.
+"""
+import numpy as np
+
+from .calcular_custo_total import mascara_janela_entrega
+
+
+def _somente_leitura(arranjo):
+    arranjo = np.ascontiguousarray(arranjo)
+    arranjo.setflags(write=False)
+    return arranjo
+
+
+def _csr(linhas, colunas, valores, num_linhas):
+    """Ponteiros de início (num_linhas + 1,), colunas e valores em ordem de linha."""
+    inicio = np.zeros(num_linhas + 1, dtype=np.int64)
+    np.cumsum(np.bincount(linhas, minlength=num_linhas), out=inicio[1:])
+    return _somente_leitura(inicio), _somente_leitura(colunas), _somente_leitura(valores)
+
+
+class IndiceInstancia:
+    """
+    Estruturas derivadas, imutáveis, de uma instância.
+
+    Attributes:
+        inicio_pedido, itens_pedido, demandas_pedido: CSR pedido -> item; os itens
+            do pedido n são itens_pedido[inicio_pedido[n]:inicio_pedido[n + 1]],
+            em ordem crescente.
+        carga_pedido (N,): tempo de produção de todo o pedido.
+        capacidade_acumulada (T,): capacidade dos períodos 0..t.
+        janela_entrega (N, T): True se t pertence a [F_n, L_n].
+        inicio_janela, fim_janela (N,): F_n e min(L_n, T - 1); janela vazia se
+            inicio_janela > fim_janela.
+        inicio_producao_item (J, T): max(t - v_j, 0), primeiro período de
+            produção do item j entregue em t.
+        inicio_producao_pedido (N, T): max(t - v_n, 0), com v_n a maior vida
+            útil dos itens do pedido n.
+        tempo_setup (J, J): cópia própria, somente leitura, de parametros["tempo_setup"].
+        setup_minimo_entrada (J,): menor tempo de setup de outro item para j
+            (0 com um único item).
+    """
+
+    def __init__(self, parametros):
+        self.num_pedidos = parametros["num_pedidos"]
+        self.num_itens = parametros["num_itens"]
+        self.num_periodos = parametros["num_periodos"]
+        demanda = np.asarray(parametros["demanda_pedidos"])
+
+        pedidos, itens = np.nonzero(demanda)
+        self.inicio_pedido, self.itens_pedido, self.demandas_pedido = _csr(
+            pedidos, itens, demanda[pedidos, itens], self.num_pedidos)
+
+        self.carga_pedido = _somente_leitura(demanda @ np.asarray(parametros["tempo_producao"]))
+        self.capacidade_acumulada = _somente_leitura(np.cumsum(parametros["capacidade_periodo"]))
+
+        self.janela_entrega = _somente_leitura(mascara_janela_entrega(parametros))
+        self.inicio_janela = _somente_leitura(np.asarray(parametros["periodo_inicial_entrega"], dtype=np.int64))
+        self.fim_janela = _somente_leitura(np.minimum(parametros["periodo_final_entrega"], self.num_periodos - 1))
+
+        vida_util = np.asarray(parametros["vida_util"], dtype=np.int64)
+        vida_pedido = np.max(np.where(demanda > 0, vida_util[None, :], 0), axis=1, initial=0)
+        periodos = np.arange(self.num_periodos)
+        self.inicio_producao_item = _somente_leitura(np.maximum(periodos[None, :] - vida_util[:, None], 0))
+        self.inicio_producao_pedido = _somente_leitura(np.maximum(periodos[None, :] - vida_pedido[:, None], 0))
+
+        # Cópia própria: alterações in-place em parametros["tempo_setup"] não a atingem
+        self.tempo_setup = tempo_setup = _somente_leitura(np.array(parametros["tempo_setup"]))
+        fora_diagonal = np.where(np.eye(self.num_itens, dtype=bool), tempo_setup.max(initial=0), tempo_setup)
+        self.setup_minimo_entrada = _somente_leitura(
+            fora_diagonal.min(axis=0) if self.num_itens > 1 else np.zeros(self.num_itens, dtype=tempo_setup.dtype))
+
+        # Versões em inteiros do Python para os laços das construções e dos movimentos
+        fronteiras = self.inicio_pedido.tolist()
+        itens, demandas = self.itens_pedido.tolist(), self.demandas_pedido.tolist()
+        self._demandas = tuple(tuple(zip(itens[a:b], demandas[a:b])) for a, b in zip(fronteiras, fronteiras[1:]))
+        self._janelas = tuple(zip(self.inicio_janela.tolist(), self.fim_janela.tolist()))
+        self._inicio_producao = tuple(map(tuple, self.inicio_producao_item.tolist()))
+
+    def __repr__(self):
+        return (f"IndiceInstancia(N={self.num_pedidos}, J={self.num_itens}, T={self.num_periodos}, "
+                f"demandas não nulas={len(self.itens_pedido)})")
+
+    def itens_do_pedido(self, n):
+        """Itens com demanda no pedido n (visão do CSR, ordem crescente)."""
+        return self.itens_pedido[self.inicio_pedido[n]:self.inicio_pedido[n + 1]]
+
+    def demanda_do_pedido(self, n):
+        """Pares (item, quantidade) do pedido n, em inteiros do Python."""
+        return self._demandas[n]
+
+    def janela(self, n):
+        """Intervalo (F_n, min(L_n, T - 1)) de entrega do pedido n, em inteiros do Python."""
+        return self._janelas[n]
+
+    def periodos_producao(self, j, t):
+        """Períodos max(t - v_j, 0)..t em que o item j entregue em t pode ser produzido."""
+        return range(self._inicio_producao[j][t], t + 1)
+
+
+def obter_indice(parametros):
+    """
+    Índice da instância; construído e guardado em `parametros["indice"]` se os
+    parâmetros não vieram das funções de carga (por exemplo, gerados em memória).
+    """
+    indice = parametros.get("indice")
+    if indice is None:
+        indice = parametros["indice"] = IndiceInstancia(parametros)
+    return indice
@@ -0,0 +1,168 @@
+"""
+Formato binário compilado das instâncias.
+
+Arquivo único: assinatura de 8 bytes, tamanho do cabeçalho (uint64), cabeçalho
+JSON com os escalares e a forma/dtype/deslocamento de cada arranjo, e os
+arranjos contíguos, alinhados em 64 bytes. A leitura mapeia o arquivo em
+memória somente leitura, sem cópia nem parsing.
+
+Uso pela linha de comando (a partir de `core/`):
+    python -m utils.instancia_binaria inst1_5.txt            # gera inst1_5.pdslap
+    python -m utils.instancia_binaria inst*.txt --cache      # preenche o cache em disco
+"""
+import argparse
+import hashlib
+import json
+import os
+import struct
+import tempfile
+
+import numpy as np
+
+from .indice_instancia import IndiceInstancia
+
+ASSINATURA = b"PDSLAP01"
+EXTENSAO = ".pdslap"
+ALINHAMENTO = 64
+
+ESCALARES = ("num_itens", "num_periodos", "num_pedidos")
+ARRANJOS = (
+    "demanda_pedidos", "custo_setup", "tempo_setup", "periodo_inicial_entrega",
+    "periodo_final_entrega", "capacidade_periodo", "tempo_producao", "custo_estoque",
+    "receita_pedido", "vida_util",
+)
+
+# Diretório padrão do cache de instâncias compiladas
+DIRETORIO_CACHE = os.environ.get("PDSLAP_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "pdslap"))
+
+
+class ParametrosMapeados(dict):
+    """
+    Parâmetros carregados de um arquivo binário, com arranjos mapeados em memória.
+
+    Ao ser serializado (por exemplo, ao ser enviado aos processos de um pool),
+    leva apenas o caminho do arquivo: cada processo reabre o mapeamento e todos
+    compartilham as mesmas páginas do sistema operacional. Chaves adicionadas
+    ao dicionário depois da carga não são transmitidas; o índice da instância
+    (`indice`) é reconstruído pela própria carga.
+    """
+
+    def __init__(self, dados, caminho):
+        super().__init__(dados)
+        self.caminho = caminho
+
+    def __reduce__(self):
+        return carregar_instancia_binaria, (self.caminho,)
+
+
+def eh_instancia_binaria(caminho):
+    """True se o arquivo começa com a assinatura do formato binário."""
+    with open(caminho, "rb") as arquivo:
+        return arquivo.read(len(ASSINATURA)) == ASSINATURA
+
+
+def _alinhar(posicao):
+    return -(-posicao // ALINHAMENTO) * ALINHAMENTO
+
+
+def salvar_instancia_binaria(parametros, caminho):
+    """
+    Grava os parâmetros no formato binário. A escrita é feita em um arquivo
+    temporário e renomeada ao final, para que leitores concorrentes nunca vejam
+    um arquivo incompleto.
+    """
+    arranjos = {nome: np.ascontiguousarray(parametros[nome]) for nome in ARRANJOS}
+    descricao = {}
+    posicao = 0
+    for nome, arranjo in arranjos.items():
+        descricao[nome] = {"dtype": arranjo.dtype.str, "forma": list(arranjo.shape), "deslocamento": posicao}
+        posicao = _alinhar(posicao + arranjo.nbytes)
+    cabecalho = json.dumps({
+        "escalares": {nome: int(parametros[nome]) for nome in ESCALARES},
+        "arranjos": descricao,
+    }).encode()
+    inicio_dados = _alinhar(len(ASSINATURA) + 8 + len(cabecalho))
+
+    diretorio = os.path.dirname(os.path.abspath(caminho))
+    os.makedirs(diretorio, exist_ok=True)
+    descritor, temporario = tempfile.mkstemp(dir=diretorio, suffix=".tmp")
+    try:
+        with os.fdopen(descritor, "wb") as arquivo:
+            arquivo.write(ASSINATURA)
+            arquivo.write(struct.pack("<Q", len(cabecalho)))
+            arquivo.write(cabecalho)
+            for nome, arranjo in arranjos.items():
+                arquivo.seek(inicio_dados + descricao[nome]["deslocamento"])
+                arquivo.write(arranjo.tobytes())
+            arquivo.truncate(inicio_dados + posicao)
+        os.replace(temporario, caminho)
+    except BaseException:
+        os.unlink(temporario)
+        raise
+
+
+def carregar_instancia_binaria(caminho):
+    """
+    Carrega uma instância no formato binário, mapeando os arranjos em memória
+    (somente leitura).
+
+    Returns:
+        ParametrosMapeados: Mesmo dicionário de `carregar_parametros_otimizacao`.
+    """
+    with open(caminho, "rb") as arquivo:
+        if arquivo.read(len(ASSINATURA)) != ASSINATURA:
+            raise ValueError(f"{caminho} não é uma instância no formato binário.")
+        (tamanho_cabecalho,) = struct.unpack("<Q", arquivo.read(8))
+        cabecalho = json.loads(arquivo.read(tamanho_cabecalho))
+    inicio_dados = _alinhar(len(ASSINATURA) + 8 + tamanho_cabecalho)
+
+    mapa = np.memmap(caminho, dtype=np.uint8, mode="r")
+    dados = dict(cabecalho["escalares"])
+    for nome, descricao in cabecalho["arranjos"].items():
+        dtype = np.dtype(descricao["dtype"])
+        forma = tuple(descricao["forma"])
+        inicio = inicio_dados + descricao["deslocamento"]
+        fim = inicio + dtype.itemsize * int(np.prod(forma))
+        dados[nome] = mapa[inicio:fim].view(dtype).reshape(forma)
+    dados["indice"] = IndiceInstancia(dados)
+    return ParametrosMapeados(dados, os.path.abspath(caminho))
+
+
+def hash_arquivo(caminho):
+    """SHA-256 do conteúdo do arquivo."""
+    resumo = hashlib.sha256()
+    with open(caminho, "rb") as arquivo:
+        for bloco in iter(lambda: arquivo.read(1 << 20), b""):
+            resumo.update(bloco)
+    return resumo.hexdigest()
+
+
+def caminho_cache(caminho_texto, diretorio_cache=None):
+    """Arquivo do cache correspondente ao conteúdo de uma instância em texto."""
+    diretorio = diretorio_cache or DIRETORIO_CACHE
+    return os.path.join(diretorio, hash_arquivo(caminho_texto) + EXTENSAO)
+
+
+def main(argumentos=None):
+    from .carregar_parametros_otimizacao import carregar_parametros_otimizacao
+
+    parser = argparse.ArgumentParser(description="Converte instâncias em texto para o formato binário.")
+    parser.add_argument("instancias", nargs="+", help="Arquivos de instância no formato texto.")
+    parser.add_argument("-o", "--saida", help="Arquivo de saída (apenas com uma instância).")
+    parser.add_argument("--cache", action="store_true", help="Grava no cache em disco, indexado pelo hash do arquivo.")
+    parser.add_argument("--diretorio-cache", default=None, help=f"Diretório do cache (padrão: {DIRETORIO_CACHE}).")
+    args = parser.parse_args(argumentos)
+    if args.saida and len(args.instancias) > 1:
+        parser.error("--saida só pode ser usado com uma única instância.")
+
+    for caminho in args.instancias:
+        if args.cache:
+            destino = caminho_cache(caminho, args.diretorio_cache)
+        else:
+            destino = args.saida or os.path.splitext(caminho)[0] + EXTENSAO
+        salvar_instancia_binaria(carregar_parametros_otimizacao(caminho), destino)
+        print(f"{caminho} -> {destino}")
+
+
+if __name__ == "__main__":
+    main()
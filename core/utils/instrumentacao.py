@@ -0,0 +1,122 @@
+"""
+Instrumentação dos pontos quentes: contadores e cronômetros em torno do
+sequenciamento, das verificações de capacidade, das avaliações, das tentativas
+e aceitações de movimentos e dos compromissos das heurísticas construtivas.
+
+Desativada por padrão; o custo nos pontos instrumentados é então a leitura de
+um atributo. Ativação:
+
+    with instrumentar() as perfil:
+        construir_com_ordem_definida(parametros, ordem)
+    print(perfil.relatorio())
+
+ou, para um processo inteiro, `INSTRUMENTACAO.ativa = True` (ou a variável de
+ambiente `PDSLAP_INSTRUMENTACAO=1`). Os dados são do processo corrente: com o
+GRASP em vários processos, apenas o que roda no processo principal é medido.
+"""
+import functools
+import os
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+
+class Instrumentacao:
+    """
+    Perfil acumulado de uma execução.
+
+    `tempos[nome]` e `chamadas[nome]` vêm dos trechos cronometrados;
+    `tentativas[nome]` e `sucessos[nome]` dos eventos com resultado (acertos de
+    cache, verificações de capacidade aprovadas, movimentos aceitos, pedidos
+    comprometidos), dos quais sai a taxa de sucesso.
+    """
+
+    def __init__(self, ativa=False):
+        self.ativa = ativa
+        self.zerar()
+
+    def zerar(self):
+        self.tempos = defaultdict(float)
+        self.chamadas = defaultdict(int)
+        self.tentativas = defaultdict(int)
+        self.sucessos = defaultdict(int)
+
+    def registrar_tempo(self, nome, duracao):
+        self.tempos[nome] += duracao
+        self.chamadas[nome] += 1
+
+    def registrar_resultado(self, nome, sucesso):
+        self.tentativas[nome] += 1
+        self.sucessos[nome] += bool(sucesso)
+
+    def registrar_tentativas(self, nome, tentativas, sucessos):
+        self.tentativas[nome] += tentativas
+        self.sucessos[nome] += sucessos
+
+    def como_dict(self):
+        return {
+            "cronometros": {
+                nome: {
+                    "chamadas": self.chamadas[nome],
+                    "tempo_total": self.tempos[nome],
+                    "tempo_medio": self.tempos[nome] / self.chamadas[nome],
+                }
+                for nome in sorted(self.tempos)
+            },
+            "taxas": {
+                nome: {
+                    "tentativas": self.tentativas[nome],
+                    "sucessos": self.sucessos[nome],
+                    "taxa": self.sucessos[nome] / self.tentativas[nome] if self.tentativas[nome] else 0.0,
+                }
+                for nome in sorted(self.tentativas)
+            },
+        }
+
+    def relatorio(self):
+        dados = self.como_dict()
+        linhas = [f"{'Trecho':<36}{'Chamadas':>12}{'Total (s)':>12}{'Média (us)':>14}"]
+        for nome, valores in sorted(dados["cronometros"].items(), key=lambda item: -item[1]["tempo_total"]):
+            linhas.append(f"{nome:<36}{valores['chamadas']:>12}{valores['tempo_total']:>12.4f}"
+                          f"{valores['tempo_medio'] * 1e6:>14.1f}")
+        linhas.append("")
+        linhas.append(f"{'Evento':<36}{'Tentativas':>12}{'Sucessos':>12}{'Taxa':>14}")
+        for nome, valores in dados["taxas"].items():
+            linhas.append(f"{nome:<36}{valores['tentativas']:>12}{valores['sucessos']:>12}{valores['taxa']:>14.1%}")
+        return "\n".join(linhas)
+
+
+# Perfil do processo
+INSTRUMENTACAO = Instrumentacao(ativa=os.environ.get("PDSLAP_INSTRUMENTACAO", "") not in ("", "0"))
+
+
+def cronometrado(nome):
+    """Decorador que acumula chamadas e tempo da função em `nome` quando a instrumentação está ativa."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not INSTRUMENTACAO.ativa:
+                return funcao(*args, **kwargs)
+            inicio = time.perf_counter()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                INSTRUMENTACAO.registrar_tempo(nome, time.perf_counter() - inicio)
+        return envolvida
+    return decorador
+
+
+@contextmanager
+def instrumentar(zerar=True):
+    """
+    Ativa a instrumentação dentro do bloco e devolve o perfil acumulado.
+    Ao sair, o estado anterior (ativa ou não) é restaurado.
+    """
+    anterior = INSTRUMENTACAO.ativa
+    if zerar:
+        INSTRUMENTACAO.zerar()
+    INSTRUMENTACAO.ativa = True
+    try:
+        yield INSTRUMENTACAO
+    finally:
+        INSTRUMENTACAO.ativa = anterior
@@ -0,0 +1,224 @@
+"""
+Limitantes superiores baratos para o lucro, usados para reportar o gap de
+otimalidade das heurísticas e para interrompê-las quando o gap fica abaixo de
+um alvo.
+
+Ambos os limitantes descartam os custos de estoque e de setup (não negativos)
+e o tempo de setup, ficando apenas com a escolha dos pedidos aceitos e de seus
+períodos de entrega. O pedido n entregue em t consome a carga
+w_n = sum_j d_nj * p_j, produzida entre max(t - v_n, 0) e t, onde v_n é a maior
+vida útil dos seus itens; ele só é admissível em t se, para cada vida útil v, a
+carga dos itens com vida <= v couber na capacidade dos períodos t-v..t.
+
+    limitante_mochila: mochila única (capacidade total, receita máxima de cada
+        pedido) resolvida pela relaxação linear de Dantzig, O(N log N).
+    limitante_lagrangiano: relaxação lagrangiana das restrições de capacidade
+        de cada intervalo de períodos [s, e] (a carga dos pedidos cuja produção
+        cai inteira no intervalo cabe na sua capacidade), com multiplicadores
+        ajustados por subgradiente. Parte dos multiplicadores equivalentes ao
+        limitante da mochila, de modo que nunca é pior que ele; melhora quando a
+        capacidade está concentrada longe das janelas de entrega.
+"""
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from .indice_instancia import obter_indice
+from .instrumentacao import cronometrado
+from .registro import obter_registrador
+
+registrador = obter_registrador(__name__)
+
+LimitanteSuperior = namedtuple("LimitanteSuperior", ["valor", "mochila", "lagrangiano", "iteracoes", "tempo"])
+
+
+def calcular_gap(fo, limitante):
+    """
+    Gap relativo (limitante - fo) / |limitante|; 0 quando a FO atinge o limitante.
+    """
+    if fo >= limitante:
+        return 0.0
+    if limitante == 0:
+        return float("inf")
+    return (limitante - fo) / abs(limitante)
+
+
+def atingiu_gap(fo, limitante, gap_alvo):
+    """True se há alvo e limitante e o gap da FO já está abaixo do alvo."""
+    return gap_alvo is not None and limitante is not None and calcular_gap(fo, limitante) <= gap_alvo
+
+
+def _relaxacao(parametros):
+    """
+    Dados comuns às relaxações.
+
+    Returns:
+        tuple: (receita (N, T) com -inf fora dos períodos admissíveis, carga (N,),
+                capacidade acumulada (T,), primeiro período de produção (N, T) do
+                pedido entregue em t, max(t - v_n, 0), com v_n a maior vida útil
+                dos itens do pedido)
+    """
+    indice = obter_indice(parametros)
+    demanda = np.asarray(parametros["demanda_pedidos"], dtype=float)
+    tempo_producao = np.asarray(parametros["tempo_producao"], dtype=float)
+    vida_util = np.asarray(parametros["vida_util"])
+    capacidade_acumulada = np.asarray(indice.capacidade_acumulada, dtype=float)
+    deslocada = np.concatenate(([0.0], capacidade_acumulada))
+    periodos = np.arange(len(capacidade_acumulada))
+
+    admissivel = indice.janela_entrega.copy()
+    for vida in np.unique(vida_util):
+        carga = demanda[:, vida_util <= vida] @ tempo_producao[vida_util <= vida]
+        janela = capacidade_acumulada - deslocada[np.maximum(periodos - vida, 0)]
+        admissivel &= carga[:, None] <= janela[None, :]
+
+    receita = np.where(admissivel, np.asarray(parametros["receita_pedido"], dtype=float), -np.inf)
+    return receita, np.asarray(indice.carga_pedido, dtype=float), capacidade_acumulada, indice.inicio_producao_pedido
+
+
+def _capacidade_intervalos(capacidade_acumulada):
+    """Capacidade C[s, e] dos períodos s..e (s <= e) e máscara dos intervalos válidos."""
+    deslocada = np.concatenate(([0.0], capacidade_acumulada[:-1]))
+    capacidade = capacidade_acumulada[None, :] - deslocada[:, None]
+    validos = np.triu(np.ones(capacidade.shape, dtype=bool))
+    return np.where(validos, capacidade, 0.0), validos
+
+
+def _mochila(receita, carga, capacidade):
+    """
+    Relaxação linear de Dantzig da mochila com o melhor período de cada pedido.
+
+    Returns:
+        tuple: (limitante, razão receita/carga do item crítico, 0 se a capacidade sobra)
+    """
+    valor = np.max(receita, axis=1, initial=0.0)
+    valor = np.maximum(valor, 0.0)
+    livres = (carga <= 0) & (valor > 0)
+    limitante = valor[livres].sum()
+    candidatos = np.flatnonzero((carga > 0) & (valor > 0))
+    ordem = candidatos[np.argsort(-valor[candidatos] / carga[candidatos], kind="stable")]
+    acumulada = np.cumsum(carga[ordem])
+    cabem = int(np.searchsorted(acumulada, capacidade, side="right"))
+    limitante += valor[ordem[:cabem]].sum()
+    if cabem == len(ordem):
+        return limitante, 0.0
+    critico = ordem[cabem]
+    sobra = capacidade - (acumulada[cabem - 1] if cabem else 0.0)
+    razao = valor[critico] / carga[critico]
+    return limitante + sobra * razao, razao
+
+
+def limitante_mochila(parametros):
+    """Limitante da mochila única (relaxação linear de Dantzig)."""
+    receita, carga, capacidade_acumulada, _ = _relaxacao(parametros)
+    return float(_mochila(receita, carga, capacidade_acumulada[-1])[0])
+
+
+def _primal_guloso(receita, carga, capacidade_acumulada, inicio_producao):
+    """
+    Valor de uma solução viável da relaxação, aceitando os pedidos pela razão
+    receita/carga no período de maior receita em que ainda cabem.
+    """
+    capacidade, validos = _capacidade_intervalos(capacidade_acumulada)
+    folga = np.where(validos, capacidade, np.inf)
+    melhor = np.max(receita, axis=1, initial=0.0)
+    razao = np.where(carga > 0, melhor / np.maximum(carga, 1e-12), np.inf)
+    periodos = np.arange(len(capacidade_acumulada))
+    valor = 0.0
+    for n in np.argsort(-razao, kind="stable"):
+        if melhor[n] <= 0:
+            continue
+        # Entregar em t (produzindo desde a) ocupa todo intervalo [s, e] com s <= a e e >= t
+        menor_folga = np.minimum.accumulate(np.minimum.accumulate(folga[:, ::-1], axis=1)[:, ::-1], axis=0)
+        cabe = menor_folga[inicio_producao[n], periodos] >= carga[n]
+        opcoes = np.where(cabe, receita[n], -np.inf)
+        t = int(np.argmax(opcoes))
+        if opcoes[t] > 0:
+            valor += opcoes[t]
+            folga[:inicio_producao[n, t] + 1, t:] -= carga[n]
+    return valor
+
+
+def _funcao_dual(receita, carga, inicio_producao, capacidade, multiplicadores):
+    """
+    Valor da função lagrangiana e seu subgradiente (T, T) nos multiplicadores dados.
+    """
+    num_periodos = capacidade.shape[0]
+    # O pedido entregue em t, produzindo desde a, paga os multiplicadores de todo [s, e] com s <= a e e >= t
+    preco = np.cumsum(np.cumsum(multiplicadores[:, ::-1], axis=1)[:, ::-1], axis=0)
+    periodos = np.arange(num_periodos)
+    reduzida = receita - carga[:, None] * preco[inicio_producao, periodos[None, :]]
+    periodo = np.argmax(reduzida, axis=1)
+    aceitos = np.flatnonzero(reduzida[np.arange(len(carga)), periodo] > 0)
+    periodo = periodo[aceitos]
+    valor = np.sum(multiplicadores * capacidade) + reduzida[aceitos, periodo].sum()
+
+    ocupacao = np.bincount(inicio_producao[aceitos, periodo] * num_periodos + periodo, weights=carga[aceitos],
+                           minlength=num_periodos * num_periodos).reshape(num_periodos, num_periodos)
+    uso = np.cumsum(np.cumsum(ocupacao[::-1], axis=0)[::-1], axis=1)
+    return valor, capacidade - uso
+
+
+@cronometrado("limitantes.lagrangiano")
+def limitante_lagrangiano(parametros, max_iteracoes=200, limite_inferior=None, passo_inicial=2.0, paciencia=10,
+                          tolerancia=1e-4):
+    """
+    Relaxação lagrangiana das capacidades dos intervalos de períodos, minimizada
+    por subgradiente com passo de Polyak: passo = theta * (L - alvo) / ||g||^2,
+    com theta reduzido à metade após `paciencia` iterações sem melhora do
+    limitante. O alvo é o maior entre `limite_inferior` (por exemplo, a FO de uma
+    heurística) e o valor de uma solução gulosa da relaxação.
+
+    Returns:
+        tuple: (limitante, iterações realizadas)
+    """
+    receita, carga, capacidade_acumulada, inicio_producao = _relaxacao(parametros)
+    mochila, razao = _mochila(receita, carga, capacidade_acumulada[-1])
+    alvo = _primal_guloso(receita, carga, capacidade_acumulada, inicio_producao)
+    if limite_inferior is not None:
+        alvo = max(alvo, limite_inferior)
+    capacidade, validos = _capacidade_intervalos(capacidade_acumulada)
+
+    # Apenas o intervalo de todo o horizonte com o preço do item crítico: o limitante da mochila
+    multiplicadores = np.zeros_like(capacidade)
+    multiplicadores[0, -1] = razao
+    melhor = mochila
+    theta, sem_melhora, iteracao = passo_inicial, 0, 0
+    while iteracao < max_iteracoes and theta > tolerancia and melhor - alvo > tolerancia * max(abs(melhor), 1.0):
+        iteracao += 1
+        valor, subgradiente = _funcao_dual(receita, carga, inicio_producao, capacidade, multiplicadores)
+        if valor < melhor - 1e-9:
+            melhor, sem_melhora = valor, 0
+        else:
+            sem_melhora += 1
+            if sem_melhora >= paciencia:
+                theta, sem_melhora = theta / 2, 0
+        subgradiente = np.where(validos, subgradiente, 0.0)
+        norma = np.sum(subgradiente * subgradiente)
+        if norma == 0:
+            break
+        passo = theta * (valor - alvo) / norma
+        multiplicadores = np.maximum(multiplicadores - passo * subgradiente, 0.0)
+    return float(melhor), iteracao
+
+
+def limitante_superior(parametros, lagrangiano=True, max_iteracoes=200, limite_inferior=None):
+    """
+    Melhor limitante superior disponível para o lucro: o da mochila e, com
+    `lagrangiano=True`, o da relaxação lagrangiana (nunca pior que o primeiro).
+
+    Returns:
+        LimitanteSuperior: (valor, mochila, lagrangiano, iteracoes, tempo); sem a
+            relaxação lagrangiana, `lagrangiano` é None.
+    """
+    inicio = time.perf_counter()
+    mochila = limitante_mochila(parametros)
+    valor_lagrangiano, iteracoes = None, 0
+    if lagrangiano:
+        valor_lagrangiano, iteracoes = limitante_lagrangiano(parametros, max_iteracoes, limite_inferior)
+    valor = min(mochila, valor_lagrangiano) if valor_lagrangiano is not None else mochila
+    tempo = time.perf_counter() - inicio
+    registrador.debug("Limitante superior: %.2f (mochila %.2f, lagrangiano %s) em %.3fs", valor, mochila,
+                      valor_lagrangiano, tempo)
+    return LimitanteSuperior(float(valor), float(mochila), valor_lagrangiano, iteracoes, tempo)
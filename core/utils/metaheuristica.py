@@ -0,0 +1,394 @@
+"""
+Metaheurísticas de trajetória sobre os movimentos registrados em `busca_local`:
+recozimento simulado (`recozimento_simulado`) e busca local iterada
+(`busca_local_iterada`).
+
+Ambas usam os mesmos movimentos da busca local (sorteio com `Movimento.sortear`,
+preço com `avaliar` e aplicação com `aplicar` sobre um EstadoIncremental),
+aceitam movimentos de piora, guardam a melhor solução encontrada e param por
+número de iterações, por tempo de parede ou, com `gap_alvo`, assim que o gap
+em relação ao limitante superior (`limitantes.limitante_superior`) fica abaixo
+do alvo. O traço de convergência registra,
+a cada melhora, o instante e a melhor FO, para comparar execuções pelo
+desempenho ao longo do tempo (e não apenas pelo resultado final).
+"""
+import math
+import random
+import time
+
+from .avaliacao_incremental import EstadoIncremental
+from .busca_local import MOVIMENTOS, EstatisticasMovimento, busca_local
+from .calcular_custo_total import avaliar_solucao
+from .instrumentacao import INSTRUMENTACAO, cronometrado
+from .limitantes import atingiu_gap, calcular_gap, limitante_superior
+from .registro import obter_registrador
+from .solucao import Solucao
+
+registrador = obter_registrador(__name__)
+
+
+def _resfriamento_geometrico(temperatura_inicial, temperatura_final, progresso):
+    return temperatura_inicial * (temperatura_final / temperatura_inicial) ** progresso
+
+
+def _resfriamento_linear(temperatura_inicial, temperatura_final, progresso):
+    return temperatura_inicial + (temperatura_final - temperatura_inicial) * progresso
+
+
+def _resfriamento_lundy_mees(temperatura_inicial, temperatura_final, progresso):
+    beta = temperatura_inicial / temperatura_final - 1
+    return temperatura_inicial / (1 + beta * progresso)
+
+
+# Esquema de resfriamento -> temperatura(inicial, final, progresso em [0, 1])
+ESQUEMAS_RESFRIAMENTO = {
+    "geometrico": _resfriamento_geometrico,
+    "linear": _resfriamento_linear,
+    "lundy_mees": _resfriamento_lundy_mees,
+}
+
+CRITERIOS_ACEITACAO = ("melhora", "sempre", "recozimento")
+
+
+class TracoConvergencia:
+    """
+    Melhor FO ao longo da execução: um ponto (tempo, iteração, melhor FO) no
+    início e a cada nova melhor solução.
+    """
+
+    def __init__(self):
+        self.pontos = []
+
+    def registrar(self, tempo, iteracao, melhor_fo):
+        self.pontos.append((tempo, iteracao, melhor_fo))
+
+    def melhor_fo_em(self, tempo):
+        """Melhor FO conhecida no instante `tempo` (None antes do primeiro ponto)."""
+        melhor = None
+        for instante, _, fo in self.pontos:
+            if instante > tempo:
+                break
+            melhor = fo
+        return melhor
+
+    def como_dict(self):
+        return [{"tempo": tempo, "iteracao": iteracao, "melhor_fo": fo} for tempo, iteracao, fo in self.pontos]
+
+
+class ResultadoMetaheuristica:
+    """Resultado do recozimento simulado ou da busca local iterada."""
+
+    def __init__(self, metodo, melhor_solucao, melhor_fo, fo_inicial, iteracoes, tempo_total, traco,
+                 estatisticas, pioras_aceitas, limitante=None):
+        self.metodo = metodo
+        self.melhor_solucao = melhor_solucao
+        self.melhor_fo = melhor_fo
+        self.fo_inicial = fo_inicial
+        self.iteracoes = iteracoes
+        self.tempo_total = tempo_total
+        self.traco = traco
+        self.estatisticas = estatisticas
+        self.pioras_aceitas = pioras_aceitas
+        self.limitante = limitante
+
+    @property
+    def gap(self):
+        return calcular_gap(self.melhor_fo, self.limitante) if self.limitante is not None else None
+
+    def relatorio(self):
+        linhas = [
+            f"{self.metodo}: {self.iteracoes} iterações em {self.tempo_total:.2f}s",
+            f"  FO inicial: {self.fo_inicial:.2f} | melhor FO: {self.melhor_fo:.2f} | "
+            f"melhorias: {len(self.traco.pontos) - 1} | pioras aceitas: {self.pioras_aceitas}",
+        ]
+        if self.limitante is not None:
+            linhas.append(f"  limitante superior: {self.limitante:.2f} | gap: {self.gap:.2%}")
+        for est in self.estatisticas.values():
+            linhas.append(f"  {est.nome:<16} avaliados={est.avaliados:<8} viáveis={est.viaveis:<8} "
+                          f"aplicados={est.aplicados:<6}")
+        return linhas
+
+
+def _preparar(solucao, parametros, movimentos, max_iteracoes, tempo_limite):
+    if max_iteracoes is None and tempo_limite is None:
+        raise ValueError("Informe max_iteracoes ou tempo_limite.")
+    if not isinstance(solucao, Solucao):
+        solucao = Solucao.de_dict(solucao, parametros)
+    if movimentos is None:
+        movimentos = list(MOVIMENTOS)
+    movimentos = [MOVIMENTOS[m]() if isinstance(m, str) else m for m in movimentos]
+    return solucao, movimentos, {m.nome: EstatisticasMovimento(m.nome) for m in movimentos}
+
+
+def _progresso(inicio, iteracao, max_iteracoes, tempo_limite):
+    """Fração consumida do orçamento (iterações ou tempo, o que estiver mais adiantado)."""
+    progresso = 0.0
+    if max_iteracoes is not None:
+        progresso = iteracao / max_iteracoes if max_iteracoes > 0 else 1.0
+    if tempo_limite is not None:
+        progresso = max(progresso, (time.perf_counter() - inicio) / tempo_limite if tempo_limite > 0 else 1.0)
+    return progresso
+
+
+def _sortear_vizinho(estado, movimentos, estatisticas, rng):
+    """Sorteia um movimento e um candidato e o avalia; devolve (movimento, candidato, delta, dados) ou None."""
+    movimento = rng.choice(movimentos)
+    candidato = movimento.sortear(estado, rng)
+    if candidato is None:
+        return None
+    est = estatisticas[movimento.nome]
+    t0 = time.perf_counter()
+    delta, viavel, dados = movimento.avaliar(estado, candidato)
+    est.tempo_avaliacao += time.perf_counter() - t0
+    est.avaliados += 1
+    if not viavel:
+        return None
+    est.viaveis += 1
+    return movimento, candidato, delta, dados
+
+
+def _aplicar(estado, vizinho, estatisticas):
+    movimento, candidato, delta, dados = vizinho
+    movimento.aplicar(estado, candidato, dados, delta)
+    est = estatisticas[movimento.nome]
+    est.aplicados += 1
+    est.ganho_total += delta
+
+
+def estimar_temperatura_inicial(solucao, parametros, movimentos=None, aceitacao_inicial=0.5, amostras=200, rng=None):
+    """
+    Temperatura em que uma piora de tamanho médio é aceita com probabilidade
+    `aceitacao_inicial`: T0 = -média(|delta|) / ln(aceitacao_inicial), com a média
+    tomada sobre as pioras viáveis de até `amostras` vizinhos sorteados.
+
+    Returns:
+        float: Temperatura inicial (1.0 se nenhuma piora for encontrada).
+    """
+    solucao, movimentos, estatisticas = _preparar(solucao, parametros, movimentos, amostras, None)
+    rng = rng if rng is not None else random.Random(0)
+    estado = EstadoIncremental(solucao, parametros)
+    pioras = []
+    for _ in range(amostras):
+        vizinho = _sortear_vizinho(estado, movimentos, estatisticas, rng)
+        if vizinho is not None and vizinho[2] < 0:
+            pioras.append(-vizinho[2])
+    if not pioras:
+        return 1.0
+    return -(sum(pioras) / len(pioras)) / math.log(aceitacao_inicial)
+
+
+@cronometrado("metaheuristica.recozimento")
+def recozimento_simulado(solucao, parametros, movimentos=None, esquema="geometrico", temperatura_inicial=None,
+                         temperatura_final=None, aceitacao_inicial=0.5, max_iteracoes=None, tempo_limite=None,
+                         semente=0, tolerancia=1e-6, limitante=None, gap_alvo=None):
+    """
+    Recozimento simulado com orçamento de iterações ou de tempo.
+
+    A cada iteração um movimento e um candidato são sorteados; o vizinho viável
+    é aceito se não piorar a FO ou, piorando em `delta`, com probabilidade
+    exp(delta / T). A temperatura T cai de `temperatura_inicial` a
+    `temperatura_final` segundo o esquema escolhido, em função da fração
+    consumida do orçamento; assim, com limite de tempo, o resfriamento se ajusta
+    à velocidade da máquina.
+
+    Args:
+        solucao (Solucao | dict): Solução inicial (não é alterada).
+        parametros (dict): Parâmetros do problema.
+        movimentos (list, optional): Nomes de movimentos registrados em MOVIMENTOS ou
+            instâncias de Movimento. Por padrão, todos os registrados.
+        esquema (str): Esquema de resfriamento (chave de ESQUEMAS_RESFRIAMENTO).
+        temperatura_inicial (float, optional): Por padrão, estimada com
+            `estimar_temperatura_inicial` e `aceitacao_inicial`.
+        temperatura_final (float, optional): Por padrão, 0.1% da inicial.
+        aceitacao_inicial (float): Probabilidade de aceitar uma piora média no início.
+        max_iteracoes (int, optional): Número máximo de vizinhos sorteados.
+        tempo_limite (float, optional): Tempo máximo em segundos.
+        semente (int): Semente do gerador aleatório.
+        tolerancia (float): Ganho mínimo para registrar uma nova melhor solução.
+        limitante (float, optional): Limitante superior do lucro usado no gap; por
+            padrão, calculado com `limitante_superior`.
+        gap_alvo (float, optional): Interrompe a busca quando o gap da melhor
+            solução fica abaixo deste valor (por exemplo, 0.01 para 1%).
+
+    Returns:
+        ResultadoMetaheuristica: Melhor solução, FO, gap, traço de convergência e estatísticas.
+    """
+    if esquema not in ESQUEMAS_RESFRIAMENTO:
+        raise ValueError(f"Esquema de resfriamento desconhecido: {esquema}. Use um de {tuple(ESQUEMAS_RESFRIAMENTO)}.")
+    solucao, movimentos, estatisticas = _preparar(solucao, parametros, movimentos, max_iteracoes, tempo_limite)
+    if limitante is None:
+        limitante = limitante_superior(parametros).valor
+    rng = random.Random(semente)
+    inicio = time.perf_counter()
+    if temperatura_inicial is None:
+        temperatura_inicial = estimar_temperatura_inicial(solucao, parametros, movimentos, aceitacao_inicial, rng=rng)
+    if temperatura_final is None:
+        temperatura_final = temperatura_inicial * 1e-3
+    resfriar = ESQUEMAS_RESFRIAMENTO[esquema]
+
+    estado = EstadoIncremental(solucao.copy(), parametros)
+    # A cópia da melhor solução só é feita quando a corrente está para deixá-la (piora aceita)
+    melhor_solucao, melhor_fo, melhor_e_corrente = None, estado.fo, True
+    traco = TracoConvergencia()
+    traco.registrar(time.perf_counter() - inicio, 0, melhor_fo)
+    iteracao = pioras_aceitas = 0
+
+    while not atingiu_gap(melhor_fo, limitante, gap_alvo):
+        progresso = _progresso(inicio, iteracao, max_iteracoes, tempo_limite)
+        if progresso >= 1.0:
+            break
+        temperatura = resfriar(temperatura_inicial, temperatura_final, progresso)
+        iteracao += 1
+        vizinho = _sortear_vizinho(estado, movimentos, estatisticas, rng)
+        if vizinho is None:
+            continue
+        delta = vizinho[2]
+        if delta < 0:
+            if rng.random() >= math.exp(delta / temperatura):
+                continue
+            pioras_aceitas += 1
+            if melhor_e_corrente:
+                melhor_solucao, melhor_e_corrente = estado.solucao.copy(), False
+        _aplicar(estado, vizinho, estatisticas)
+        if estado.fo > melhor_fo + tolerancia:
+            melhor_fo, melhor_e_corrente = estado.fo, True
+            traco.registrar(time.perf_counter() - inicio, iteracao, melhor_fo)
+            registrador.debug("Recozimento, iteração %d (T = %.3g): nova melhor FO %.2f", iteracao, temperatura,
+                              melhor_fo)
+
+    if melhor_e_corrente:
+        melhor_solucao = estado.solucao
+    if INSTRUMENTACAO.ativa:
+        for est in estatisticas.values():
+            INSTRUMENTACAO.registrar_tentativas(f"recozimento.{est.nome}", est.avaliados, est.aplicados)
+    tempo_total = time.perf_counter() - inicio
+    registrador.info("Recozimento simulado: %d iterações, melhor FO %.2f (gap %.2f%%) em %.2fs", iteracao, melhor_fo,
+                     100 * calcular_gap(melhor_fo, limitante), tempo_total)
+    return ResultadoMetaheuristica("Recozimento simulado", melhor_solucao, melhor_fo, traco.pontos[0][2], iteracao,
+                                   tempo_total, traco, estatisticas, pioras_aceitas, limitante)
+
+
+def perturbar(solucao, parametros, forca, movimentos, rng, estatisticas=None, tentativas_por_passo=20):
+    """
+    Aplica `forca` movimentos viáveis sorteados, independentemente do efeito na FO.
+
+    Returns:
+        EstadoIncremental: Estado sobre uma cópia perturbada da solução.
+    """
+    estatisticas = estatisticas if estatisticas is not None else {m.nome: EstatisticasMovimento(m.nome) for m in movimentos}
+    estado = EstadoIncremental(solucao.copy(), parametros)
+    for _ in range(forca):
+        for _ in range(tentativas_por_passo):
+            vizinho = _sortear_vizinho(estado, movimentos, estatisticas, rng)
+            if vizinho is not None:
+                _aplicar(estado, vizinho, estatisticas)
+                break
+    return estado
+
+
+@cronometrado("metaheuristica.ils")
+def busca_local_iterada(solucao, parametros, movimentos=None, movimentos_perturbacao=None, forca_perturbacao=3,
+                        forca_maxima=None, criterio_aceitacao="melhora", temperatura=None, esquema="geometrico",
+                        max_iteracoes=None, tempo_limite=None, semente=0, opcoes_busca=None, tolerancia=1e-6,
+                        limitante=None, gap_alvo=None):
+    """
+    Busca local iterada: perturbação da solução corrente seguida de busca local,
+    com critério de aceitação configurável.
+
+    A força da perturbação (número de movimentos aleatórios) começa em
+    `forca_perturbacao`; com `forca_maxima`, cresce de 1 a cada iteração sem nova
+    melhor solução, até esse limite, e volta ao valor inicial a cada melhora.
+
+    Critérios de aceitação do ótimo local obtido:
+        "melhora": aceita se não for pior que a solução corrente;
+        "sempre": aceita sempre (passeio aleatório entre ótimos locais);
+        "recozimento": aceita pioras com probabilidade exp(delta / T), com T
+            resfriada de `temperatura` a 0.1% dela pelo `esquema`, como no
+            recozimento simulado.
+
+    Args:
+        solucao (Solucao | dict): Solução inicial (não é alterada).
+        parametros (dict): Parâmetros do problema.
+        movimentos (list, optional): Movimentos da busca local (padrão: todos).
+        movimentos_perturbacao (list, optional): Movimentos da perturbação (padrão: os da busca local).
+        forca_perturbacao (int): Movimentos aplicados por perturbação.
+        forca_maxima (int, optional): Força máxima da perturbação adaptativa.
+        criterio_aceitacao (str): Um de CRITERIOS_ACEITACAO.
+        temperatura (float, optional): Temperatura inicial do critério "recozimento";
+            por padrão, estimada como em `recozimento_simulado`.
+        esquema (str): Esquema de resfriamento do critério "recozimento".
+        max_iteracoes (int, optional): Número máximo de perturbações.
+        tempo_limite (float, optional): Tempo máximo em segundos.
+        semente (int): Semente do gerador aleatório.
+        opcoes_busca (dict, optional): Argumentos adicionais de `busca_local`.
+        tolerancia (float): Ganho mínimo para registrar uma nova melhor solução.
+        limitante (float, optional): Limitante superior do lucro usado no gap; por
+            padrão, calculado com `limitante_superior`.
+        gap_alvo (float, optional): Interrompe a busca quando o gap da melhor
+            solução fica abaixo deste valor.
+
+    Returns:
+        ResultadoMetaheuristica: Melhor solução, FO, gap, traço de convergência e
+                                 estatísticas (dos movimentos de perturbação).
+    """
+    if criterio_aceitacao not in CRITERIOS_ACEITACAO:
+        raise ValueError(f"Critério de aceitação desconhecido: {criterio_aceitacao}. Use um de {CRITERIOS_ACEITACAO}.")
+    solucao, movimentos, _ = _preparar(solucao, parametros, movimentos, max_iteracoes, tempo_limite)
+    if movimentos_perturbacao is None:
+        movimentos_perturbacao = movimentos
+    movimentos_perturbacao = [MOVIMENTOS[m]() if isinstance(m, str) else m for m in movimentos_perturbacao]
+    estatisticas = {m.nome: EstatisticasMovimento(m.nome) for m in movimentos_perturbacao}
+    opcoes_busca = dict(opcoes_busca or {})
+    opcoes_busca["movimentos"] = movimentos
+    if limitante is None:
+        limitante = limitante_superior(parametros).valor
+    rng = random.Random(semente)
+    inicio = time.perf_counter()
+
+    def restante():
+        return None if tempo_limite is None else max(tempo_limite - (time.perf_counter() - inicio), 0.0)
+
+    traco = TracoConvergencia()
+    traco.registrar(0.0, 0, avaliar_solucao(solucao, parametros).lucro)
+    resultado = busca_local(solucao, parametros, tempo_limite=restante(), **opcoes_busca)
+    corrente, fo_corrente = resultado.solucao, resultado.fo
+    melhor_solucao, melhor_fo = corrente, fo_corrente
+    if melhor_fo > traco.pontos[0][2] + tolerancia:
+        traco.registrar(time.perf_counter() - inicio, 0, melhor_fo)
+    if criterio_aceitacao == "recozimento" and temperatura is None:
+        temperatura = estimar_temperatura_inicial(corrente, parametros, movimentos_perturbacao, rng=rng)
+    forca = forca_perturbacao
+    iteracao = pioras_aceitas = 0
+
+    while (_progresso(inicio, iteracao, max_iteracoes, tempo_limite) < 1.0
+           and not atingiu_gap(melhor_fo, limitante, gap_alvo)):
+        iteracao += 1
+        perturbado = perturbar(corrente, parametros, forca, movimentos_perturbacao, rng, estatisticas)
+        resultado = busca_local(perturbado.solucao, parametros, tempo_limite=restante(), **opcoes_busca)
+        delta = resultado.fo - fo_corrente
+
+        if criterio_aceitacao == "melhora":
+            aceita = delta >= -tolerancia
+        elif criterio_aceitacao == "sempre":
+            aceita = True
+        else:
+            progresso = _progresso(inicio, iteracao, max_iteracoes, tempo_limite)
+            atual = ESQUEMAS_RESFRIAMENTO[esquema](temperatura, temperatura * 1e-3, min(progresso, 1.0))
+            aceita = delta >= 0 or rng.random() < math.exp(delta / atual)
+        if aceita:
+            pioras_aceitas += delta < -tolerancia
+            corrente, fo_corrente = resultado.solucao, resultado.fo
+
+        if resultado.fo > melhor_fo + tolerancia:
+            melhor_solucao, melhor_fo = resultado.solucao, resultado.fo
+            traco.registrar(time.perf_counter() - inicio, iteracao, melhor_fo)
+            registrador.debug("ILS, iteração %d (força %d): nova melhor FO %.2f", iteracao, forca, melhor_fo)
+            forca = forca_perturbacao
+        elif forca_maxima is not None:
+            forca = min(forca + 1, forca_maxima)
+
+    tempo_total = time.perf_counter() - inicio
+    registrador.info("Busca local iterada: %d iterações, melhor FO %.2f (gap %.2f%%) em %.2fs", iteracao, melhor_fo,
+                     100 * calcular_gap(melhor_fo, limitante), tempo_total)
+    return ResultadoMetaheuristica("Busca local iterada", melhor_solucao, melhor_fo, traco.pontos[0][2], iteracao,
+                                   tempo_total, traco, estatisticas, pioras_aceitas, limitante)
@@ -0,0 +1,255 @@
+import time
+
+import numpy as np
+
+from .avaliacao_incremental import EstadoIncremental, PlanoMovimento
+from .busca_local import MovimentoAceitacao, MovimentoPeriodoEntrega, busca_local
+from .gerar_solucao_inicial_hc1_atualizada import obter_sequencia_producao
+
+MODOS_RECONEXAO = ("avancada", "reversa", "mista")
+
+
+def decisoes_entrega(solucao):
+    """Vetor (N,) com o período de entrega de cada pedido, ou -1 se rejeitado."""
+    aceitos = solucao.gamma.any(axis=1)
+    return np.where(aceitos, solucao.gamma.argmax(axis=1), -1)
+
+
+def _arcos_sequencias(solucao):
+    arcos = set()
+    for t, seq in solucao.sequencias_producao.items():
+        arcos.update((i, j, t) for i, j in zip(seq, seq[1:]))
+        if seq:
+            arcos.add((None, seq[0], t))
+    return arcos
+
+
+def distancia_solucoes(a, b):
+    """
+    Distância entre duas soluções: número de pedidos com decisão de aceitação ou
+    período de entrega diferente, somado ao número de arcos (i -> j no período t)
+    das sequências de produção presentes em apenas uma delas.
+    """
+    distancia_gamma = int(np.sum(decisoes_entrega(a) != decisoes_entrega(b)))
+    distancia_sequencias = len(_arcos_sequencias(a) ^ _arcos_sequencias(b))
+    return distancia_gamma + distancia_sequencias
+
+
+class ConjuntoElite:
+    """
+    Conjunto de soluções elite com critério de diversidade.
+
+    Uma solução entra se for melhor que a melhor do conjunto ou se estiver a
+    pelo menos `distancia_minima` de todas as demais; com o conjunto cheio, ela
+    precisa ainda ser melhor que a pior, que é então substituída.
+    """
+
+    def __init__(self, tamanho_maximo=10, distancia_minima=1):
+        self.tamanho_maximo = tamanho_maximo
+        self.distancia_minima = distancia_minima
+        self.solucoes = []  # lista de (fo, solucao), em ordem decrescente de FO
+
+    def __len__(self):
+        return len(self.solucoes)
+
+    def __iter__(self):
+        return iter(self.solucoes)
+
+    @property
+    def melhor(self):
+        return self.solucoes[0] if self.solucoes else (None, None)
+
+    def adicionar(self, solucao, fo):
+        """Tenta inserir a solução; retorna True se ela entrou no conjunto."""
+        cheio = len(self.solucoes) >= self.tamanho_maximo
+        if cheio and fo <= self.solucoes[-1][0]:
+            return False
+        melhor_que_todas = not self.solucoes or fo > self.solucoes[0][0]
+        if not melhor_que_todas:
+            if any(distancia_solucoes(solucao, outra) < self.distancia_minima for _, outra in self.solucoes):
+                return False
+        if cheio:
+            self.solucoes.pop()
+        self.solucoes.append((fo, solucao))
+        self.solucoes.sort(key=lambda par: par[0], reverse=True)
+        return True
+
+
+def _resequenciar_periodos(estado, periodos):
+    """Re-sequencia os períodos com `obter_sequencia_producao`, se não piorar a FO."""
+    plano = PlanoMovimento()
+    for t in sorted(periodos):
+        seq = estado.solucao.sequencias_producao[t]
+        if len(seq) < 2:
+            continue
+        nova_seq, _ = obter_sequencia_producao(seq, estado.tempo_setup, estado._item_anterior_plano(t, plano))
+        if nova_seq != seq:
+            plano.sequencias[t] = nova_seq
+    if plano.sequencias:
+        delta, viavel = estado.avaliar_plano(plano)
+        if viavel and delta >= 0:
+            estado.aplicar_plano(plano, delta)
+
+
+def _aplicar_plano_viavel(estado, plano):
+    if plano is None:
+        return False
+    delta, viavel = estado.avaliar_plano(plano)
+    if not viavel:
+        return False
+    estado.aplicar_plano(plano, delta)
+    return True
+
+
+def aplicar_decisao(estado, n, periodo_alvo):
+    """
+    Leva a decisão do pedido n para `periodo_alvo` (-1 = rejeitado) e re-sequencia
+    os períodos cuja produção mudou.
+
+    Uma troca de período de entrega é feita deslocando as idades do consumo;
+    quando o shelf-life não permite, o pedido é rejeitado e aceito novamente
+    no período-alvo.
+
+    Returns:
+        bool: False se a decisão não puder ser aplicada (capacidade/shelf-life);
+              nesse caso o estado pode ter sido parcialmente alterado.
+    """
+    aceitacao = MovimentoAceitacao()
+    periodos = estado.solucao.gamma[n].nonzero()[0]
+    atual = int(periodos[0]) if len(periodos) else -1
+    if atual == periodo_alvo:
+        return True
+
+    alterados = set()
+    if atual >= 0 and periodo_alvo >= 0:
+        delta, viavel, plano = MovimentoPeriodoEntrega().avaliar(estado, (n, atual, periodo_alvo))
+        if viavel:
+            estado.aplicar_plano(plano, delta)
+            return True
+    if atual >= 0:
+        plano = aceitacao._plano_rejeicao(estado, n)
+        alterados.update(t for _, t in plano.delta_x)
+        if not _aplicar_plano_viavel(estado, plano):
+            return False
+    if periodo_alvo >= 0:
+        plano = aceitacao._plano_aceitacao(estado, n, periodo_alvo)
+        if plano is None:
+            return False
+        alterados.update(t for _, t in plano.delta_x)
+        if not _aplicar_plano_viavel(estado, plano):
+            return False
+    _resequenciar_periodos(estado, alterados)
+    return True
+
+
+def _passo(estado, alvo, parametros):
+    """
+    Um passo de reconexão: aplica, entre os pedidos com decisão diferente de `alvo`,
+    a mudança que leva à melhor FO.
+
+    Returns:
+        EstadoIncremental | None: Novo estado, ou None se nenhuma mudança for possível.
+    """
+    diferentes = np.nonzero(decisoes_entrega(estado.solucao) != alvo)[0]
+    melhor = None
+    for n in diferentes:
+        candidato = EstadoIncremental(estado.solucao.copy(), parametros)
+        if aplicar_decisao(candidato, int(n), int(alvo[n])) and (melhor is None or candidato.fo > melhor.fo):
+            melhor = candidato
+    return melhor
+
+
+def reconexao_caminhos(origem, guia, parametros, modo="avancada", tempo_limite=None):
+    """
+    Reconexão de caminhos entre duas soluções sobre as decisões de aceitação e
+    período de entrega dos pedidos.
+
+    Em cada passo, aplica-se a mudança de decisão (em direção à solução-alvo) que
+    resulta na melhor FO; as sequências dos períodos alterados são refeitas com
+    `obter_sequencia_producao`.
+
+    Args:
+        origem, guia (Solucao): Extremos do caminho.
+        parametros (dict): Parâmetros do problema.
+        modo (str): "avancada" caminha da pior para a melhor solução, "reversa" da
+            melhor para a pior e "mista" avança alternadamente pelos dois extremos.
+        tempo_limite (float, optional): Tempo máximo em segundos.
+
+    Returns:
+        tuple: (melhor_solucao, melhor_fo) entre as soluções intermediárias do caminho
+               (None, None se o caminho não tiver soluções intermediárias).
+    """
+    if modo not in MODOS_RECONEXAO:
+        raise ValueError(f"Modo desconhecido: {modo}. Use um de {MODOS_RECONEXAO}.")
+    inicio = time.perf_counter()
+    a = EstadoIncremental(origem.copy(), parametros)
+    b = EstadoIncremental(guia.copy(), parametros)
+    if modo == "avancada" and a.fo > b.fo or modo == "reversa" and a.fo < b.fo:
+        a, b = b, a
+
+    melhor_solucao, melhor_fo = None, None
+    mover_a = True
+    while tempo_limite is None or time.perf_counter() - inicio < tempo_limite:
+        alvo = decisoes_entrega(b.solucao if mover_a else a.solucao)
+        atual = a if mover_a else b
+        if np.sum(decisoes_entrega(atual.solucao) != alvo) <= 1:
+            break  # a próxima solução seria o outro extremo
+        proximo = _passo(atual, alvo, parametros)
+        if proximo is None:
+            break
+        if mover_a:
+            a = proximo
+        else:
+            b = proximo
+        if melhor_fo is None or proximo.fo > melhor_fo:
+            melhor_solucao, melhor_fo = proximo.solucao, proximo.fo
+        if modo == "mista":
+            mover_a = not mover_a
+    return melhor_solucao, melhor_fo
+
+
+def intensificar_com_reconexao(elite, parametros, modo="mista", tempo_limite=None, opcoes_busca=None):
+    """
+    Estágio de intensificação: reconexão de caminhos entre todos os pares do
+    conjunto elite, começando pelos pares que envolvem as melhores soluções.
+    As soluções intermediárias melhores passam por busca local (se `opcoes_busca`
+    for informado) e são oferecidas ao conjunto elite.
+
+    Returns:
+        dict: Estatísticas do estágio (pares reconectados, melhorias, tempo).
+    """
+    inicio = time.perf_counter()
+    membros = list(elite)
+    pares = [(i, k) for i in range(len(membros)) for k in range(i + 1, len(membros))]
+    fo_inicial = elite.melhor[0]
+    reconectados = 0
+    inseridas = 0
+    if len(membros) < 2:
+        # Sem pares para reconectar
+        return {"modo": modo, "pares_reconectados": 0, "pares_total": 0, "solucoes_inseridas": 0,
+                "fo_antes": fo_inicial, "fo_depois": fo_inicial, "tempo": time.perf_counter() - inicio}
+
+    for i, k in pares:
+        restante = None if tempo_limite is None else tempo_limite - (time.perf_counter() - inicio)
+        if restante is not None and restante <= 0:
+            break
+        (_, sol_i), (_, sol_k) = membros[i], membros[k]
+        solucao, fo = reconexao_caminhos(sol_i, sol_k, parametros, modo=modo, tempo_limite=restante)
+        reconectados += 1
+        if solucao is None:
+            continue
+        if opcoes_busca is not None:
+            resultado = busca_local(solucao, parametros, **opcoes_busca)
+            solucao, fo = resultado.solucao, resultado.fo
+        if elite.adicionar(solucao, fo):
+            inseridas += 1
+
+    return {
+        "modo": modo,
+        "pares_reconectados": reconectados,
+        "pares_total": len(pares),
+        "solucoes_inseridas": inseridas,
+        "fo_antes": fo_inicial,
+        "fo_depois": elite.melhor[0],
+        "tempo": time.perf_counter() - inicio,
+    }
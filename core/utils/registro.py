@@ -0,0 +1,75 @@
+"""
+Registro (logging) das heurísticas.
+
+Cada módulo obtém seu registrador com `obter_registrador(__name__)`. Por padrão
+as chamadas de biblioteca são silenciosas: o registrador do pacote tem apenas um
+`NullHandler`, e mensagens abaixo do nível configurado são descartadas antes de
+serem formatadas (os argumentos são passados no estilo `%`, sem f-strings).
+Scripts e execuções interativas ativam a saída com `configurar_registro`.
+"""
+import logging
+import sys
+
+# Registrador do pacote, pai dos registradores de todos os módulos
+PACOTE = __name__.rpartition(".")[0] or __name__
+FORMATO_CONSOLE = "%(message)s"
+FORMATO_RASTRO = "%(asctime)s %(levelname)-7s %(name)s: %(message)s"
+
+_registrador_pacote = logging.getLogger(PACOTE)
+_registrador_pacote.addHandler(logging.NullHandler())
+# Sem nível definido, o pacote herdaria WARNING da raiz; o silêncio padrão vem do NullHandler
+_registrador_pacote.setLevel(logging.WARNING)
+_registrador_pacote.propagate = False
+
+_handlers_configurados = []
+
+
+def obter_registrador(nome):
+    """Registrador de um módulo do pacote (use `obter_registrador(__name__)`)."""
+    return logging.getLogger(nome)
+
+
+def configurar_registro(nivel=logging.INFO, arquivo_rastro=None, console=True, nivel_rastro=logging.DEBUG):
+    """
+    Ativa a saída do registro para a execução corrente. Chamadas repetidas
+    substituem a configuração anterior.
+
+    Args:
+        nivel (int | str): Nível mínimo das mensagens no console.
+        arquivo_rastro (str, optional): Arquivo que recebe o rastro da execução
+            (sobrescrito a cada configuração).
+        console (bool): Se False, nada é escrito no console.
+        nivel_rastro (int | str): Nível mínimo das mensagens no arquivo de rastro.
+
+    Returns:
+        logging.Logger: Registrador do pacote.
+    """
+    desativar_registro()
+    niveis = []
+    if console:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setLevel(nivel)
+        handler.setFormatter(logging.Formatter(FORMATO_CONSOLE))
+        _handlers_configurados.append(handler)
+        niveis.append(handler.level)
+    if arquivo_rastro:
+        handler = logging.FileHandler(arquivo_rastro, mode="w", encoding="utf-8")
+        handler.setLevel(nivel_rastro)
+        handler.setFormatter(logging.Formatter(FORMATO_RASTRO))
+        _handlers_configurados.append(handler)
+        niveis.append(handler.level)
+
+    for handler in _handlers_configurados:
+        _registrador_pacote.addHandler(handler)
+    if niveis:
+        _registrador_pacote.setLevel(min(niveis))
+    return _registrador_pacote
+
+
+def desativar_registro():
+    """Remove os handlers de `configurar_registro` e volta ao padrão silencioso."""
+    for handler in _handlers_configurados:
+        _registrador_pacote.removeHandler(handler)
+        handler.close()
+    _handlers_configurados.clear()
+    _registrador_pacote.setLevel(logging.WARNING)
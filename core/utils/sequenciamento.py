@@ -0,0 +1,366 @@
+from collections import OrderedDict, namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from .aceleracao import caminho_guloso, held_karp, melhorar_circuito, usar_jit
+from .instrumentacao import INSTRUMENTACAO, cronometrado
+
+ResultadoSequenciamento = namedtuple("ResultadoSequenciamento", ["sequencia", "ultimo_item", "tempo_setup"])
+
+ESTRATEGIAS_SEQUENCIAMENTO = ("auto", "exata", "melhoria", "gulosa")
+
+# Limites padrão da estratégia "auto"
+LIMITE_EXATO = 9        # até k itens: programação dinâmica de Held-Karp, O(2^k k^2)
+LIMITE_MELHORIA = 200   # até k itens: gulosa + 2-opt/Or-opt; acima, apenas a gulosa
+
+CAPACIDADE_CACHE = 65536
+
+
+def _matriz_caminho(itens, matriz_tempo_setup, ultimo_item_anterior):
+    """
+    Matriz de setup estendida dos itens do período: o índice k (último) é um nó
+    fictício que representa o item anterior, de modo que o caminho aberto a partir
+    dele vira um circuito k -> ... -> k (setup de retorno nulo). A diagonal é zero,
+    pois item repetido não gera troca.
+    """
+    indices = np.asarray(itens)
+    matriz = np.asarray(matriz_tempo_setup, dtype=float)
+    k = len(itens)
+    custos = np.zeros((k + 1, k + 1))
+    custos[:k, :k] = matriz[np.ix_(indices, indices)]
+    if ultimo_item_anterior is not None:
+        custos[k, :k] = matriz[ultimo_item_anterior, indices]
+        custos[k, :k][indices == ultimo_item_anterior] = 0.0
+    np.fill_diagonal(custos, 0.0)
+    return custos
+
+
+def tempo_setup_sequencia(sequencia, matriz_tempo_setup, ultimo_item_anterior=None):
+    """Tempo total de setup de uma sequência, incluindo a troca a partir do item anterior."""
+    tempo = 0.0
+    anterior = ultimo_item_anterior
+    for item in sequencia:
+        if anterior is not None and anterior != item:
+            tempo += matriz_tempo_setup[anterior][item]
+        anterior = item
+    return tempo
+
+
+def _caminho_guloso(custos, inicio):
+    """Vizinho mais próximo em NumPy; empates vão para o menor índice (como `aceleracao.caminho_guloso`)."""
+    livres = np.ones(len(custos), dtype=bool)
+    livres[inicio] = False
+    ordem = [inicio]
+    for _ in range(len(custos) - 1):
+        atual = int(np.argmin(np.where(livres, custos[ordem[-1]], np.inf)))
+        ordem.append(atual)
+        livres[atual] = False
+    return ordem
+
+
+def sequencia_gulosa(itens_a_produzir, matriz_tempo_setup, ultimo_item_anterior=None):
+    """
+    Heurística gulosa (vizinho mais próximo): começa pelo item anterior, se ele estiver
+    entre os itens do período, e visita sempre o item de menor setup a partir do atual.
+
+    Returns:
+        list: Sequência de itens.
+    """
+    restantes = list(set(itens_a_produzir))
+    if not restantes:
+        return []
+    if ultimo_item_anterior is not None and ultimo_item_anterior in restantes:
+        inicio = restantes.index(ultimo_item_anterior)
+    else:
+        inicio = 0
+    custos = np.asarray(matriz_tempo_setup)[np.ix_(restantes, restantes)].astype(float)
+    ordem = caminho_guloso(custos, inicio) if usar_jit() else _caminho_guloso(custos, inicio)
+    return [restantes[i] for i in ordem]
+
+
+@lru_cache(maxsize=None)
+def _camadas_mascaras(k):
+    """Máscaras de 1..k bits agrupadas pelo número de bits ligados."""
+    mascaras = np.arange(1 << k)
+    bits = np.zeros(1 << k, dtype=int)
+    for j in range(k):
+        bits += (mascaras >> j) & 1
+    return [mascaras[bits == s] for s in range(k + 1)]
+
+
+def sequencia_exata(itens_a_produzir, matriz_tempo_setup, ultimo_item_anterior=None):
+    """
+    Sequência de menor tempo de setup pela programação dinâmica de Held-Karp sobre
+    subconjuntos (caminho aberto partindo do item anterior fixo).
+
+    dp[S, j] é o menor setup para produzir o subconjunto S terminando em j; cada
+    camada de subconjuntos com o mesmo número de itens é calculada de uma vez,
+    de forma vetorizada.
+
+    Returns:
+        list: Sequência de itens.
+    """
+    itens = sorted(set(itens_a_produzir))
+    k = len(itens)
+    if k <= 1:
+        return itens
+    custos = _matriz_caminho(itens, matriz_tempo_setup, ultimo_item_anterior)
+    if usar_jit():
+        return [itens[j] for j in held_karp(custos)]
+    camadas = _camadas_mascaras(k)
+    bits = 1 << np.arange(k)
+
+    dp = np.full((1 << k, k), np.inf)
+    pai = np.full((1 << k, k), -1, dtype=np.int64)
+    dp[bits, np.arange(k)] = custos[k, :k]
+    for tamanho in range(2, k + 1):
+        mascaras = camadas[tamanho]
+        anteriores = mascaras[:, None] ^ bits                           # (m, j): S sem j
+        candidatos = dp[anteriores] + custos[:k, :k].T[None, :, :]     # (m, j, i)
+        melhores = np.argmin(candidatos, axis=2)
+        valores = np.take_along_axis(candidatos, melhores[..., None], axis=2)[..., 0]
+        contem = (mascaras[:, None] & bits) != 0
+        dp[mascaras] = np.where(contem, valores, np.inf)
+        pai[mascaras] = np.where(contem, melhores, -1)
+
+    mascara = (1 << k) - 1
+    j = int(np.argmin(dp[mascara]))
+    ordem = []
+    while j >= 0:
+        ordem.append(itens[j])
+        mascara, j = mascara ^ (1 << j), int(pai[mascara, j])
+    return ordem[::-1]
+
+
+def _melhor_dois_opt(circuito, custos):
+    """
+    Melhor inversão de segmento circuito[a..b] (2-opt). Como a matriz de setup é
+    assimétrica, o custo do segmento invertido vem de somas prefixadas dos arcos
+    no sentido direto e no reverso.
+
+    Returns:
+        tuple: (delta, a, b) do melhor movimento.
+    """
+    k = len(circuito) - 2
+    ida = np.concatenate(([0.0], np.cumsum(custos[circuito[:-1], circuito[1:]])))
+    volta = np.concatenate(([0.0], np.cumsum(custos[circuito[1:], circuito[:-1]])))
+    a = np.arange(1, k + 1)[:, None]
+    b = np.arange(1, k + 1)[None, :]
+    delta = (custos[circuito[a - 1], circuito[b]] + custos[circuito[a], circuito[b + 1]]
+             - custos[circuito[a - 1], circuito[a]] - custos[circuito[b], circuito[b + 1]]
+             + (volta[b] - volta[a]) - (ida[b] - ida[a]))
+    delta = np.where(b > a, delta, np.inf)
+    indice = np.unravel_index(np.argmin(delta), delta.shape)
+    return float(delta[indice]), int(indice[0]) + 1, int(indice[1]) + 1
+
+
+def _melhor_or_opt(circuito, custos, tamanho_maximo=3):
+    """
+    Melhor realocação de um segmento circuito[a..a+tamanho-1] (1 a 3 itens) para
+    o arco (circuito[e], circuito[e+1]) fora dele (Or-opt).
+
+    Returns:
+        tuple: (delta, a, b, e) do melhor movimento.
+    """
+    k = len(circuito) - 2
+    arestas = np.arange(k + 1)[None, :]
+    custo_aresta = custos[circuito[:-1], circuito[1:]]
+    melhor = (np.inf, 0, 0, 0)
+    for tamanho in range(1, min(tamanho_maximo, k - 1) + 1):
+        a = np.arange(1, k - tamanho + 2)[:, None]
+        b = a + tamanho - 1
+        remocao = (custos[circuito[a - 1], circuito[a]] + custos[circuito[b], circuito[b + 1]]
+                   - custos[circuito[a - 1], circuito[b + 1]])
+        insercao = (custos[circuito[arestas], circuito[a]] + custos[circuito[b], circuito[arestas + 1]]
+                    - custo_aresta[arestas])
+        delta = np.where((arestas <= a - 2) | (arestas >= b + 1), insercao - remocao, np.inf)
+        indice = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[indice] < melhor[0]:
+            a_min = int(indice[0]) + 1
+            melhor = (float(delta[indice]), a_min, a_min + tamanho - 1, int(indice[1]))
+    return melhor
+
+
+def sequencia_melhorada(itens_a_produzir, matriz_tempo_setup, ultimo_item_anterior=None, max_passadas=None):
+    """
+    Sequência gulosa refinada por 2-opt e Or-opt (melhor melhora) até um ótimo
+    local, ou até `max_passadas` melhorias, mantendo fixo o item anterior.
+
+    Returns:
+        list: Sequência de itens.
+    """
+    itens = sorted(set(itens_a_produzir))
+    k = len(itens)
+    if k <= 2:
+        return sequencia_exata(itens, matriz_tempo_setup, ultimo_item_anterior)
+    custos = _matriz_caminho(itens, matriz_tempo_setup, ultimo_item_anterior)
+    posicao = {item: i for i, item in enumerate(itens)}
+    gulosa = sequencia_gulosa(itens, matriz_tempo_setup, ultimo_item_anterior)
+    circuito = np.array([k] + [posicao[item] for item in gulosa] + [k], dtype=np.int64)
+    if usar_jit():
+        circuito = melhorar_circuito(circuito, custos, -1 if max_passadas is None else max_passadas)
+        return [itens[i] for i in circuito[1:-1]]
+
+    passadas = 0
+    while max_passadas is None or passadas < max_passadas:
+        delta_2opt, a, b = _melhor_dois_opt(circuito, custos)
+        delta_or, a_or, b_or, e = _melhor_or_opt(circuito, custos)
+        if min(delta_2opt, delta_or) >= -1e-9:
+            break
+        if delta_2opt <= delta_or:
+            circuito[a:b + 1] = circuito[a:b + 1][::-1].copy()
+        else:
+            segmento = circuito[a_or:b_or + 1]
+            resto = np.concatenate((circuito[:a_or], circuito[b_or + 1:]))
+            posicao_insercao = e + 1 if e < a_or else e + 1 - len(segmento)
+            circuito = np.concatenate((resto[:posicao_insercao], segmento, resto[posicao_insercao:]))
+        passadas += 1
+    return [itens[i] for i in circuito[1:-1]]
+
+
+@cronometrado("sequenciamento")
+def sequenciar_periodo(itens_a_produzir, matriz_tempo_setup, ultimo_item_anterior=None, estrategia="auto",
+                       limite_exato=LIMITE_EXATO, limite_melhoria=LIMITE_MELHORIA):
+    """
+    Motor de sequenciamento intra-período.
+
+    Com `estrategia="auto"`, a estratégia é escolhida pelo número k de itens:
+    Held-Karp (ótima) para k <= `limite_exato`, gulosa + 2-opt/Or-opt para
+    k <= `limite_melhoria` e apenas a gulosa acima disso. Todas respeitam o item
+    anterior fixo (`ultimo_item_anterior`).
+
+    Args:
+        itens_a_produzir (list): Itens a produzir no período.
+        matriz_tempo_setup (numpy.ndarray): Matriz de tempos de setup [i][j].
+        ultimo_item_anterior (int, optional): Item em que a máquina está preparada.
+        estrategia (str): "auto", "exata", "melhoria" ou "gulosa".
+
+    Returns:
+        ResultadoSequenciamento: (sequencia, ultimo_item, tempo_setup); sem itens,
+            ultimo_item é o próprio `ultimo_item_anterior`.
+    """
+    if estrategia not in ESTRATEGIAS_SEQUENCIAMENTO:
+        raise ValueError(f"Estratégia desconhecida: {estrategia}. Use uma de {ESTRATEGIAS_SEQUENCIAMENTO}.")
+    if not itens_a_produzir:
+        return ResultadoSequenciamento([], ultimo_item_anterior, 0.0)
+
+    if estrategia == "auto":
+        k = len(set(itens_a_produzir))
+        if k <= limite_exato:
+            estrategia = "exata"
+        elif k <= limite_melhoria:
+            estrategia = "melhoria"
+        else:
+            estrategia = "gulosa"
+
+    if estrategia == "exata":
+        sequencia = sequencia_exata(itens_a_produzir, matriz_tempo_setup, ultimo_item_anterior)
+    elif estrategia == "melhoria":
+        sequencia = sequencia_melhorada(itens_a_produzir, matriz_tempo_setup, ultimo_item_anterior)
+    else:
+        sequencia = sequencia_gulosa(itens_a_produzir, matriz_tempo_setup, ultimo_item_anterior)
+
+    tempo = tempo_setup_sequencia(sequencia, matriz_tempo_setup, ultimo_item_anterior)
+    return ResultadoSequenciamento(sequencia, sequencia[-1], tempo)
+
+
+def _impressao_matriz(matriz):
+    """Impressão digital barata do conteúdo de uma matriz: forma, tipo e hash dos bytes."""
+    arranjo = np.asarray(matriz)
+    return arranjo.shape, arranjo.dtype.str, hash(arranjo.tobytes())
+
+
+def _matriz_imutavel(matriz):
+    """True para um arranjo somente leitura dono dos seus dados (nenhuma visão pode alterá-lo)."""
+    return isinstance(matriz, np.ndarray) and not matriz.flags.writeable and matriz.flags.owndata
+
+
+class CacheSequenciamento:
+    """
+    Cache LRU limitado na frente de `sequenciar_periodo`.
+
+    A chave é (máscara de bits dos itens, item anterior, estratégia): a sequência
+    depende apenas do conjunto de itens, não da ordem em que eles são informados.
+    O cache fica associado ao conteúdo de uma matriz de setup (uma instância),
+    identificado por uma impressão digital (forma, tipo e hash dos bytes); se o
+    conteúdo mudar, inclusive por alteração in-place, ele é esvaziado
+    automaticamente. Uma matriz somente leitura e dona dos seus dados, como
+    `IndiceInstancia.tempo_setup`, não pode mudar: é verificada apenas pela
+    identidade. Qualquer outra matriz tem a impressão recalculada a cada
+    consulta, em O(J^2).
+    """
+
+    def __init__(self, capacidade=CAPACIDADE_CACHE):
+        self.capacidade = capacidade
+        self.acertos = 0
+        self.falhas = 0
+        self._entradas = OrderedDict()
+        self._matriz = None
+        self._impressao = None
+        self._imutavel = False
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def invalidar(self):
+        """Esvazia o cache (os contadores de acertos e falhas são mantidos)."""
+        self._entradas.clear()
+        self._matriz = None
+        self._impressao = None
+        self._imutavel = False
+
+    def _vincular(self, matriz_tempo_setup):
+        """Associa o cache à matriz, esvaziando-o se o conteúdo for outro."""
+        impressao = _impressao_matriz(matriz_tempo_setup)
+        if impressao != self._impressao:
+            self.invalidar()
+            self._impressao = impressao
+        self._matriz = matriz_tempo_setup
+        self._imutavel = _matriz_imutavel(matriz_tempo_setup)
+
+    def zerar_contadores(self):
+        self.acertos = 0
+        self.falhas = 0
+
+    def sequenciar(self, itens_a_produzir, matriz_tempo_setup, ultimo_item_anterior=None, estrategia="auto"):
+        """Equivalente a `sequenciar_periodo`, consultando o cache antes."""
+        if matriz_tempo_setup is not self._matriz or not self._imutavel:
+            self._vincular(matriz_tempo_setup)
+
+        mascara = 0
+        for item in itens_a_produzir:
+            mascara |= 1 << int(item)
+        chave = (mascara, ultimo_item_anterior, estrategia)
+
+        entrada = self._entradas.get(chave)
+        if INSTRUMENTACAO.ativa:
+            INSTRUMENTACAO.registrar_resultado("cache_sequenciamento", entrada is not None)
+        if entrada is not None:
+            self.acertos += 1
+            self._entradas.move_to_end(chave)
+        else:
+            self.falhas += 1
+            resultado = sequenciar_periodo(itens_a_produzir, matriz_tempo_setup, ultimo_item_anterior, estrategia)
+            entrada = (tuple(resultado.sequencia), resultado.ultimo_item, resultado.tempo_setup)
+            self._entradas[chave] = entrada
+            if len(self._entradas) > self.capacidade:
+                self._entradas.popitem(last=False)
+
+        sequencia, ultimo_item, tempo_setup = entrada
+        # Lista nova a cada chamada: quem recebe a sequência pode alterá-la
+        return ResultadoSequenciamento(list(sequencia), ultimo_item, tempo_setup)
+
+    def estatisticas(self):
+        consultas = self.acertos + self.falhas
+        return {
+            "acertos": self.acertos,
+            "falhas": self.falhas,
+            "taxa_acerto": self.acertos / consultas if consultas else 0.0,
+            "tamanho": len(self._entradas),
+            "capacidade": self.capacidade,
+        }
+
+
+# Cache do processo, usado por `obter_sequencia_producao`
+CACHE_SEQUENCIAMENTO = CacheSequenciamento()
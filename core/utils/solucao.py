@@ -0,0 +1,224 @@
+from copy import deepcopy
+from itertools import chain
+
+import numpy as np
+
+
+class TensorEsparso:
+    """
+    Tensor esparso de inteiros indexado por tuplas, usado para a variável Q.
+
+    Apenas as entradas não nulas são armazenadas em um dicionário
+    {(j, n, t, k): quantidade}. A leitura de uma posição ausente devolve 0,
+    de modo que Q[j, n, t, k] funciona como no tensor denso J x N x T x K.
+    """
+
+    def __init__(self, forma, dados=None):
+        self.forma = tuple(forma)
+        self._dados = dict(dados) if dados else {}
+
+    def __getitem__(self, chave):
+        return self._dados.get(chave, 0)
+
+    def __setitem__(self, chave, valor):
+        if valor:
+            self._dados[chave] = valor
+        else:
+            self._dados.pop(chave, None)
+
+    def __contains__(self, chave):
+        return chave in self._dados
+
+    def __len__(self):
+        return len(self._dados)
+
+    def __iter__(self):
+        return iter(self._dados)
+
+    def items(self):
+        return self._dados.items()
+
+    def adicionar(self, chave, valor):
+        """Soma `valor` à posição `chave`, removendo-a se o resultado for nulo."""
+        self[chave] = self._dados.get(chave, 0) + valor
+
+    def copy(self):
+        return TensorEsparso(self.forma, self._dados)
+
+    def como_arrays(self):
+        """
+        Entradas não nulas em forma de arrays, para operações vetorizadas.
+
+        Returns:
+            tuple: (chaves, valores), arrays (M, d) e (M,) de inteiros.
+        """
+        chaves = np.fromiter(chain.from_iterable(self._dados), dtype=np.int64,
+                             count=len(self._dados) * len(self.forma)).reshape(-1, len(self.forma))
+        valores = np.fromiter(self._dados.values(), dtype=np.int64, count=len(self._dados))
+        return chaves, valores
+
+    def densa(self, dtype=np.int64):
+        """Retorna o tensor denso equivalente (usar apenas para inspeção/depuração)."""
+        tensor = np.zeros(self.forma, dtype=dtype)
+        for chave, valor in self._dados.items():
+            tensor[chave] = valor
+        return tensor
+
+
+class Solucao:
+    """
+    Representação única de uma solução do PDSLAP, compartilhada por todas as heurísticas.
+
+    As variáveis de decisão são arrays NumPy pré-alocados com o seguinte contrato
+    de formas (J itens, N pedidos, T períodos, K = max(vida_util) + 1 idades):
+
+        x      (J, T)        produção do item j no período t
+        I      (J, T, K)     estoque do item j com idade k ao final do período t
+        Q      (J, N, T, K)  consumo do item j, idade k, pelo pedido n em t (TensorEsparso)
+        gamma  (N, T)        1 se o pedido n é atendido no período t
+        y      (J, T)        1 se a máquina está preparada para j no início de t
+        z      (J, J, T)     1 se ocorre troca do item i para o item j em t
+        sequencias_producao  {t: [itens na ordem de produção]}
+
+    O acesso por chave (solucao["x"], solucao["gamma"], ...) é mantido para
+    compatibilidade com o código que tratava a solução como dicionário.
+    """
+
+    CHAVES = ("x", "I", "Q", "gamma", "y", "z", "sequencias_producao")
+
+    def __init__(self, num_itens, num_periodos, num_pedidos, num_idades):
+        self.num_itens = num_itens
+        self.num_periodos = num_periodos
+        self.num_pedidos = num_pedidos
+        self.num_idades = num_idades
+
+        self.x = np.zeros((num_itens, num_periodos), dtype=np.int64)
+        self.I = np.zeros((num_itens, num_periodos, num_idades), dtype=np.int64)
+        self.Q = TensorEsparso((num_itens, num_pedidos, num_periodos, num_idades))
+        self.gamma = np.zeros((num_pedidos, num_periodos), dtype=np.int8)
+        self.y = np.zeros((num_itens, num_periodos), dtype=np.int8)
+        self.z = np.zeros((num_itens, num_itens, num_periodos), dtype=np.int8)
+        self.sequencias_producao = {t: [] for t in range(num_periodos)}
+
+    @classmethod
+    def vazia(cls, parametros):
+        """Cria uma solução zerada com as dimensões da instância."""
+        return cls(
+            parametros["num_itens"],
+            parametros["num_periodos"],
+            parametros["num_pedidos"],
+            int(max(parametros["vida_util"])) + 1,
+        )
+
+    @classmethod
+    def de_dict(cls, solucao, parametros):
+        """
+        Converte uma solução no formato antigo de dicionários aninhados
+        (x[j][t], I[j][t][k], Q[j][n][t][k], gamma[n][t], y[j][t], z[i][j][t]).
+        """
+        if isinstance(solucao, cls):
+            return solucao
+
+        nova = cls.vazia(parametros)
+        J, T, N, K = nova.num_itens, nova.num_periodos, nova.num_pedidos, nova.num_idades
+        for j in range(J):
+            for t in range(T):
+                nova.x[j, t] = solucao["x"][j][t]
+                nova.y[j, t] = solucao["y"][j][t]
+                for k in range(K):
+                    nova.I[j, t, k] = solucao["I"][j][t][k]
+                    for n in range(N):
+                        nova.Q[j, n, t, k] = solucao["Q"][j][n][t][k]
+            for i in range(J):
+                for t in range(T):
+                    nova.z[i, j, t] = solucao["z"][i][j][t]
+        for n in range(N):
+            for t in range(T):
+                nova.gamma[n, t] = solucao["gamma"][n][t]
+        for t in range(T):
+            nova.sequencias_producao[t] = list(solucao.get("sequencias_producao", {}).get(t, []))
+        return nova
+
+    def copy(self):
+        """Cópia independente e barata (cópia dos arrays, sem deepcopy de dicionários)."""
+        nova = Solucao.__new__(Solucao)
+        nova.num_itens = self.num_itens
+        nova.num_periodos = self.num_periodos
+        nova.num_pedidos = self.num_pedidos
+        nova.num_idades = self.num_idades
+        nova.x = self.x.copy()
+        nova.I = self.I.copy()
+        nova.Q = self.Q.copy()
+        nova.gamma = self.gamma.copy()
+        nova.y = self.y.copy()
+        nova.z = self.z.copy()
+        nova.sequencias_producao = {t: list(seq) for t, seq in self.sequencias_producao.items()}
+        return nova
+
+    # --- Compatibilidade com o acesso por chave ---
+    def __getitem__(self, chave):
+        if chave not in self.CHAVES:
+            raise KeyError(chave)
+        return getattr(self, chave)
+
+    def __setitem__(self, chave, valor):
+        if chave not in self.CHAVES:
+            raise KeyError(chave)
+        setattr(self, chave, valor)
+
+    def __contains__(self, chave):
+        return chave in self.CHAVES
+
+    def keys(self):
+        return iter(self.CHAVES)
+
+    def get(self, chave, padrao=None):
+        return getattr(self, chave) if chave in self.CHAVES else padrao
+
+    # --- Visões derivadas ---
+    def producao_por_pedido(self):
+        """
+        Produção do item j destinada ao pedido n no período t, derivada de Q.
+
+        Uma unidade consumida pelo pedido n no período t com idade k foi
+        produzida no período t - k.
+
+        Returns:
+            numpy.ndarray: Array (J, N, T).
+        """
+        producao = np.zeros((self.num_itens, self.num_pedidos, self.num_periodos), dtype=np.int64)
+        for (j, n, t, k), quantidade in self.Q.items():
+            producao[j, n, t - k] += quantidade
+        return producao
+
+    def consumo_por_idade(self):
+        """
+        Consumo total do item j com idade k no período t, somado sobre os pedidos.
+
+        Returns:
+            numpy.ndarray: Array (J, T, K).
+        """
+        consumo = np.zeros((self.num_itens, self.num_periodos, self.num_idades), dtype=np.int64)
+        for (j, n, t, k), quantidade in self.Q.items():
+            consumo[j, t, k] += quantidade
+        return consumo
+
+    def ordem_producao(self):
+        """
+        Posição (1, 2, ...) de cada item na sequência do período; 0 se não produzido.
+
+        Returns:
+            numpy.ndarray: Array (J, T) equivalente à variável V do modelo.
+        """
+        ordem = np.zeros((self.num_itens, self.num_periodos), dtype=np.int64)
+        for t, seq in self.sequencias_producao.items():
+            for posicao, j in enumerate(seq):
+                ordem[j, t] = posicao + 1
+        return ordem
+
+
+def copiar_solucao(solucao):
+    """Copia uma solução, usando `Solucao.copy()` quando disponível."""
+    if isinstance(solucao, Solucao):
+        return solucao.copy()
+    return deepcopy(solucao)
@@ -0,0 +1,123 @@
+"""
+Pré-triagem vetorizada dos pares (pedido, período de entrega) das construções.
+
+Antes de simular a alocação de um pedido em um período de entrega, descarta os
+pares que certamente não cabem, usando apenas condições necessárias, de modo
+que a triagem nunca muda a solução construída, só evita simulações:
+
+    - carga x capacidade livre: para cada vida útil v dos itens, a carga dos
+      itens do pedido com vida <= v cabe na capacidade livre dos períodos
+      t-v..t. Mantida como uma grade (N, T) atualizada incrementalmente: ao
+      consumir capacidade nos períodos P, apenas as colunas t com algum período
+      de P em t-v_max..t são reavaliadas (a grade só perde pares);
+    - item a item: cada item cabe inteiro em algum período do seu intervalo de
+      produção, somando à produção já comprometida o limitante do setup.
+
+A capacidade livre de um período desconta a produção comprometida e um
+limitante inferior do setup dos itens já presentes: em qualquer sequência,
+todo item, exceto o primeiro, recebe um setup de entrada de pelo menos
+`setup_minimo_entrada`, logo o setup é >= soma - maior desses mínimos. Incluir
+um item j ausente aumenta esse limitante em min(mínimo de j, maior mínimo do
+período).
+
+A carga usa a demanda inteira dos pedidos; com estoque disponível a
+necessidade de produção é menor, e a triagem não deve ser usada.
+"""
+import numpy as np
+
+from .indice_instancia import obter_indice
+
+TOLERANCIA = 1e-6  # mesma folga numérica da verificação de capacidade das construções
+
+
+class TriagemPedidos:
+    """
+    Grade de admissibilidade (N, T) dos pares (pedido, período de entrega),
+    atualizada à medida que a capacidade é consumida.
+    """
+
+    def __init__(self, parametros):
+        self.indice = obter_indice(parametros)
+        self.num_periodos = parametros["num_periodos"]
+        self.capacidade = np.asarray(parametros["capacidade_periodo"], dtype=float)
+        self.tempo_producao = np.asarray(parametros["tempo_producao"], dtype=float)
+        self.vida_util = np.asarray(parametros["vida_util"])
+        self.setup_minimo = np.asarray(self.indice.setup_minimo_entrada, dtype=float)
+
+        # Estado comprometido por período
+        self.tempo_producao_periodo = np.zeros(self.num_periodos)
+        self.presente = np.zeros((parametros["num_itens"], self.num_periodos), dtype=bool)
+        self.soma_setup_minimo = np.zeros(self.num_periodos)
+        self.maior_setup_minimo = np.zeros(self.num_periodos)
+
+        # Carga de cada pedido por classe de vida útil: itens com vida <= v
+        demanda = np.asarray(parametros["demanda_pedidos"], dtype=float)
+        self.vidas = np.unique(self.vida_util)
+        self.carga_classe = np.stack(
+            [demanda[:, self.vida_util <= v] @ self.tempo_producao[self.vida_util <= v] for v in self.vidas], axis=1)
+        self.mascara = self.indice.janela_entrega.copy()
+        self._reavaliar(np.arange(self.num_periodos))
+
+    def folga(self):
+        """Capacidade livre (T,) de cada período, com o limitante do setup já comprometido."""
+        setup = self.soma_setup_minimo - self.maior_setup_minimo
+        return self.capacidade + TOLERANCIA - self.tempo_producao_periodo - setup
+
+    def _reavaliar(self, colunas):
+        livre_acumulada = np.concatenate(([0.0], np.cumsum(self.folga())))
+        cabe = np.ones((len(self.mascara), len(colunas)), dtype=bool)
+        for classe, vida in enumerate(self.vidas):
+            janela = livre_acumulada[colunas + 1] - livre_acumulada[np.maximum(colunas - vida, 0)]
+            cabe &= self.carga_classe[:, classe, None] <= janela[None, :]
+        self.mascara[:, colunas] &= cabe
+
+    def confirmar(self, alocacoes):
+        """
+        Registra a produção comprometida e reavalia as colunas afetadas da grade.
+
+        Args:
+            alocacoes (iterable): Pares ((j, t), quantidade), como em
+                `EstadoPeriodos.producao_tentativa()`.
+        """
+        alterados = set()
+        for (j, t), quantidade in alocacoes:
+            if quantidade <= 0:
+                continue
+            self.tempo_producao_periodo[t] += self.tempo_producao[j] * quantidade
+            if not self.presente[j, t]:
+                self.presente[j, t] = True
+                self.soma_setup_minimo[t] += self.setup_minimo[j]
+                self.maior_setup_minimo[t] = max(self.maior_setup_minimo[t], self.setup_minimo[j])
+            alterados.add(t)
+        if alterados:
+            inicio = min(alterados)
+            fim = min(max(alterados) + int(self.vidas[-1]), self.num_periodos - 1)
+            self._reavaliar(np.arange(inicio, fim + 1))
+
+    def periodos_admissiveis(self, n):
+        """
+        Períodos de entrega do pedido n que passam pela grade e pelo teste item
+        a item, em ordem crescente.
+        """
+        periodos = np.flatnonzero(self.mascara[n])
+        if len(periodos) == 0:
+            return []
+        itens = self.indice.itens_do_pedido(n)
+        if len(itens) == 0:
+            return periodos.tolist()
+        vidas = self.vida_util[itens]
+        carga = self.tempo_producao[itens] * self.indice.demandas_pedido[
+            self.indice.inicio_pedido[n]:self.indice.inicio_pedido[n + 1]]
+
+        # Espaço de cada item em cada período, descontado o aumento do limitante do setup
+        aumento = np.where(self.presente[itens], 0.0,
+                           np.minimum(self.setup_minimo[itens, None], self.maior_setup_minimo[None, :]))
+        espaco = self.folga()[None, :] - aumento
+        # Maior espaço no intervalo de produção t-v_j..t de cada item
+        melhor = espaco.copy()
+        for deslocamento in range(1, min(int(vidas.max()), self.num_periodos - 1) + 1):
+            alcanca = vidas >= deslocamento
+            melhor[alcanca, deslocamento:] = np.maximum(melhor[alcanca, deslocamento:],
+                                                        espaco[alcanca, :-deslocamento])
+        cabe = np.all(carga[:, None] <= melhor[:, periodos], axis=0)
+        return periodos[cabe].tolist()
@@ -0,0 +1,280 @@
+"""
+Verificação vetorizada das restrições do modelo.
+
+Em vez de parar na primeira violação, `verificar_restricoes` calcula todas as
+restrições com operações sobre arrays e devolve um relatório com todas as
+violações e suas magnitudes. O relatório serve tanto para a checagem final
+(`viavel`) quanto como função de penalidade na busca (`penalidade`).
+
+Os dois formatos de solução são aceitos e reduzidos à mesma representação
+(produção x[j, t], estoque por idade I[j, t, k], consumo Q[j, n, t, k] em
+arrays esparsos, entregas, setups e sequências de produção):
+
+- `Solucao` (e dicionários com x[j][t], convertidos por `Solucao.de_dict`),
+  produzida pelo hc1, pelo GRASP, pela busca local e pela reconexão;
+- dicionário antigo com produção por pedido x[j, n, t] e ordem V[j, t]: o
+  consumo é a produção do pedido até sua entrega (idade = entrega - produção)
+  e o estoque é obtido pela recursão de balanço.
+
+Convenções do setup (as mesmas de `EstadoIncremental`): a máquina permanece
+preparada para o último item produzido, inclusive ao longo de períodos vazios;
+y[j, t] = 1 apenas para o primeiro item da sequência de t, e z[i, j, t] = 1 para
+cada troca i→j da sequência, incluindo a troca de entrada a partir do último
+item do período ocupado anterior.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from .calcular_custo_total import mascara_janela_entrega
+from .instrumentacao import cronometrado
+from .solucao import Solucao
+
+Violacao = namedtuple("Violacao", ["restricao", "indice", "magnitude"])
+
+# Tolerância para quantidades e tempos não inteiros
+TOLERANCIA = 1e-6
+
+# Restrição -> (nomes dos índices, descrição)
+RESTRICOES = {
+    "entrega_unica": (("n",), "pedido entregue mais de uma vez"),
+    "janela_entrega": (("n", "t"), "entrega fora da janela [F_n, L_n]"),
+    "atendimento_demanda": (("n", "j"), "quantidade entregue diferente da demanda"),
+    "consumo_sem_entrega": (("n", "t"), "consumo de estoque em período sem entrega do pedido"),
+    "idade_consumo": (("j", "n", "t", "k"), "consumo com idade acima da vida útil ou anterior ao horizonte"),
+    "idade_estoque": (("j", "t", "k"), "estoque com idade acima da vida útil ou anterior ao horizonte"),
+    "balanco_estoque": (("j", "t", "k"), "balanço de estoque por idade violado (ou estoque negativo)"),
+    "capacidade": (("t",), "capacidade excedida"),
+    "sequencia_producao": (("j", "t"), "produção fora da sequência do período (ou item sequenciado sem produção)"),
+    "preparacao_inicial": (("j", "t"), "y diferente do primeiro item da sequência"),
+    "troca_setup": (("i", "j", "t"), "z diferente das trocas da sequência (com a herança do setup)"),
+}
+
+
+class RelatorioViolacoes:
+    """
+    Violações encontradas por restrição: `indices[restricao]` é um array (V, d)
+    com os índices de cada violação e `magnitudes[restricao]` um array (V,) com
+    o quanto cada uma excede o limite (demanda faltante, tempo excedente, ...).
+    """
+
+    def __init__(self, indices, magnitudes):
+        self.indices = indices
+        self.magnitudes = magnitudes
+
+    @property
+    def viavel(self):
+        return all(len(m) == 0 for m in self.magnitudes.values())
+
+    def __bool__(self):
+        return self.viavel
+
+    def __len__(self):
+        return sum(len(m) for m in self.magnitudes.values())
+
+    def contagem(self):
+        """Número de violações por restrição."""
+        return {restricao: len(m) for restricao, m in self.magnitudes.items()}
+
+    def magnitude_total(self):
+        """Soma das magnitudes por restrição."""
+        return {restricao: float(m.sum()) for restricao, m in self.magnitudes.items()}
+
+    def penalidade(self, pesos=None):
+        """
+        Penalidade ponderada: soma, por restrição, de peso × magnitudes. Sem
+        `pesos`, todas as restrições têm peso 1.
+        """
+        pesos = pesos or {}
+        return float(sum(pesos.get(restricao, 1.0) * m.sum() for restricao, m in self.magnitudes.items()))
+
+    def violacoes(self):
+        """Itera sobre todas as violações (Violacao), restrição por restrição."""
+        for restricao, magnitudes in self.magnitudes.items():
+            for indice, magnitude in zip(self.indices[restricao], magnitudes):
+                yield Violacao(restricao, tuple(int(i) for i in indice), float(magnitude))
+
+    def resumo(self):
+        linhas = []
+        for restricao, magnitudes in self.magnitudes.items():
+            if len(magnitudes):
+                linhas.append(f"{restricao}: {len(magnitudes)} violação(ões), magnitude total {magnitudes.sum():.2f}")
+        return "\n".join(linhas) if linhas else "Nenhuma violação."
+
+
+def _registrar(indices, magnitudes, restricao, mascara, magnitude):
+    indices[restricao] = np.argwhere(mascara)
+    magnitudes[restricao] = np.broadcast_to(np.asarray(magnitude, dtype=float), mascara.shape)[mascara]
+
+
+def _registrar_esparso(indices, magnitudes, restricao, chaves, mascara, magnitude):
+    indices[restricao] = chaves[mascara]
+    magnitudes[restricao] = np.asarray(magnitude, dtype=float)[mascara]
+
+
+def _formato_por_pedido(solucao):
+    return not isinstance(solucao, Solucao) and np.ndim(solucao["x"]) == 3
+
+
+def _normalizar(solucao, parametros):
+    """
+    Reduz a solução a (x, I, chaves_Q, valores_Q, gamma, y, z, sequencias), com
+    x (J, T), I (J, T, K) ou None (formato por pedido), chaves_Q (M, 4) com
+    (j, n, t, k) e sequencias {t: [itens]}.
+    """
+    if not _formato_por_pedido(solucao):
+        solucao = Solucao.de_dict(solucao, parametros)
+        chaves, valores = solucao.Q.como_arrays()
+        return (solucao.x, solucao.I, chaves, valores, solucao.gamma, solucao.y, solucao.z,
+                solucao.sequencias_producao)
+
+    x_pedido = np.asarray(solucao["x"])  # (J, N, T)
+    gamma = np.asarray(solucao["gamma"])
+    V = np.asarray(solucao["V"])
+    # Produção do pedido n em t' é consumida na entrega t_n com idade t_n - t'
+    entrega = np.where(gamma.any(axis=1), gamma.argmax(axis=1), -1)
+    j, n, t_producao = np.nonzero(x_pedido)
+    t_entrega = entrega[n]
+    consumida = t_producao <= t_entrega
+    chaves = np.stack([j, n, t_entrega, t_entrega - t_producao], axis=1)[consumida]
+    valores = x_pedido[j, n, t_producao][consumida]
+    sequencias = {}
+    for t in range(V.shape[1]):
+        itens = np.nonzero(V[:, t])[0]
+        sequencias[t] = [int(i) for i in itens[np.argsort(V[itens, t], kind="stable")]]
+    return (x_pedido.sum(axis=1), None, chaves, valores, gamma, np.asarray(solucao["y"]), np.asarray(solucao["z"]),
+            sequencias)
+
+
+def _estoque_por_recursao(x, consumo, vida_util):
+    """Estoque por idade obtido do balanço, descartando o que passa da vida útil (como `EstadoIncremental`)."""
+    J, T, K = consumo.shape
+    valida = np.arange(K)[None, :] <= vida_util[:, None]
+    estoque = np.zeros((J, T, K), dtype=np.result_type(x, consumo))
+    anterior = np.zeros((J, K), dtype=estoque.dtype)
+    for t in range(T):
+        atual = np.zeros_like(anterior)
+        atual[:, 1:] = anterior[:, :-1]
+        atual[:, 0] += x[:, t]
+        atual -= consumo[:, t]
+        estoque[:, t] = np.where(valida, np.maximum(atual, 0), 0)
+        anterior = estoque[:, t]
+    return estoque
+
+
+def _setup_esperado(sequencias, num_itens, num_periodos):
+    """
+    y, z e o conjunto de itens sequenciados deduzidos das sequências, com a
+    herança do setup do último item produzido entre períodos.
+
+    Returns:
+        tuple: (y (J, T) bool, trocas (A, 3) com (i, j, t), sequenciado (J, T) bool).
+    """
+    y = np.zeros((num_itens, num_periodos), dtype=bool)
+    sequenciado = np.zeros((num_itens, num_periodos), dtype=bool)
+    trocas = []
+    anterior = None
+    for t in range(num_periodos):
+        sequencia = sequencias.get(t, [])
+        if not sequencia:
+            continue
+        y[sequencia[0], t] = True
+        sequenciado[sequencia, t] = True
+        for item in sequencia:
+            if anterior is not None and anterior != item:
+                trocas.append((anterior, item, t))
+            anterior = item
+    return y, np.array(trocas, dtype=np.int64).reshape(-1, 3), sequenciado
+
+
+@cronometrado("validacao")
+def verificar_restricoes(solucao, parametros):
+    """
+    Verifica todas as restrições do modelo: entregas e janelas, atendimento da
+    demanda, idades de consumo e estoque dentro da vida útil, balanço de estoque
+    por idade, capacidade com setups dependentes da sequência e consistência de
+    y/z com as sequências, incluindo a herança do setup entre períodos.
+
+    Args:
+        solucao (Solucao | dict): Solução; no formato de dicionário, `x` é a
+            produção por item (J, T), como em `Solucao.de_dict`, ou por pedido
+            (J, N, T), acompanhada da ordem de produção `V` (J, T).
+        parametros (dict): Parâmetros do problema.
+
+    Returns:
+        RelatorioViolacoes: Todas as violações, com índices e magnitudes.
+    """
+    x, I, chaves, valores, gamma, y, z, sequencias = _normalizar(solucao, parametros)
+    J, T = x.shape
+    N = gamma.shape[0]
+    K = int(max(parametros["vida_util"])) + 1
+    demanda = np.asarray(parametros["demanda_pedidos"])      # (N, J)
+    vida_util = np.asarray(parametros["vida_util"])          # (J,)
+    tempo_prod = np.asarray(parametros["tempo_producao"])    # (J,)
+    tempo_setup = np.asarray(parametros["tempo_setup"])      # (J, J)
+    capacidade = np.asarray(parametros["capacidade_periodo"])  # (T,)
+    j_q, n_q, t_q, k_q = chaves.T
+
+    indices, magnitudes = {}, {}
+
+    # 1. Cada pedido entregue no máximo uma vez, dentro da janela
+    entregas = gamma.sum(axis=1)
+    _registrar(indices, magnitudes, "entrega_unica", entregas > 1, entregas - 1)
+    janela = mascara_janela_entrega(parametros)
+    inicio = np.asarray(parametros["periodo_inicial_entrega"])[:, None]
+    fim = np.asarray(parametros["periodo_final_entrega"])[:, None]
+    distancia = np.maximum(inicio - np.arange(T), np.arange(T) - fim)
+    _registrar(indices, magnitudes, "janela_entrega", (gamma == 1) & ~janela, distancia)
+
+    # 2. Pedido entregue recebe exatamente sua demanda; sem entrega, nada é consumido
+    entregue = gamma[n_q, t_q] == 1
+    quantidade = np.zeros((N, J))
+    np.add.at(quantidade, (n_q[entregue], j_q[entregue]), valores[entregue])
+    diferenca = np.abs(demanda - quantidade)
+    _registrar(indices, magnitudes, "atendimento_demanda", (entregas[:, None] > 0) & (diferenca > TOLERANCIA),
+               diferenca)
+    sem_entrega = np.zeros((N, T))
+    np.add.at(sem_entrega, (n_q[~entregue], t_q[~entregue]), valores[~entregue])
+    _registrar(indices, magnitudes, "consumo_sem_entrega", sem_entrega > TOLERANCIA, sem_entrega)
+
+    # 3. Idades: no máximo a vida útil do item e nunca anteriores ao início do horizonte
+    idade_invalida = (k_q > vida_util[j_q]) | (k_q > t_q)
+    _registrar_esparso(indices, magnitudes, "idade_consumo", chaves, idade_invalida & (valores > 0), valores)
+    consumo = np.zeros((J, T, K), dtype=np.int64 if valores.dtype.kind in "iu" else float)
+    valida = ~idade_invalida
+    np.add.at(consumo, (j_q[valida], t_q[valida], k_q[valida]), valores[valida])
+    idade = np.arange(K)
+    idade_valida = (idade[None, None, :] <= vida_util[:, None, None]) & (idade[None, None, :] <= np.arange(T)[None, :, None])
+    if I is None:
+        I = _estoque_por_recursao(x, consumo, vida_util)
+    else:
+        I = np.asarray(I)
+        _registrar(indices, magnitudes, "idade_estoque", ~idade_valida & (I != 0), np.abs(I))
+
+    # 4. Balanço por idade: I[j,t,0] = x[j,t] - C[j,t,0]; I[j,t,k] = I[j,t-1,k-1] - C[j,t,k]; I >= 0
+    saldo = -consumo
+    saldo[:, :, 0] += x
+    saldo[:, 1:, 1:] += I[:, :-1, :-1]
+    desvio = np.maximum(np.abs(I - saldo), -np.minimum(I, 0))
+    _registrar(indices, magnitudes, "balanco_estoque", idade_valida & (desvio > TOLERANCIA), desvio)
+
+    # 5. Capacidade: produção + trocas de setup da sequência (com a troca de entrada herdada)
+    y_esperado, trocas, sequenciado = _setup_esperado(sequencias, J, T)
+    tempo_setup_periodo = np.zeros(T)
+    np.add.at(tempo_setup_periodo, trocas[:, 2], tempo_setup[trocas[:, 0], trocas[:, 1]])
+    excesso = tempo_prod @ x + tempo_setup_periodo - capacidade
+    _registrar(indices, magnitudes, "capacidade", excesso > TOLERANCIA, excesso)
+
+    # 6. Setups coerentes com as sequências
+    _registrar(indices, magnitudes, "sequencia_producao", (x > 0) != sequenciado, np.maximum(x, 1))
+    _registrar(indices, magnitudes, "preparacao_inicial", (y != 0) != y_esperado, 1)
+    z_esperado = np.zeros(z.shape, dtype=bool)
+    z_esperado[trocas[:, 0], trocas[:, 1], trocas[:, 2]] = True
+    _registrar(indices, magnitudes, "troca_setup", (z != 0) != z_esperado, 1)
+
+    return RelatorioViolacoes(indices, magnitudes)
+
+
+def penalidade_violacoes(solucao, parametros, pesos=None):
+    """Penalidade ponderada das violações da solução (0 se viável); ver `RelatorioViolacoes.penalidade`."""
+    return verificar_restricoes(solucao, parametros).penalidade(pesos)